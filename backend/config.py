@@ -9,16 +9,118 @@ class Settings:
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
 
+    # Supabase Connection Pool Configuration
+    SUPABASE_POOL_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+    SUPABASE_POOL_MAX_KEEPALIVE: int = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+    SUPABASE_CONNECT_TIMEOUT: float = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+    SUPABASE_REQUEST_TIMEOUT: float = float(os.getenv("SUPABASE_REQUEST_TIMEOUT", "10"))
+
+    # Maximum number of database calls in flight at once per worker
+    DB_MAX_CONCURRENCY: int = int(os.getenv("DB_MAX_CONCURRENCY", str(SUPABASE_POOL_MAX_CONNECTIONS)))
+
+    # Where the app's tables live: "supabase" (PostgREST), "sqlite" (local file) or "postgres" (asyncpg)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "supabase")
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "macro_tracking.db")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # Connections kept open by the postgres backend; the pool grows up to DB_MAX_CONCURRENCY
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "2"))
+
+    # Summary aggregation: "database" pushes GROUP BY into Postgres, "python" aggregates in-process
+    AGGREGATION_BACKEND: str = os.getenv("AGGREGATION_BACKEND", "database")
+
+    # Serve summaries from the incrementally maintained daily_totals rollup
+    USE_DAILY_ROLLUPS: bool = os.getenv("USE_DAILY_ROLLUPS", "true").lower() == "true"
+
+    # Number of rows fetched per database round trip when streaming exports
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+    # Bulk food log ingestion limits
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_INSERT_CHUNK_SIZE: int = int(os.getenv("BATCH_INSERT_CHUNK_SIZE", "250"))
+
+    # Per-user macro goals cache: "memory" (per process) or "redis" (shared)
+    GOALS_CACHE_BACKEND: str = os.getenv("GOALS_CACHE_BACKEND", "memory")
+    GOALS_CACHE_TTL: float = float(os.getenv("GOALS_CACHE_TTL", "300"))
+    GOALS_CACHE_SIZE: int = int(os.getenv("GOALS_CACHE_SIZE", "10000"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Users fetched per page by the daily summary email job
+    DAILY_DIGEST_PAGE_SIZE: int = int(os.getenv("DAILY_DIGEST_PAGE_SIZE", "1000"))
+
+    # Food search: local nutrition table (CSV) plus each user's logged foods
+    FOOD_CATALOG_PATH: str = os.getenv("FOOD_CATALOG_PATH", "")
+    FOOD_CATALOG_RELOAD_INTERVAL: float = float(os.getenv("FOOD_CATALOG_RELOAD_INTERVAL", "30"))
+    FOOD_HISTORY_LIMIT: int = int(os.getenv("FOOD_HISTORY_LIMIT", "1000"))
+    FOOD_INDEX_CACHE_SIZE: int = int(os.getenv("FOOD_INDEX_CACHE_SIZE", "1000"))
+
+    # Frequent foods: a log's weight halves every this many days
+    FREQUENT_FOODS_HALF_LIFE_DAYS: float = float(os.getenv("FREQUENT_FOODS_HALF_LIFE_DAYS", "14"))
+    # Counters are re-seeded after this many seconds, picking up writes made by other workers
+    FREQUENT_FOODS_TTL: float = float(os.getenv("FREQUENT_FOODS_TTL", "300"))
+
+    # Per-user profile time zone cache used for day bucketing
+    TIMEZONE_CACHE_SIZE: int = int(os.getenv("TIMEZONE_CACHE_SIZE", "10000"))
+    TIMEZONE_CACHE_TTL: float = float(os.getenv("TIMEZONE_CACHE_TTL", "300"))
+
+    # Range summary: longest range in days, and how close (fraction of the goal) counts as on target
+    TREND_MAX_DAYS: int = int(os.getenv("TREND_MAX_DAYS", "3660"))
+    TREND_GOAL_TOLERANCE: float = float(os.getenv("TREND_GOAL_TOLERANCE", "0.1"))
+
+    # Request metrics (per-route latency, DB, auth and serialization time) served on /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Logging: records are queued and written by a background thread.
+    # LOG_LEVELS and LOG_SAMPLE_RATES take "logger=value" pairs separated by commas;
+    # sampling keeps that fraction of a logger's INFO/DEBUG records.
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "httpx=WARNING")
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "backend.services.auth_service.tokens=0.01")
+    LOG_REDACT_PII: bool = os.getenv("LOG_REDACT_PII", "true").lower() == "true"
+
     # JWT Configuration
-    JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
+    # HS256 tokens are rejected until this is set to the project's JWT secret
+    JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "")
     JWT_ALGORITHM: str = "HS256"
+    JWT_AUDIENCE: str = os.getenv("JWT_AUDIENCE", "authenticated")
+    JWT_LEEWAY_SECONDS: int = int(os.getenv("JWT_LEEWAY_SECONDS", "10"))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Supabase JWKS for asymmetric (RS256/ES256) access tokens
+    SUPABASE_JWKS_URL: str = os.getenv(
+        "SUPABASE_JWKS_URL",
+        f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else ""
+    )
+    JWKS_CACHE_TTL: int = int(os.getenv("JWKS_CACHE_TTL", "300"))
+    # Minimum seconds between JWKS refetches triggered by tokens naming an unknown key id
+    JWKS_REFRESH_INTERVAL: float = float(os.getenv("JWKS_REFRESH_INTERVAL", "30"))
+
+    # Maximum number of verified tokens kept in memory
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+
     # SendGrid Configuration
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY", "")
     FROM_EMAIL: str = os.getenv("FROM_EMAIL", "noreply@macro.works")
     FROM_NAME: str = os.getenv("FROM_NAME", "Macro Tracking App")
 
+    # Email delivery: "sendgrid", or "fake" to record emails in memory (local/test
+    # deployments only). Without SENDGRID_API_KEY the sendgrid transport cannot
+    # start: a warning is logged at startup and emails stay queued in the outbox.
+    EMAIL_TRANSPORT: str = os.getenv("EMAIL_TRANSPORT", "sendgrid")
+    EMAIL_CONNECT_TIMEOUT: float = float(os.getenv("EMAIL_CONNECT_TIMEOUT", "5"))
+    EMAIL_REQUEST_TIMEOUT: float = float(os.getenv("EMAIL_REQUEST_TIMEOUT", "15"))
+
+    # Email outbox (SQLite file) and the background worker that drains it
+    EMAIL_OUTBOX_PATH: str = os.getenv("EMAIL_OUTBOX_PATH", "email_outbox.db")
+    EMAIL_BATCH_SIZE: int = int(os.getenv("EMAIL_BATCH_SIZE", "500"))
+    EMAIL_SEND_CONCURRENCY: int = int(os.getenv("EMAIL_SEND_CONCURRENCY", "4"))
+    EMAIL_POLL_INTERVAL: float = float(os.getenv("EMAIL_POLL_INTERVAL", "5"))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_DELAY: float = float(os.getenv("EMAIL_RETRY_BASE_DELAY", "30"))
+    EMAIL_RETRY_MAX_DELAY: float = float(os.getenv("EMAIL_RETRY_MAX_DELAY", "3600"))
+    EMAIL_CLAIM_TIMEOUT: float = float(os.getenv("EMAIL_CLAIM_TIMEOUT", "300"))
+
     # App Configuration
     APP_NAME: str = "Macro Tracking App"
     APP_VERSION: str = "1.0.0"
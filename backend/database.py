@@ -1,35 +1,181 @@
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestSession
 from backend.config import settings
+from typing import Dict, Any, Optional
+import threading
+import httpx
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _pool_limits() -> httpx.Limits:
+    """Keep-alive connection pool limits shared by every PostgREST session"""
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _pool_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.SUPABASE_REQUEST_TIMEOUT,
+        connect=settings.SUPABASE_CONNECT_TIMEOUT,
+    )
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose HTTP session keeps connections alive between requests"""
+
+    # Replaces the network transport, e.g. with an in-memory PostgREST for load tests
+    transport: Optional[httpx.BaseTransport] = None
+
+    def create_session(self, base_url, headers, timeout) -> PostgrestSession:
+        return PostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=_pool_timeout(),
+            limits=_pool_limits(),
+            transport=self.transport,
+        )
+
+
+class PooledClient(Client):
+    """Supabase client that builds its PostgREST client on a pooled HTTP session"""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=None) -> SyncPostgrestClient:
+        return PooledPostgrestClient(rest_url, headers=headers, schema=schema)
+
+
+class SupabaseClientRegistry:
+    """
+    Process-wide registry of named Supabase clients.
+
+    Clients are created once on first use and shared by every request, so
+    requests reuse warm keep-alive connections instead of opening a new
+    HTTP session (and TLS handshake) per call. Separate names keep clients
+    with different session state apart, e.g. the auth client that signs
+    users in must not leak their session into the data client.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Client] = {}
+        self._lock = threading.Lock()
+        self.clients_created = 0
+        self.checkouts = 0
+
+    def get(self, name: str = "default") -> Client:
+        """Return the shared client for `name`, creating it on first use"""
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._create_client()
+                    self._clients[name] = client
+                    self.clients_created += 1
+                    logger.info(f"Created pooled Supabase client '{name}'")
+        self.checkouts += 1
+        return client
+
+    def _create_client(self) -> Client:
+        if not settings.validate_supabase_config():
+            raise Exception("Supabase configuration not found")
+
+        options = ClientOptions(
+            persist_session=False,
+            auto_refresh_token=False,
+            postgrest_client_timeout=_pool_timeout(),
+        )
+        return PooledClient.create(settings.SUPABASE_URL, settings.SUPABASE_KEY, options)
+
+    def use_transport(self, transport: Optional[httpx.BaseTransport]):
+        """
+        Send every PostgREST request through `transport` instead of the
+        network (None restores it). Existing clients are closed so the
+        next checkout picks the transport up.
+        """
+        self.close()
+        PooledPostgrestClient.transport = transport
+
+    def close(self):
+        """Close every pooled HTTP session (called on app shutdown)"""
+        with self._lock:
+            for name, client in self._clients.items():
+                try:
+                    if client._postgrest is not None:
+                        client._postgrest.aclose()
+                except Exception as e:
+                    logger.error(f"Failed to close Supabase client '{name}': {e}")
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage metrics for health checks and monitoring"""
+        clients = {}
+        for name, client in list(self._clients.items()):
+            clients[name] = _session_stats(client)
+
+        return {
+            "clients_created": self.clients_created,
+            "checkouts": self.checkouts,
+            "max_connections": settings.SUPABASE_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.SUPABASE_POOL_MAX_KEEPALIVE,
+            "keepalive_expiry": settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+            "clients": clients,
+        }
+
+
+def _session_stats(client: Client) -> Dict[str, Any]:
+    """Count open/idle/active connections in a client's PostgREST session"""
+    if client._postgrest is None:
+        return {"open_connections": 0, "idle_connections": 0, "active_connections": 0}
+
+    try:
+        connections = client._postgrest.session._transport._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+        }
+    except AttributeError:
+        # Transport internals are not part of httpx's public API
+        return {"open_connections": None, "idle_connections": None, "active_connections": None}
+
+
+# Shared registry used by the whole process
+client_registry = SupabaseClientRegistry()
+
+
 def test_supabase_connection():
     """Test the Supabase connection"""
     if not settings.validate_supabase_config():
         logger.error("Supabase configuration missing!")
         logger.error("Please set SUPABASE_URL and SUPABASE_KEY environment variables")
         return False
-    
+
     try:
         logger.info("Attempting to connect to Supabase...")
         supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        
+
         # Test the connection by trying to get the current user (should fail but not crash)
         # This is just to verify the client can be created
         logger.info("Supabase client created successfully!")
         logger.info(f"Connected to: {settings.SUPABASE_URL}")
         return True
-        
+
     except Exception as e:
         logger.error(f"Failed to connect to Supabase: {e}")
         return False
 
-def get_supabase() -> Client:
-    """Get Supabase client instance"""
-    if not settings.validate_supabase_config():
-        raise Exception("Supabase configuration not found")
-    
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY) 
\ No newline at end of file
+def get_supabase(name: str = "default") -> Client:
+    """Get the shared, pooled Supabase client instance"""
+    return client_registry.get(name)
+
+def close_supabase():
+    """Release pooled Supabase connections"""
+    client_registry.close()
@@ -0,0 +1,23 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from backend.services.auth_service import get_auth_service
+from backend.services.metrics import record_auth
+import time
+
+# Shared bearer-token scheme for every protected route
+security = HTTPBearer()
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Dependency to get current user from JWT token"""
+    token = credentials.credentials
+    started = time.perf_counter()
+    result = await get_auth_service().get_current_user(token)
+    record_auth(time.perf_counter() - started)
+    
+    if not result["success"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=result["error"]
+        )
+    
+    return result
@@ -0,0 +1,180 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from backend.config import settings
+import hashlib
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+SECRET_PATTERNS = (
+    # JWT access/refresh tokens
+    re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*"),
+    # Authorization header values
+    re.compile(r"(?i)bearer\s+[\w.~+/=-]+"),
+    # SendGrid API keys
+    re.compile(r"SG\.[\w-]+\.[\w-]+"),
+)
+
+# Server loggers that install their own synchronous handlers; they are sent through the queue too
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "name=value,other=value" settings into a dict"""
+    mapping = {}
+    for item in value.split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def _email_digest(match: re.Match) -> str:
+    # A stable short digest still lets one user's lines be correlated
+    return "email:" + hashlib.sha256(match.group(0).lower().encode()).hexdigest()[:10]
+
+
+def redact(text: str) -> str:
+    """Replace email addresses with a digest and drop tokens and API keys"""
+    text = EMAIL_PATTERN.sub(_email_digest, text)
+    for pattern in SECRET_PATTERNS:
+        text = pattern.sub("[redacted]", text)
+    return text
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Redacts PII and credentials from the message, exception text and
+    string `extra` fields. Attached to the output handler, so it runs on
+    the listener thread rather than in the request.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and isinstance(value, str):
+                setattr(record, key, redact(value))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps roughly `rate` of a hot logger's INFO and DEBUG records.
+    Warnings and errors always pass. Attached to the logger itself, so
+    dropped records are never queued.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra=` fields as top-level keys"""
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands records over without formatting them.
+
+    The stock handler renders the full formatted line in the calling
+    thread; here only the message is merged (so later changes to mutable
+    args cannot leak in) and formatting is left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging():
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Request handlers only build a LogRecord and enqueue it; redaction,
+    formatting and the blocking write to stderr happen on the listener
+    thread. Levels, sampling, format and redaction come from settings.
+    Does nothing while the listener is running; after stop_logging() it
+    sets logging up afresh.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    if settings.LOG_REDACT_PII:
+        output.addFilter(RedactingFilter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_RecordQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        for handler in server_logger.handlers[:]:
+            server_logger.removeHandler(handler)
+        server_logger.propagate = True
+
+    for name, level in parse_mapping(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level.upper())
+    for name, rate in parse_mapping(settings.LOG_SAMPLE_RATES).items():
+        sampled = logging.getLogger(name)
+        for existing in [f for f in sampled.filters if isinstance(f, SamplingFilter)]:
+            sampled.removeFilter(existing)
+        sampled.addFilter(SamplingFilter(float(rate)))
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,12 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routers import health, auth, profiles, macro_goals, food_logs, emails
+from backend.config import settings
+from backend.database import close_supabase
+from backend.logging_config import configure_logging, stop_logging
+from backend.repositories import close_storage
+from backend.services.email_outbox import email_outbox, outbox_worker
+from backend.services.email_templates import email_templates
+from backend.services.email_transports import close_transport
+from backend.services.food_catalog import food_catalog
+from backend.services.metrics import MetricsMiddleware
+from backend.services.serialization import FastJSONResponse
+from backend.services.token_verifier import token_verifier
+from backend.routers import health, auth, profiles, macro_goals, food_logs, foods, emails
+
+# Queue-backed logging, set up before anything logs
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage process-wide resources for the lifetime of the app"""
+    # No-op on first start; restarts the log listener if the app is started again
+    configure_logging()
+    # Warn when no JWT secret is configured, before HS256 tokens start failing
+    token_verifier.check_configuration()
+    # Compile email templates once, before the first request needs them
+    email_templates.load()
+    # Build the food search index from the local nutrition table
+    food_catalog.load()
+    # Deliver queued emails in the background
+    await outbox_worker.start()
+    yield
+    await outbox_worker.stop()
+    email_outbox.close()
+    # Close the shared email client's keep-alive connections
+    await close_transport()
+    # Release pooled Supabase connections on shutdown
+    close_supabase()
+    # Close the direct SQLite / Postgres connection, if STORAGE_BACKEND uses one
+    await close_storage()
+    # Flush queued log records
+    stop_logging()
 
 # Create FastAPI app
 app = FastAPI(
     title="Macro Tracking App",
     description="A FastAPI app with organized routers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson encoding, reported to the request metrics as serialization time
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -18,12 +61,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency, DB, auth and serialization time (added last so it wraps CORS too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(profiles.router)
 app.include_router(macro_goals.router)
 app.include_router(food_logs.router)
+app.include_router(foods.router)
 app.include_router(emails.router)
 
 if __name__ == "__main__":
@@ -25,10 +25,12 @@ class TokenResponse(BaseModel):
 # User Profile Models
 class UserProfileCreate(BaseModel):
     display_name: Optional[str] = None
+    timezone: Optional[str] = None  # IANA name, e.g. "America/New_York"; days are bucketed in UTC until set
 
 class UserProfileResponse(BaseModel):
     user_id: str
     display_name: Optional[str]
+    timezone: str = "UTC"
     created_at: str
     updated_at: str
 
@@ -76,6 +78,30 @@ class FoodLogResponse(BaseModel):
     created_at: str
     updated_at: str
 
+class FoodLogBatchItem(FoodLogCreate):
+    idempotency_key: Optional[str] = None
+
+class FoodLogBatchCreate(BaseModel):
+    items: List[FoodLogBatchItem]
+
+class FoodLogBatchItemResult(BaseModel):
+    index: int
+    status: str  # "created", "duplicate" or "error"
+    log: Optional[FoodLogResponse] = None
+    error: Optional[str] = None
+
+class FoodLogBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    failed: int
+    results: List[FoodLogBatchItemResult]
+
+class FoodLogPageResponse(BaseModel):
+    items: List[FoodLogResponse]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    has_more: bool
+
 class FoodLogUpdate(BaseModel):
     meal_type: Optional[str] = None
     food_name: Optional[str] = None
@@ -84,6 +110,35 @@ class FoodLogUpdate(BaseModel):
     carbs: Optional[float] = None
     fat: Optional[float] = None
 
+# Food Search Models
+class FoodSearchResult(BaseModel):
+    name: str
+    serving: Optional[str] = None
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    source: str  # "history" (previously logged by the user) or "catalog"
+
+class FoodSearchResponse(BaseModel):
+    query: str
+    results: List[FoodSearchResult]
+
+# Frequent Foods Models
+class FrequentFood(BaseModel):
+    food_name: str
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    count: int
+    score: float  # log count decayed by FREQUENT_FOODS_HALF_LIFE_DAYS
+    last_logged_at: str
+
+class FrequentFoodsResponse(BaseModel):
+    frequent: List[FrequentFood]
+    recent: List[FrequentFood]
+
 # Food Summary Models
 class MealSummary(BaseModel):
     meal_type: str
@@ -116,6 +171,54 @@ class WeeklySummaryResponse(BaseModel):
     days_with_data: int
     total_days: int
 
+class MonthlyDay(BaseModel):
+    date: str
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    entry_count: int
+    logged: bool
+    calorie_pct: float  # calories as a percentage of the calorie goal, for heatmap shading
+    on_calorie_goal: bool
+    on_all_goals: bool
+
+class MonthlySummaryResponse(BaseModel):
+    year: int
+    month: int
+    month_start: str
+    month_end: str
+    total_days: int
+    days_with_data: int
+    days_on_calorie_goal: int
+    days_on_all_goals: int
+    totals: dict
+    daily_averages: dict
+    goals: dict
+    weeks: List[List[int]]
+    days: List[MonthlyDay]
+
+class MacroSeries(BaseModel):
+    # One value per day of the range; None where there is no data
+    calories: List[Optional[int]]
+    protein: List[Optional[float]]
+    carbs: List[Optional[float]]
+    fat: List[Optional[float]]
+
+class RangeSummaryResponse(BaseModel):
+    start_date: str
+    end_date: str
+    total_days: int
+    days_with_data: int
+    dates: List[str]
+    daily: MacroSeries
+    rolling_7: MacroSeries
+    rolling_30: MacroSeries
+    averages: dict
+    goals: dict
+    adherence: dict
+    streaks: dict
+
 # Email Models
 class EmailRequest(BaseModel):
     to_email: EmailStr
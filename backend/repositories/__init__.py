@@ -0,0 +1,56 @@
+# Repositories package: async data access for the app's tables
+from backend.config import settings
+from backend.repositories.food_logs import FoodLogRepository
+from backend.repositories.macro_goals import MacroGoalsRepository
+from backend.repositories.profiles import ProfileRepository
+from backend.repositories.daily_totals import DailyTotalsRepository
+from backend.repositories.interfaces import FoodLogStore, MacroGoalsStore, ProfileStore, DailyTotalsStore
+
+
+def create_database():
+    if settings.STORAGE_BACKEND == "sqlite":
+        from backend.repositories.sql import SqliteDatabase
+        return SqliteDatabase(settings.SQLITE_PATH)
+    if settings.STORAGE_BACKEND == "postgres":
+        from backend.repositories.sql import PostgresDatabase
+        if not settings.DATABASE_URL:
+            raise RuntimeError("STORAGE_BACKEND=postgres requires DATABASE_URL")
+        return PostgresDatabase(settings.DATABASE_URL, settings.DATABASE_POOL_MIN_SIZE, settings.DB_MAX_CONCURRENCY)
+    if settings.STORAGE_BACKEND != "supabase":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}' (expected supabase, sqlite or postgres)")
+    return None
+
+
+def create_repositories(database=None):
+    """One repository per table for the configured STORAGE_BACKEND"""
+    if database is None:
+        return FoodLogRepository(), MacroGoalsRepository(), ProfileRepository(), DailyTotalsRepository()
+
+    from backend.repositories.sql import (
+        SqlFoodLogRepository, SqlMacroGoalsRepository, SqlProfileRepository, SqlDailyTotalsRepository,
+    )
+    return (
+        SqlFoodLogRepository(database),
+        SqlMacroGoalsRepository(database),
+        SqlProfileRepository(database),
+        SqlDailyTotalsRepository(database),
+    )
+
+
+async def close_storage():
+    """Close the direct database connection, if the storage backend has one"""
+    if storage_database is not None:
+        await storage_database.close()
+
+
+# Direct database connection shared by the SQL repositories (None with STORAGE_BACKEND=supabase)
+storage_database = create_database()
+
+# Shared instances used by the routers
+food_log_repository: FoodLogStore
+macro_goals_repository: MacroGoalsStore
+profile_repository: ProfileStore
+daily_totals_repository: DailyTotalsStore
+food_log_repository, macro_goals_repository, profile_repository, daily_totals_repository = (
+    create_repositories(storage_database)
+)
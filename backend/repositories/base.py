@@ -0,0 +1,59 @@
+from typing import Any, Optional
+from anyio import to_thread, CapacityLimiter
+from supabase import Client
+from backend.database import get_supabase
+from backend.config import settings
+from backend.services.metrics import record_db_call
+import time
+
+# Bounds how many blocking PostgREST calls run in worker threads at once
+_limiter: Optional[CapacityLimiter] = None
+
+
+def get_query_limiter() -> CapacityLimiter:
+    """Return the shared thread-pool limiter, created inside the running event loop"""
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(settings.DB_MAX_CONCURRENCY)
+    return _limiter
+
+
+async def run_query(query) -> Any:
+    """
+    Execute a supabase-py query builder without blocking the event loop.
+
+    supabase-py only ships a synchronous PostgREST client here, so the
+    blocking `.execute()` is offloaded to a bounded worker thread. The
+    event loop keeps serving other requests while the query is in flight.
+    The call, including time spent waiting for a thread, is counted
+    towards the current request's DB metrics.
+    """
+    started = time.perf_counter()
+    try:
+        return await to_thread.run_sync(query.execute, limiter=get_query_limiter())
+    finally:
+        record_db_call(time.perf_counter() - started)
+
+
+def order_by(query, columns, desc: bool = False):
+    """Sort by several columns; PostgREST expects them in one comma-separated `order` parameter"""
+    direction = '.desc' if desc else '.asc'
+    query.params = query.params.set('order', ','.join(column + direction for column in columns))
+    return query
+
+
+class SupabaseRepository:
+    """Base class for repositories backed by a single Supabase table"""
+
+    table_name: str = ""
+
+    def __init__(self, client_name: str = "default"):
+        self.client_name = client_name
+
+    @property
+    def client(self) -> Client:
+        return get_supabase(self.client_name)
+
+    def table(self):
+        """Start a new query builder on this repository's table"""
+        return self.client.table(self.table_name)
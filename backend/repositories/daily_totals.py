@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+from backend.repositories.base import SupabaseRepository, run_query
+
+
+class DailyTotalsRepository(SupabaseRepository):
+    """Data access for the daily_totals rollup table"""
+
+    table_name = "daily_totals"
+
+    async def list_between(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Rollup rows with `start_date <= log_date <= end_date`"""
+        return await self._list_days('*', user_id, start_date, end_date, page_size)
+
+    async def list_day_totals(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Day-level totals (no per-meal breakdown) with `start_date <= log_date <= end_date`"""
+        return await self._list_days('log_date,calories,protein,carbs,fat,entry_count', user_id, start_date, end_date, page_size)
+
+    async def _list_days(self, columns: str, user_id: str, start_date: str, end_date: str, page_size: int) -> List[Dict[str, Any]]:
+        """
+        Rows for `start_date <= log_date <= end_date` ordered by log_date, fetched in
+        log_date keyset pages so multi-year ranges are not cut off by PostgREST's row limit
+        """
+        rows: List[Dict[str, Any]] = []
+        after = None
+        while True:
+            query = self.table().select(columns).eq('user_id', user_id).lte('log_date', end_date)
+            query = query.gt('log_date', after) if after else query.gte('log_date', start_date)
+            response = await run_query(query.order('log_date').limit(page_size))
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            after = str(page[-1]['log_date'])[:10]
+
+    async def apply_delta(self, user_id: str, log_date: str, meal_type: str, delta: Dict[str, Any]):
+        """Add `delta` to the day and meal totals in a single atomic statement"""
+        await run_query(self.client.rpc('apply_daily_totals_delta', {
+            'p_user_id': user_id,
+            'p_log_date': log_date,
+            'p_meal_type': meal_type,
+            'p_calories': delta['calories'],
+            'p_protein': delta['protein'],
+            'p_carbs': delta['carbs'],
+            'p_fat': delta['fat'],
+            'p_entry_count': delta['entry_count'],
+        }))
+
+    async def replace_days(self, rows: List[Dict[str, Any]]):
+        """Overwrite whole rollup rows (used by the rebuild command)"""
+        if rows:
+            await run_query(self.table().upsert(rows, on_conflict='user_id,log_date'))
+
+    async def delete_days(self, user_id: str, log_dates: List[str]):
+        if log_dates:
+            await run_query(self.table().delete().eq('user_id', user_id).in_('log_date', log_dates))
+
+    async def list_digests(
+        self,
+        log_date: str,
+        shard_count: int = 1,
+        shard_index: int = 0,
+        after_user_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of every user's rollup row for `log_date`, with their email
+        and macro goals, ordered by user_id (daily_summary_digests function)
+        """
+        response = await run_query(self.client.rpc('daily_summary_digests', {
+            'p_log_date': log_date,
+            'p_shard_count': shard_count,
+            'p_shard_index': shard_index,
+            'p_after_user_id': after_user_id,
+            'p_limit': limit,
+        }))
+        return response.data or []
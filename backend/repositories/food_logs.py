@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Optional, Tuple
+from backend.repositories.base import SupabaseRepository, run_query, order_by
+
+
+class FoodLogRepository(SupabaseRepository):
+    """Data access for the food_logs table"""
+
+    table_name = "food_logs"
+
+    async def create(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().insert(log))
+        return response.data[0] if response.data else None
+
+    async def insert_many(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert several logs in one multi-row statement.
+
+        Rows whose (user_id, idempotency_key) already exists are skipped;
+        only the rows actually inserted are returned.
+        """
+        response = await run_query(
+            self.table().upsert(logs, on_conflict='user_id,idempotency_key', ignore_duplicates=True)
+        )
+        return response.data or []
+
+    async def list_by_idempotency_keys(self, user_id: str, keys: List[str]) -> List[Dict[str, Any]]:
+        response = await run_query(
+            self.table().select('*').eq('user_id', user_id).in_('idempotency_key', keys)
+        )
+        return response.data or []
+
+    async def get(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await run_query(
+            self.table().select('*').eq('id', log_id).eq('user_id', user_id)
+        )
+        return response.data[0] if response.data else None
+
+    async def list_user_ids(self, page_size: int = 1000) -> List[str]:
+        """
+        Distinct user_ids with at least one food log (requires a service-role key under RLS).
+
+        Pages are keyed on user_id, so each request skips every remaining
+        row of the users already seen and the table is never read in one
+        response that PostgREST's row limit would cut off.
+        """
+        user_ids: List[str] = []
+        while True:
+            query = self.table().select('user_id')
+            if user_ids:
+                query = query.gt('user_id', user_ids[-1])
+            response = await run_query(query.order('user_id').limit(page_size))
+            page = response.data or []
+            for row in page:
+                if not user_ids or row['user_id'] != user_ids[-1]:
+                    user_ids.append(row['user_id'])
+            if len(page) < page_size:
+                return user_ids
+
+    async def list_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[Tuple[str, str]] = None,
+        newer: bool = False,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        meal_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of a user's logs ordered by (logged_at, id).
+
+        Rows strictly older than `cursor` come back newest first; with
+        `newer=True` rows strictly newer than `cursor` come back oldest first.
+        `start <= logged_at < end` and `meal_type` narrow the range.
+        """
+        query = self.table().select('*').eq('user_id', user_id)
+        if start is not None:
+            query = query.gte('logged_at', start)
+        if end is not None:
+            query = query.lt('logged_at', end)
+        if meal_type is not None:
+            query = query.eq('meal_type', meal_type)
+        if cursor is not None:
+            logged_at, log_id = cursor
+            op = 'gt' if newer else 'lt'
+            query = query.or_(
+                f'logged_at.{op}."{logged_at}",and(logged_at.eq."{logged_at}",id.{op}."{log_id}")'
+            )
+
+        query = order_by(query, ['logged_at', 'id'], desc=not newer).limit(limit)
+        response = await run_query(query)
+        return response.data or []
+
+    async def list_macros_between(self, user_id: str, start: str, end: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Only the columns needed for aggregation, for logs with `start <= logged_at < end`,
+        fetched in (logged_at, id) keyset pages so long ranges are not cut off by
+        PostgREST's row limit
+        """
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = (
+                self.table().select('id,logged_at,meal_type,calories,protein,carbs,fat')
+                .eq('user_id', user_id).gte('logged_at', start).lt('logged_at', end)
+            )
+            if rows:
+                logged_at, log_id = rows[-1]['logged_at'], rows[-1]['id']
+                query = query.or_(
+                    f'logged_at.gt."{logged_at}",and(logged_at.eq."{logged_at}",id.gt."{log_id}")'
+                )
+            response = await run_query(order_by(query, ['logged_at', 'id']).limit(page_size))
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
+    async def list_recent_foods(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Name and macros of the user's most recent logs, newest first"""
+        response = await run_query(
+            self.table().select('food_name,calories,protein,carbs,fat,logged_at')
+            .eq('user_id', user_id).order('logged_at', desc=True).limit(limit)
+        )
+        return response.data or []
+
+    async def totals_by_day_and_meal(
+        self, user_id: str, start: str, end: str, timezone: str = "UTC", page_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Per (local log_date, meal_type) totals computed by the food_log_totals database
+        function, fetched in (log_date, meal_type) keyset pages so multi-year ranges are
+        not cut off by PostgREST's row limit
+        """
+        groups: List[Dict[str, Any]] = []
+        while True:
+            query = self.client.rpc('food_log_totals', {
+                'p_user_id': user_id,
+                'p_start': start,
+                'p_end': end,
+                'p_timezone': timezone,
+            })
+            if groups:
+                log_date, meal_type = str(groups[-1]['log_date'])[:10], groups[-1]['meal_type']
+                query = query.or_(
+                    f'log_date.gt.{log_date},and(log_date.eq.{log_date},meal_type.gt."{meal_type}")'
+                )
+            query = order_by(query, ['log_date', 'meal_type'])
+            query.params = query.params.set('limit', str(page_size))
+            response = await run_query(query)
+            page = response.data or []
+            groups.extend(page)
+            if len(page) < page_size:
+                return groups
+
+    async def update(self, log_id: str, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await run_query(
+            self.table().update(data).eq('id', log_id).eq('user_id', user_id)
+        )
+        return response.data[0] if response.data else None
+
+    async def delete(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await run_query(
+            self.table().delete().eq('id', log_id).eq('user_id', user_id)
+        )
+        return response.data[0] if response.data else None
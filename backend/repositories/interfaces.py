@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+# Operations every storage backend provides (STORAGE_BACKEND). Rows are
+# plain dicts shaped like the PostgREST responses: ids, dates and
+# timestamps as ISO strings, `meals` as a dict. List methods return
+# every matching row; `page_size` bounds each round trip where the
+# backend caps response sizes (PostgREST's max-rows).
+
+
+class FoodLogStore(Protocol):
+    async def create(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def insert_many(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
+
+    async def list_by_idempotency_keys(self, user_id: str, keys: List[str]) -> List[Dict[str, Any]]: ...
+
+    async def get(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def list_user_ids(self, page_size: int = 1000) -> List[str]: ...
+
+    async def list_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[Tuple[str, str]] = None,
+        newer: bool = False,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        meal_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    async def list_macros_between(self, user_id: str, start: str, end: str, page_size: int = 1000) -> List[Dict[str, Any]]: ...
+
+    async def list_recent_foods(self, user_id: str, limit: int) -> List[Dict[str, Any]]: ...
+
+    async def totals_by_day_and_meal(
+        self, user_id: str, start: str, end: str, timezone: str = "UTC", page_size: int = 1000
+    ) -> List[Dict[str, Any]]: ...
+
+    async def update(self, log_id: str, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def delete(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+
+class MacroGoalsStore(Protocol):
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def upsert(self, goals: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+
+class ProfileStore(Protocol):
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def get_timezone(self, user_id: str) -> Optional[str]: ...
+
+    async def create(self, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def delete(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+
+class DailyTotalsStore(Protocol):
+    async def list_between(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]: ...
+
+    async def list_day_totals(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]: ...
+
+    async def apply_delta(self, user_id: str, log_date: str, meal_type: str, delta: Dict[str, Any]): ...
+
+    async def replace_days(self, rows: List[Dict[str, Any]]): ...
+
+    async def delete_days(self, user_id: str, log_dates: List[str]): ...
+
+    async def list_digests(
+        self,
+        log_date: str,
+        shard_count: int = 1,
+        shard_index: int = 0,
+        after_user_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]: ...
@@ -0,0 +1,21 @@
+from typing import Any, Dict, Optional
+from backend.repositories.base import SupabaseRepository, run_query
+
+
+class MacroGoalsRepository(SupabaseRepository):
+    """Data access for the macro_goals table"""
+
+    table_name = "macro_goals"
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().select('*').eq('user_id', user_id))
+        return response.data[0] if response.data else None
+
+    async def upsert(self, goals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert the user's goals, or replace them if a row already exists, in one round trip"""
+        response = await run_query(self.table().upsert(goals, on_conflict='user_id'))
+        return response.data[0] if response.data else None
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().update(data).eq('user_id', user_id))
+        return response.data[0] if response.data else None
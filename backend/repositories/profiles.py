@@ -0,0 +1,28 @@
+from typing import Any, Dict, Optional
+from backend.repositories.base import SupabaseRepository, run_query
+
+
+class ProfileRepository(SupabaseRepository):
+    """Data access for the user_profiles table"""
+
+    table_name = "user_profiles"
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().select('*').eq('user_id', user_id))
+        return response.data[0] if response.data else None
+
+    async def get_timezone(self, user_id: str) -> Optional[str]:
+        response = await run_query(self.table().select('timezone').eq('user_id', user_id))
+        return response.data[0].get('timezone') if response.data else None
+
+    async def create(self, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().insert(profile))
+        return response.data[0] if response.data else None
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().update(data).eq('user_id', user_id))
+        return response.data[0] if response.data else None
+
+    async def delete(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await run_query(self.table().delete().eq('user_id', user_id))
+        return response.data[0] if response.data else None
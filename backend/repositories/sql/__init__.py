@@ -0,0 +1,6 @@
+# Direct SQL storage backends (STORAGE_BACKEND=sqlite or postgres)
+from backend.repositories.sql.connection import SqliteDatabase, PostgresDatabase
+from backend.repositories.sql.food_logs import SqlFoodLogRepository
+from backend.repositories.sql.macro_goals import SqlMacroGoalsRepository
+from backend.repositories.sql.profiles import SqlProfileRepository
+from backend.repositories.sql.daily_totals import SqlDailyTotalsRepository
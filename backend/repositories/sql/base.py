@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SqlRepository:
+    """
+    Base class for repositories that talk to a database directly
+    (STORAGE_BACKEND=sqlite or postgres) instead of through PostgREST.
+
+    Column names are checked against `columns` before they are put into
+    a statement, so callers' dicts can be passed straight through as they
+    are to the Supabase repositories. Values are converted to what the
+    database driver expects, and rows come back shaped like PostgREST's.
+    """
+
+    table_name: str = ""
+    columns: Tuple[str, ...] = ()
+    timestamp_columns: Tuple[str, ...] = ('created_at', 'updated_at')
+    date_columns: Tuple[str, ...] = ()
+    json_columns: Tuple[str, ...] = ()
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def dialect(self) -> str:
+        return self.db.dialect
+
+    def _check_columns(self, columns: Sequence[str]):
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown {self.table_name} columns: {', '.join(unknown)}")
+
+    def _value(self, column: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if column in self.timestamp_columns:
+            return self.db.timestamp(value)
+        if column in self.date_columns:
+            return self.db.date(value)
+        if column in self.json_columns:
+            return self.db.json(value)
+        return value
+
+    def _row(self, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        for column in self.json_columns:
+            if isinstance(row.get(column), str):
+                row[column] = json.loads(row[column])
+        return row
+
+    def _rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self._row(row) for row in rows]
+
+    def _values_clause(self, columns: Sequence[str], rows: List[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """`(...), (...)` placeholders and arguments for a multi-row insert"""
+        groups, args = [], []
+        for row in rows:
+            start = len(args) + 1
+            groups.append('(' + ', '.join(f'${start + offset}' for offset in range(len(columns))) + ')')
+            args.extend(self._value(column, row.get(column)) for column in columns)
+        return ', '.join(groups), args
+
+    async def _insert(self, rows: List[Dict[str, Any]], conflict: str = "") -> List[Dict[str, Any]]:
+        """
+        Insert `rows` (all with the same keys) in one statement and return
+        the written rows. `conflict` is an optional `on conflict ...` clause.
+        """
+        columns = list(rows[0])
+        self._check_columns(columns)
+        values, args = self._values_clause(columns, rows)
+        query = (
+            f"insert into {self.table_name} ({', '.join(columns)}) values {values} "
+            f"{conflict} returning *"
+        )
+        return self._rows(await self.db.fetch(query, *args))
+
+    async def _update(self, data: Dict[str, Any], where: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update the row matching every `where` column and return it"""
+        data = {**data, 'updated_at': now()} if 'updated_at' in self.columns else dict(data)
+        self._check_columns(list(data) + list(where))
+        assignments = [f"{column} = ${position}" for position, column in enumerate(data, start=1)]
+        conditions = [f"{column} = ${position}" for position, column in enumerate(where, start=len(data) + 1)]
+        args = [self._value(column, value) for column, value in data.items()]
+        args += [self._value(column, value) for column, value in where.items()]
+        query = (
+            f"update {self.table_name} set {', '.join(assignments)} "
+            f"where {' and '.join(conditions)} returning *"
+        )
+        return self._row(await self.db.fetchrow(query, *args))
+
+    async def _delete(self, where: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self._check_columns(list(where))
+        conditions = [f"{column} = ${position}" for position, column in enumerate(where, start=1)]
+        args = [self._value(column, value) for column, value in where.items()]
+        query = f"delete from {self.table_name} where {' and '.join(conditions)} returning *"
+        return self._row(await self.db.fetchrow(query, *args))
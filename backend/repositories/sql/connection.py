@@ -0,0 +1,227 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from anyio import to_thread
+from backend.repositories.base import get_query_limiter
+from backend.repositories.sql.schema import POSTGRES_SCHEMA, SQLITE_SCHEMA
+from backend.services.day_buckets import local_date, parse_timestamp
+from backend.services.metrics import record_db_call
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Queries are written with Postgres-style $1 placeholders; SQLite spells them ?1
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+@lru_cache(maxsize=1024)
+def _sqlite_query(query: str) -> str:
+    return _PLACEHOLDER.sub(r"?\1", query)
+
+
+# asyncpg's binary `timestamp` value: microseconds since 2000-01-01
+_POSTGRES_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _encode_utc_timestamp(value: datetime) -> Tuple[int]:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return ((value - _POSTGRES_EPOCH) // timedelta(microseconds=1),)
+
+
+def _decode_utc_timestamp(value: Tuple[int]) -> datetime:
+    return _POSTGRES_EPOCH + timedelta(microseconds=value[0])
+
+
+def _plain(value: Any) -> Any:
+    """Column values as PostgREST returns them in JSON"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class SqliteDatabase:
+    """
+    Single-file SQLite database for local development and offline tests.
+
+    One connection is shared by the process and used from worker threads
+    under a lock, as with the email outbox. sqlite3 keeps compiled
+    statements in a per-connection cache, so the fixed query texts used
+    by the repositories are prepared once and reused.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, cached_statements=256
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("pragma journal_mode=wal")
+            connection.execute("pragma synchronous=normal")
+            # Postgres' `(logged_at at time zone tz)::date`, for grouping by the user's local day
+            connection.create_function("local_date", 2, local_date, deterministic=True)
+            connection.executescript(SQLITE_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _fetch(self, query: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(_sqlite_query(query), args).fetchall()]
+
+    def _execute(self, query: str, args: Sequence[Any]):
+        with self._lock:
+            self.connection.execute(_sqlite_query(query), args)
+
+    async def _run(self, function, *args):
+        started = time.perf_counter()
+        try:
+            return await to_thread.run_sync(function, *args, limiter=get_query_limiter())
+        finally:
+            record_db_call(time.perf_counter() - started)
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        return await self._run(self._fetch, query, args)
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def execute(self, query: str, *args: Any):
+        await self._run(self._execute, query, args)
+
+    def timestamp(self, value: Any) -> str:
+        """Timestamps are stored as UTC ISO text with a fixed width, so they sort and compare as text"""
+        return parse_timestamp(value).astimezone(dt_timezone.utc).isoformat(timespec="microseconds")
+
+    def date(self, value: Any) -> str:
+        return str(value)[:10]
+
+    def json(self, value: Any) -> str:
+        return json.dumps(value)
+
+    def any_of(self, column: str, position: int, values: List[Any]) -> Tuple[str, List[Any]]:
+        """`column` equal to any of `values`, with placeholders numbered from `position`"""
+        placeholders = ", ".join(f"${position + offset}" for offset in range(len(values)))
+        return f"{column} in ({placeholders})", list(values)
+
+    async def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class PostgresDatabase:
+    """
+    Postgres through an asyncpg connection pool (requires the optional
+    `asyncpg` package).
+
+    asyncpg prepares each distinct query text on first use and keeps it in
+    the connection's statement cache, so repeated queries skip parsing
+    and planning. The pool is created in the running event loop on first
+    use and sized by DATABASE_POOL_MIN_SIZE and DB_MAX_CONCURRENCY.
+    """
+
+    dialect = "postgres"
+
+    def __init__(self, dsn: str, min_size: int, max_size: int):
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=postgres requires the 'asyncpg' package (pip install asyncpg)")
+
+        self._asyncpg = asyncpg
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+
+    async def _init_connection(self, connection):
+        await connection.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+        # Naive `timestamp` columns (Supabase's food_logs.logged_at) hold UTC, as parse_timestamp assumes
+        await connection.set_type_codec(
+            "timestamp", encoder=_encode_utc_timestamp, decoder=_decode_utc_timestamp,
+            schema="pg_catalog", format="tuple",
+        )
+
+    async def pool(self):
+        if self._pool is None:
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            async with self._pool_lock:
+                if self._pool is None:
+                    pool = await self._asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        init=self._init_connection,
+                        # Naive timestamps (Supabase's food_logs.logged_at) are UTC
+                        server_settings={'timezone': 'UTC'},
+                    )
+                    async with pool.acquire() as connection:
+                        await connection.execute(POSTGRES_SCHEMA)
+                    self._pool = pool
+                    logger.info(f"Created Postgres pool ({self.min_size}-{self.max_size} connections)")
+        return self._pool
+
+    async def fetch(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        pool = await self.pool()
+        started = time.perf_counter()
+        try:
+            records = await pool.fetch(query, *args)
+        finally:
+            record_db_call(time.perf_counter() - started)
+        return [{key: _plain(value) for key, value in record.items()} for record in records]
+
+    async def fetchrow(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def execute(self, query: str, *args: Any):
+        pool = await self.pool()
+        started = time.perf_counter()
+        try:
+            await pool.execute(query, *args)
+        finally:
+            record_db_call(time.perf_counter() - started)
+
+    def timestamp(self, value: Any) -> datetime:
+        return parse_timestamp(value)
+
+    def date(self, value: Any) -> date:
+        return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+    def json(self, value: Any) -> Any:
+        # Encoded by the jsonb codec
+        return value
+
+    def any_of(self, column: str, position: int, values: List[Any]) -> Tuple[str, List[Any]]:
+        return f"{column} = any(${position})", [list(values)]
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
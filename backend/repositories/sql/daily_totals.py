@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Optional
+from backend.repositories.sql.base import SqlRepository, now
+
+# Adds a delta to the day and meal totals in one atomic upsert, as the
+# apply_daily_totals_delta database function does.
+# $1 user_id, $2 log_date, $3 meal_type, $4-$8 deltas, $9 updated_at
+APPLY_DELTA = {
+    'postgres': """
+        insert into daily_totals as d (
+            user_id, log_date, calories, protein, carbs, fat, entry_count, meals, updated_at
+        )
+        values (
+            $1, $2, $4, $5, $6, $7, $8,
+            jsonb_build_object($3::text, jsonb_build_object(
+                'calories', $4::bigint,
+                'protein', $5::double precision,
+                'carbs', $6::double precision,
+                'fat', $7::double precision,
+                'entry_count', $8::integer
+            )),
+            $9
+        )
+        on conflict (user_id, log_date) do update set
+            calories = d.calories + excluded.calories,
+            protein = d.protein + excluded.protein,
+            carbs = d.carbs + excluded.carbs,
+            fat = d.fat + excluded.fat,
+            entry_count = d.entry_count + excluded.entry_count,
+            meals = d.meals || jsonb_build_object($3::text, jsonb_build_object(
+                'calories', coalesce((d.meals -> $3::text ->> 'calories')::bigint, 0) + $4::bigint,
+                'protein', coalesce((d.meals -> $3::text ->> 'protein')::double precision, 0) + $5::double precision,
+                'carbs', coalesce((d.meals -> $3::text ->> 'carbs')::double precision, 0) + $6::double precision,
+                'fat', coalesce((d.meals -> $3::text ->> 'fat')::double precision, 0) + $7::double precision,
+                'entry_count', coalesce((d.meals -> $3::text ->> 'entry_count')::integer, 0) + $8::integer
+            )),
+            updated_at = excluded.updated_at
+    """,
+    'sqlite': """
+        insert into daily_totals as d (
+            user_id, log_date, calories, protein, carbs, fat, entry_count, meals, updated_at
+        )
+        values (
+            $1, $2, $4, $5, $6, $7, $8,
+            json_object($3, json_object(
+                'calories', $4, 'protein', $5, 'carbs', $6, 'fat', $7, 'entry_count', $8
+            )),
+            $9
+        )
+        on conflict (user_id, log_date) do update set
+            calories = d.calories + excluded.calories,
+            protein = d.protein + excluded.protein,
+            carbs = d.carbs + excluded.carbs,
+            fat = d.fat + excluded.fat,
+            entry_count = d.entry_count + excluded.entry_count,
+            -- The meal is looked up (json_each) and merged back (json_patch) by
+            -- key, never spliced into a JSON path, so any meal_type is safe
+            meals = json_patch(d.meals, json_object($3, json_object(
+                'calories', coalesce((select json_extract(value, '$.calories') from json_each(d.meals) where key = $3), 0) + $4,
+                'protein', coalesce((select json_extract(value, '$.protein') from json_each(d.meals) where key = $3), 0) + $5,
+                'carbs', coalesce((select json_extract(value, '$.carbs') from json_each(d.meals) where key = $3), 0) + $6,
+                'fat', coalesce((select json_extract(value, '$.fat') from json_each(d.meals) where key = $3), 0) + $7,
+                'entry_count', coalesce((select json_extract(value, '$.entry_count') from json_each(d.meals) where key = $3), 0) + $8
+            ))),
+            updated_at = excluded.updated_at
+    """,
+}
+
+ROLLUP_COLUMNS = ('user_id', 'log_date', 'calories', 'protein', 'carbs', 'fat', 'entry_count', 'meals', 'updated_at')
+
+
+class SqlDailyTotalsRepository(SqlRepository):
+    """Data access for the daily_totals rollup table over a direct database connection"""
+
+    table_name = "daily_totals"
+    columns = ROLLUP_COLUMNS
+    timestamp_columns = ('updated_at',)
+    date_columns = ('log_date',)
+    json_columns = ('meals',)
+
+    async def list_between(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Rollup rows with `start_date <= log_date <= end_date`"""
+        return self._rows(await self.db.fetch(
+            "select * from daily_totals where user_id = $1 and log_date >= $2 and log_date <= $3 order by log_date",
+            user_id, self.db.date(start_date), self.db.date(end_date),
+        ))
+
+    async def list_day_totals(self, user_id: str, start_date: str, end_date: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Day-level totals (no per-meal breakdown) with `start_date <= log_date <= end_date`.
+        There is no server-side row limit to page around, so `page_size` is unused.
+        """
+        return self._rows(await self.db.fetch(
+            "select log_date, calories, protein, carbs, fat, entry_count from daily_totals "
+            "where user_id = $1 and log_date >= $2 and log_date <= $3 order by log_date",
+            user_id, self.db.date(start_date), self.db.date(end_date),
+        ))
+
+    async def apply_delta(self, user_id: str, log_date: str, meal_type: str, delta: Dict[str, Any]):
+        """Add `delta` to the day and meal totals in a single atomic statement"""
+        await self.db.execute(
+            APPLY_DELTA[self.dialect],
+            user_id,
+            self.db.date(log_date),
+            meal_type,
+            delta['calories'],
+            float(delta['protein']),
+            float(delta['carbs']),
+            float(delta['fat']),
+            delta['entry_count'],
+            self.db.timestamp(now()),
+        )
+
+    async def replace_days(self, rows: List[Dict[str, Any]]):
+        """Overwrite whole rollup rows (used by the rebuild command)"""
+        if not rows:
+            return
+        stamp = now()
+        rows = [{column: row.get(column) for column in ROLLUP_COLUMNS[:-1]} | {'updated_at': stamp} for row in rows]
+        await self._insert(
+            rows,
+            conflict='on conflict (user_id, log_date) do update set '
+            + ', '.join(f"{column} = excluded.{column}" for column in ROLLUP_COLUMNS[2:]),
+        )
+
+    async def delete_days(self, user_id: str, log_dates: List[str]):
+        if not log_dates:
+            return
+        condition, args = self.db.any_of('log_date', 2, [self.db.date(log_date) for log_date in log_dates])
+        await self.db.execute(f"delete from daily_totals where user_id = $1 and {condition}", user_id, *args)
+
+    async def list_digests(
+        self,
+        log_date: str,
+        shard_count: int = 1,
+        shard_index: int = 0,
+        after_user_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of every user's rollup row for `log_date`, with their email
+        and macro goals, ordered by user_id (daily_summary_digests function).
+
+        Email addresses live in Supabase's auth.users, so this needs a
+        Postgres database set up with backend/sql.
+        """
+        if self.dialect != 'postgres':
+            raise RuntimeError(
+                f"Daily summary emails need Supabase Auth's auth.users for email addresses, "
+                f"which STORAGE_BACKEND={self.dialect} does not have"
+            )
+        return self._rows(await self.db.fetch(
+            "select * from daily_summary_digests($1, $2, $3, $4, $5)",
+            self.db.date(log_date), shard_count, shard_index, after_user_id, limit,
+        ))
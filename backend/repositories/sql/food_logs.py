@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Optional, Tuple
+from backend.repositories.sql.base import SqlRepository, now
+
+COLUMNS = (
+    'id', 'user_id', 'meal_type', 'food_name', 'calories', 'protein', 'carbs', 'fat',
+    'logged_at', 'idempotency_key', 'created_at', 'updated_at',
+)
+
+# Per (local log_date, meal_type) totals, as the food_log_totals database function computes them.
+# logged_at is timestamptz in schema.py but a naive UTC timestamp in a Supabase project
+# (backend/sql/007); sessions run with TimeZone=UTC, so the cast reads both as UTC.
+TOTALS_BY_DAY_AND_MEAL = {
+    'postgres': """
+        select
+            (logged_at::timestamptz at time zone $4::text)::date as log_date,
+            meal_type,
+            sum(calories)::bigint as calories,
+            sum(protein)::double precision as protein,
+            sum(carbs)::double precision as carbs,
+            sum(fat)::double precision as fat,
+            count(*) as entry_count
+        from food_logs
+        where user_id = $1 and logged_at >= $2 and logged_at < $3
+        group by 1, 2
+        order by 1, 2
+    """,
+    'sqlite': """
+        select
+            local_date(logged_at, $4) as log_date,
+            meal_type,
+            sum(calories) as calories,
+            total(protein) as protein,
+            total(carbs) as carbs,
+            total(fat) as fat,
+            count(*) as entry_count
+        from food_logs
+        where user_id = $1 and logged_at >= $2 and logged_at < $3
+        group by 1, 2
+        order by 1, 2
+    """,
+}
+
+
+class SqlFoodLogRepository(SqlRepository):
+    """Data access for the food_logs table over a direct database connection"""
+
+    table_name = "food_logs"
+    columns = COLUMNS
+    timestamp_columns = ('logged_at', 'created_at', 'updated_at')
+
+    def _with_defaults(self, log: Dict[str, Any]) -> Dict[str, Any]:
+        """Column defaults PostgREST would get from the table definition"""
+        stamp = now()
+        return {
+            'logged_at': stamp,
+            'idempotency_key': None,
+            **log,
+            'created_at': stamp,
+            'updated_at': stamp,
+        }
+
+    async def create(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = await self._insert([self._with_defaults(log)])
+        return rows[0] if rows else None
+
+    async def insert_many(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert several logs in one multi-row statement.
+
+        Rows whose (user_id, idempotency_key) already exists are skipped;
+        only the rows actually inserted are returned.
+        """
+        if not logs:
+            return []
+        return await self._insert(
+            [self._with_defaults(log) for log in logs],
+            conflict='on conflict (user_id, idempotency_key) do nothing',
+        )
+
+    async def list_by_idempotency_keys(self, user_id: str, keys: List[str]) -> List[Dict[str, Any]]:
+        if not keys:
+            return []
+        condition, args = self.db.any_of('idempotency_key', 2, keys)
+        return await self.db.fetch(f"select * from food_logs where user_id = $1 and {condition}", user_id, *args)
+
+    async def get(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.fetchrow("select * from food_logs where id = $1 and user_id = $2", log_id, user_id)
+
+    async def list_user_ids(self, page_size: int = 1000) -> List[str]:
+        """Distinct user_ids with at least one food log (no row limit to page around)"""
+        rows = await self.db.fetch("select distinct user_id from food_logs order by user_id")
+        return [row['user_id'] for row in rows]
+
+    async def list_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[Tuple[str, str]] = None,
+        newer: bool = False,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        meal_type: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        One keyset page of a user's logs ordered by (logged_at, id).
+
+        Rows strictly older than `cursor` come back newest first; with
+        `newer=True` rows strictly newer than `cursor` come back oldest first.
+        `start <= logged_at < end` and `meal_type` narrow the range. The row
+        comparison on (logged_at, id) is a range scan of the
+        food_logs_user_logged_at_id_idx index.
+        """
+        conditions, args = ["user_id = $1"], [user_id]
+
+        def bind(value: Any) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if start is not None:
+            conditions.append(f"logged_at >= {bind(self.db.timestamp(start))}")
+        if end is not None:
+            conditions.append(f"logged_at < {bind(self.db.timestamp(end))}")
+        if meal_type is not None:
+            conditions.append(f"meal_type = {bind(meal_type)}")
+        if cursor is not None:
+            logged_at, log_id = cursor
+            op = '>' if newer else '<'
+            conditions.append(f"(logged_at, id) {op} ({bind(self.db.timestamp(logged_at))}, {bind(log_id)})")
+
+        direction = 'asc' if newer else 'desc'
+        query = (
+            f"select * from food_logs where {' and '.join(conditions)} "
+            f"order by logged_at {direction}, id {direction} limit {bind(limit)}"
+        )
+        return await self.db.fetch(query, *args)
+
+    async def list_macros_between(self, user_id: str, start: str, end: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        """Only the columns needed for aggregation, for logs with `start <= logged_at < end`"""
+        return await self.db.fetch(
+            "select logged_at, meal_type, calories, protein, carbs, fat from food_logs "
+            "where user_id = $1 and logged_at >= $2 and logged_at < $3",
+            user_id, self.db.timestamp(start), self.db.timestamp(end),
+        )
+
+    async def list_recent_foods(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Name and macros of the user's most recent logs, newest first"""
+        return await self.db.fetch(
+            "select food_name, calories, protein, carbs, fat, logged_at from food_logs "
+            "where user_id = $1 order by logged_at desc limit $2",
+            user_id, limit,
+        )
+
+    async def totals_by_day_and_meal(
+        self, user_id: str, start: str, end: str, timezone: str = "UTC", page_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Per (local log_date, meal_type) totals, grouped in the database"""
+        return await self.db.fetch(
+            TOTALS_BY_DAY_AND_MEAL[self.dialect],
+            user_id, self.db.timestamp(start), self.db.timestamp(end), timezone,
+        )
+
+    async def update(self, log_id: str, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._update(data, {'id': log_id, 'user_id': user_id})
+
+    async def delete(self, log_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._delete({'id': log_id, 'user_id': user_id})
@@ -0,0 +1,26 @@
+from typing import Any, Dict, Optional
+from backend.repositories.sql.base import SqlRepository, now
+
+
+class SqlMacroGoalsRepository(SqlRepository):
+    """Data access for the macro_goals table over a direct database connection"""
+
+    table_name = "macro_goals"
+    columns = ('user_id', 'total_calories', 'protein_pct', 'carb_pct', 'fat_pct', 'created_at', 'updated_at')
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.fetchrow("select * from macro_goals where user_id = $1", user_id)
+
+    async def upsert(self, goals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert the user's goals, or replace them if a row already exists, in one round trip"""
+        stamp = now()
+        replaced = [column for column in goals if column != 'user_id'] + ['updated_at']
+        rows = await self._insert(
+            [{**goals, 'created_at': stamp, 'updated_at': stamp}],
+            conflict='on conflict (user_id) do update set '
+            + ', '.join(f"{column} = excluded.{column}" for column in replaced),
+        )
+        return rows[0] if rows else None
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._update(data, {'user_id': user_id})
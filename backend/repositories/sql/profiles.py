@@ -0,0 +1,27 @@
+from typing import Any, Dict, Optional
+from backend.repositories.sql.base import SqlRepository, now
+
+
+class SqlProfileRepository(SqlRepository):
+    """Data access for the user_profiles table over a direct database connection"""
+
+    table_name = "user_profiles"
+    columns = ('user_id', 'display_name', 'timezone', 'created_at', 'updated_at')
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.fetchrow("select * from user_profiles where user_id = $1", user_id)
+
+    async def get_timezone(self, user_id: str) -> Optional[str]:
+        row = await self.db.fetchrow("select timezone from user_profiles where user_id = $1", user_id)
+        return row.get('timezone') if row else None
+
+    async def create(self, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        stamp = now()
+        rows = await self._insert([{**profile, 'created_at': stamp, 'updated_at': stamp}])
+        return rows[0] if rows else None
+
+    async def update(self, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._update(data, {'user_id': user_id})
+
+    async def delete(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._delete({'user_id': user_id})
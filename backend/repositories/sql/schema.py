@@ -0,0 +1,115 @@
+# Tables and indexes for the direct SQL storage backends. Statements are
+# idempotent and run when the first connection is opened. On a database
+# already set up with backend/sql (a Supabase project) they change nothing.
+# There food_logs.logged_at is a naive timestamp holding UTC rather than the
+# timestamptz created here; PostgresDatabase reads and writes naive
+# timestamps as UTC, so queries behave the same on either.
+#
+# Every read filters on user_id first, so each index leads with it:
+#   food_logs (user_id, logged_at, id): keyset pages, day ranges, recent foods
+#   food_logs (user_id, idempotency_key): batch retries
+#   daily_totals (user_id, log_date): summary ranges
+
+SQLITE_SCHEMA = """
+create table if not exists user_profiles (
+    user_id text primary key,
+    display_name text,
+    timezone text not null default 'UTC',
+    created_at text not null,
+    updated_at text not null
+);
+
+create table if not exists macro_goals (
+    user_id text primary key,
+    total_calories integer not null,
+    protein_pct real not null,
+    carb_pct real not null,
+    fat_pct real not null,
+    created_at text not null,
+    updated_at text not null
+);
+
+create table if not exists food_logs (
+    id text primary key,
+    user_id text not null,
+    meal_type text not null,
+    food_name text not null,
+    calories integer not null,
+    protein real not null,
+    carbs real not null,
+    fat real not null,
+    logged_at text not null,
+    idempotency_key text,
+    created_at text not null,
+    updated_at text not null,
+    unique (user_id, idempotency_key)
+);
+
+create index if not exists food_logs_user_logged_at_id_idx
+    on food_logs (user_id, logged_at, id);
+
+create table if not exists daily_totals (
+    user_id text not null,
+    log_date text not null,
+    calories integer not null default 0,
+    protein real not null default 0,
+    carbs real not null default 0,
+    fat real not null default 0,
+    entry_count integer not null default 0,
+    meals text not null default '{}',
+    updated_at text not null,
+    primary key (user_id, log_date)
+) without rowid;
+"""
+
+POSTGRES_SCHEMA = """
+create table if not exists user_profiles (
+    user_id uuid primary key,
+    display_name text,
+    timezone text not null default 'UTC',
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists macro_goals (
+    user_id uuid primary key,
+    total_calories integer not null,
+    protein_pct double precision not null,
+    carb_pct double precision not null,
+    fat_pct double precision not null,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists food_logs (
+    id uuid primary key,
+    user_id uuid not null,
+    meal_type text not null,
+    food_name text not null,
+    calories integer not null,
+    protein double precision not null,
+    carbs double precision not null,
+    fat double precision not null,
+    logged_at timestamptz not null default now(),
+    idempotency_key text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    constraint food_logs_user_idempotency_key_key unique (user_id, idempotency_key)
+);
+
+create index if not exists food_logs_user_logged_at_id_idx
+    on food_logs (user_id, logged_at desc, id desc);
+
+create table if not exists daily_totals (
+    user_id uuid not null,
+    log_date date not null,
+    calories bigint not null default 0,
+    protein double precision not null default 0,
+    carbs double precision not null default 0,
+    fat double precision not null default 0,
+    entry_count integer not null default 0,
+    meals jsonb not null default '{}'::jsonb,
+    updated_at timestamptz not null default now(),
+    primary key (user_id, log_date)
+);
+"""
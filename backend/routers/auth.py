@@ -1,27 +1,14 @@
 from fastapi import APIRouter, status, HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.models import UserSignupRequest, UserLoginRequest, UserResponse, TokenResponse
-from backend.services.auth_service import AuthService
-from backend.services.email_service import EmailService
+from backend.dependencies import get_current_user
+from backend.services.auth_service import get_auth_service
+from backend.services.email_service import get_email_service
 from backend.models import PasswordResetRequest
+import logging
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
-auth_service = AuthService()
-email_service = EmailService()
-security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Dependency to get current user from JWT token"""
-    token = credentials.credentials
-    result = await auth_service.get_current_user(token)
-    
-    if not result["success"]:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=result["error"]
-        )
-    
-    return result
+router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserSignupRequest):
@@ -30,7 +17,7 @@ async def signup(user_data: UserSignupRequest):
     
     This creates a real user in the auth.users table.
     """
-    result = await auth_service.signup_user(user_data.email, user_data.password)
+    result = await get_auth_service().signup_user(user_data.email, user_data.password)
     
     if not result["success"]:
         raise HTTPException(
@@ -38,12 +25,11 @@ async def signup(user_data: UserSignupRequest):
             detail=result["error"]
         )
     
-    # Send welcome email
-    try:
-        await email_service.send_welcome_email(user_data.email, user_data.email.split('@')[0])
-    except Exception as e:
+    # Queue welcome email; the outbox worker delivers it in the background
+    email_result = await get_email_service().queue_welcome_email(user_data.email, user_data.email.split('@')[0])
+    if not email_result["success"]:
         # Don't fail signup if email fails
-        print(f"Warning: Failed to send welcome email: {str(e)}")
+        logger.warning(f"Failed to queue welcome email: {email_result['message']}")
     
     return TokenResponse(
         access_token="signup_successful",  # In real app, this would be the actual token
@@ -59,7 +45,7 @@ async def login(user_data: UserLoginRequest):
     
     This verifies credentials against Supabase Auth.
     """
-    result = await auth_service.login_user(user_data.email, user_data.password)
+    result = await get_auth_service().login_user(user_data.email, user_data.password)
     
     if not result["success"]:
         raise HTTPException(
@@ -83,20 +69,22 @@ async def request_password_reset(reset_data: PasswordResetRequest):
         # Generate a simple reset token (in production, use proper JWT)
         reset_token = f"reset_{reset_data.email}_{hash(reset_data.email)}"
         
-        # Send password reset email
-        result = await email_service.send_password_reset_email(reset_data.email, reset_token)
+        # Queue password reset email for background delivery
+        result = await get_email_service().queue_password_reset_email(reset_data.email, reset_token)
         
         if result["success"]:
             return {
                 "success": True,
-                "message": "Password reset email sent successfully"
+                "message": "Password reset email queued for delivery"
             }
         else:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to send password reset email: {result['message']}"
+                detail=f"Failed to queue password reset email: {result['message']}"
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from backend.services.email_service import EmailService
+from backend.services.email_service import get_email_service
 from backend.config import settings
 
 router = APIRouter(prefix="/emails", tags=["emails"])
@@ -10,13 +10,11 @@ async def test_sendgrid_connection():
     Test SendGrid connection by sending a test email
     """
     try:
-        email_service = EmailService()
-        
         # Test email address - CHANGE THIS TO YOUR ACTUAL EMAIL
         test_email = "nilanikhita@gmail.com"  # Replace with your real email
         
         # Test the SendGrid connection
-        result = await email_service.test_connection(test_email)
+        result = await get_email_service().test_connection(test_email)
         
         if result["success"]:
             return {
@@ -1,14 +1,38 @@
-from fastapi import APIRouter, status, HTTPException, Depends
-from backend.models import FoodLogCreate, FoodLogResponse, FoodLogUpdate, DailySummaryResponse, WeeklySummaryResponse
-from backend.database import get_supabase
-from backend.routers.auth import get_current_user
+from fastapi import APIRouter, status, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from backend.models import FoodLogCreate, FoodLogResponse, FoodLogUpdate, FoodLogPageResponse, FoodLogBatchCreate, FoodLogBatchResponse, FrequentFoodsResponse, DailySummaryResponse, WeeklySummaryResponse, MonthlySummaryResponse, RangeSummaryResponse
+from backend.repositories import food_log_repository
+from backend.dependencies import get_current_user
+from backend.config import settings
+from backend.services.aggregation_service import daily_summary, totals_by_date
+from backend.services.rollup_service import rollup_service
+from backend.services.trend_service import lookback_start, monthly_summary, range_trends
+from backend.services.batch_ingest_service import ingest_food_logs
+from backend.services.goals_cache import goals_cache
+from backend.services.timezone_cache import timezone_cache
+from backend.services.day_buckets import local_today, utc_range
+from backend.services.food_catalog import food_catalog
+from backend.services.frequent_foods import frequent_foods
+from backend.services.export_service import EXPORT_FORMATS, stream_food_logs, gzip_stream
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, decode_cursor, encode_cursor
+from backend.services.serialization import ResponseSerializer
 from uuid import uuid4
-from typing import List
-from datetime import datetime, timedelta
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 import calendar
 
 router = APIRouter(prefix="/food-logs", tags=["food logs"])
 
+# Response models are validated and encoded straight from plain dicts
+food_log_serializer = ResponseSerializer(FoodLogResponse)
+page_serializer = ResponseSerializer(FoodLogPageResponse)
+batch_serializer = ResponseSerializer(FoodLogBatchResponse)
+frequent_serializer = ResponseSerializer(FrequentFoodsResponse)
+daily_summary_serializer = ResponseSerializer(DailySummaryResponse)
+weekly_summary_serializer = ResponseSerializer(WeeklySummaryResponse)
+monthly_summary_serializer = ResponseSerializer(MonthlySummaryResponse)
+range_summary_serializer = ResponseSerializer(RangeSummaryResponse)
+
 @router.post("/", response_model=FoodLogResponse, status_code=status.HTTP_201_CREATED)
 async def create_food_log(
     log_data: FoodLogCreate,
@@ -18,11 +42,10 @@ async def create_food_log(
     Log a new food item for the current user.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
         # Insert new food log
-        response = supabase.table('food_logs').insert({
+        log = await food_log_repository.create({
             'id': str(uuid4()),
             'user_id': user_id,
             'meal_type': log_data.meal_type,
@@ -31,23 +54,13 @@ async def create_food_log(
             'protein': log_data.protein,
             'carbs': log_data.carbs,
             'fat': log_data.fat
-        }).execute()
-        
-        if response.data:
-            log = response.data[0]
-            return FoodLogResponse(
-                id=log['id'],
-                user_id=log['user_id'],
-                meal_type=log['meal_type'],
-                food_name=log['food_name'],
-                calories=log['calories'],
-                protein=log['protein'],
-                carbs=log['carbs'],
-                fat=log['fat'],
-                logged_at=log['logged_at'],
-                created_at=log['created_at'],
-                updated_at=log['updated_at']
-            )
+        })
+        
+        if log:
+            await rollup_service.record_created(log)
+            food_catalog.record_logged([log])
+            frequent_foods.record_created([log])
+            return food_log_serializer.response(log, status_code=status.HTTP_201_CREATED)
         else:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -59,36 +72,122 @@ async def create_food_log(
             detail=f"Error creating food log: {str(e)}"
         )
 
-@router.get("/", response_model=List[FoodLogResponse])
-async def get_food_logs(current_user: dict = Depends(get_current_user)):
+@router.post("/batch", response_model=FoodLogBatchResponse)
+async def create_food_logs_batch(
+    batch: FoodLogBatchCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Log many food items in one request.
+    
+    Items are validated together and written with chunked multi-row inserts.
+    Items with an `idempotency_key` that was already stored are reported as
+    duplicates instead of being inserted again, so a batch can be retried safely.
+    """
+    if not batch.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No food logs provided"
+        )
+    
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch can contain at most {settings.BATCH_MAX_ITEMS} food logs"
+        )
+    
+    try:
+        results = await ingest_food_logs(current_user["user_id"], batch.items)
+        
+        return batch_serializer.response({
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+            'failed': sum(1 for result in results if result['status'] == 'error'),
+            'results': results
+        })
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating food logs: {str(e)}"
+        )
+
+def _parse_day(value: str, param: str) -> datetime:
+    """Parse a YYYY-MM-DD query parameter, rejecting anything else with a 400"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"'{param}' must be a date in YYYY-MM-DD format"
+        )
+
+@router.get("/", response_model=FoodLogPageResponse)
+async def get_food_logs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    meal_type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Get all food logs for the current user.
+    Get one page of food logs for the current user, newest first.
+    
+    Pass `next_cursor` back as `before` to load older entries and
+    `prev_cursor` as `after` to load newer ones. `from`/`to` (YYYY-MM-DD,
+    inclusive) and `meal_type` filter the results.
     """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'before' or 'after', not both"
+        )
+    
+    try:
+        cursor = decode_cursor(before or after) if (before or after) else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    from_day = _parse_day(from_date, "from").strftime("%Y-%m-%d") if from_date else None
+    to_day = _parse_day(to_date, "to").strftime("%Y-%m-%d") if to_date else None
+    
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
-        response = supabase.table('food_logs').select('*').eq('user_id', user_id).order('logged_at', desc=True).execute()
-        
-        if response.data:
-            return [
-                FoodLogResponse(
-                    id=log['id'],
-                    user_id=log['user_id'],
-                    meal_type=log['meal_type'],
-                    food_name=log['food_name'],
-                    calories=log['calories'],
-                    protein=log['protein'],
-                    carbs=log['carbs'],
-                    fat=log['fat'],
-                    logged_at=log['logged_at'],
-                    created_at=log['created_at'],
-                    updated_at=log['updated_at']
-                )
-                for log in response.data
-            ]
+        # Whole local days in the user's time zone, as half-open UTC bounds
+        start = end = None
+        if from_day or to_day:
+            user_timezone = await timezone_cache.get(user_id)
+            start = utc_range(from_day, from_day, user_timezone)[0] if from_day else None
+            end = utc_range(to_day, to_day, user_timezone)[1] if to_day else None
+        newer = after is not None
+        
+        # Fetch one extra row to learn whether another page exists
+        logs = await food_log_repository.list_page(
+            user_id, limit + 1, cursor=cursor, newer=newer,
+            start=start, end=end, meal_type=meal_type
+        )
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+        
+        if newer:
+            # Newer pages are fetched oldest first; present them newest first
+            logs.reverse()
+            next_cursor = encode_cursor(logs[-1]) if logs else None
+            prev_cursor = encode_cursor(logs[0]) if logs and has_more else None
         else:
-            return []
+            next_cursor = encode_cursor(logs[-1]) if logs and has_more else None
+            prev_cursor = encode_cursor(logs[0]) if logs and cursor else None
+        
+        # Rows go straight into the page's JSON without building models first
+        return page_serializer.response({
+            'items': logs,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'has_more': has_more
+        })
             
     except Exception as e:
         raise HTTPException(
@@ -96,6 +195,33 @@ async def get_food_logs(current_user: dict = Depends(get_current_user)):
             detail=f"Error retrieving food logs: {str(e)}"
         )
 
+@router.get("/export")
+async def export_food_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export the current user's full food log history as NDJSON or CSV.
+    
+    Rows are streamed from the database in chunks, so memory use stays
+    flat regardless of history size. Set `gzip=true` to compress the stream.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"food-logs.{extension}"
+    body = stream_food_logs(current_user["user_id"], format)
+    
+    if gzip:
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.put("/{log_id}", response_model=FoodLogResponse)
 async def update_food_log(
     log_id: str,
@@ -106,7 +232,6 @@ async def update_food_log(
     Update a food log entry for the current user.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
         # Build update data with only provided fields
@@ -130,23 +255,19 @@ async def update_food_log(
                 detail="No fields provided for update"
             )
         
-        response = supabase.table('food_logs').update(update_data).eq('id', log_id).eq('user_id', user_id).execute()
-        
-        if response.data:
-            log = response.data[0]
-            return FoodLogResponse(
-                id=log['id'],
-                user_id=log['user_id'],
-                meal_type=log['meal_type'],
-                food_name=log['food_name'],
-                calories=log['calories'],
-                protein=log['protein'],
-                carbs=log['carbs'],
-                fat=log['fat'],
-                logged_at=log['logged_at'],
-                created_at=log['created_at'],
-                updated_at=log['updated_at']
-            )
+        # The rollup and frequent food counters need the previous values to apply the change as a delta
+        previous = await food_log_repository.get(log_id, user_id)
+        
+        log = await food_log_repository.update(log_id, user_id, update_data)
+        
+        if log:
+            if previous:
+                await rollup_service.record_updated(previous, log)
+                frequent_foods.record_updated(previous, log)
+            else:
+                frequent_foods.invalidate_user(user_id)
+            food_catalog.invalidate_user(user_id)
+            return food_log_serializer.response(log)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -170,16 +291,19 @@ async def delete_food_log(
     Delete a food log entry for the current user.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
-        response = supabase.table('food_logs').delete().eq('id', log_id).eq('user_id', user_id).execute()
+        deleted = await food_log_repository.delete(log_id, user_id)
         
-        if not response.data:
+        if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Food log not found or you don't have permission to delete it"
             )
+        
+        await rollup_service.record_deleted(deleted)
+        food_catalog.invalidate_user(user_id)
+        frequent_foods.record_deleted(deleted)
             
     except HTTPException:
         raise
@@ -189,6 +313,44 @@ async def delete_food_log(
             detail=f"Error deleting food log: {str(e)}"
         )
 
+@router.get("/frequent", response_model=FrequentFoodsResponse)
+async def get_frequent_foods(
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    The current user's most often and most recently logged foods, for quick re-logging.
+    
+    The same food name with the same macros counts as one food. Frequency
+    is a decayed count, so foods logged lately outrank old habits.
+    """
+    try:
+        frequencies = await frequent_foods.for_user(current_user["user_id"])
+        now = datetime.now(timezone.utc).timestamp()
+        
+        def to_response(food):
+            return {
+                'food_name': food.food_name,
+                'calories': food.calories,
+                'protein': food.protein,
+                'carbs': food.carbs,
+                'fat': food.fat,
+                'count': food.count,
+                'score': round(frequencies.decayed_count(food, now), 3),
+                'last_logged_at': datetime.fromtimestamp(food.last_logged_at, timezone.utc).isoformat()
+            }
+        
+        return frequent_serializer.response({
+            'frequent': [to_response(food) for food in frequencies.most_frequent(limit)],
+            'recent': [to_response(food) for food in frequencies.most_recent(limit)]
+        })
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting frequent foods: {str(e)}"
+        )
+
 @router.get("/summary/daily", response_model=DailySummaryResponse)
 async def get_daily_summary(
     date: str = None,
@@ -196,84 +358,24 @@ async def get_daily_summary(
 ):
     """
     Get daily macro summary for the current user.
-    If no date is provided, uses today's date.
+    If no date is provided, uses today's date in the user's time zone.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
-        # Use provided date or today's date
+        # Use provided date or the user's local date
         if date is None:
-            target_date = datetime.now().strftime("%Y-%m-%d")
+            target_date = local_today(await timezone_cache.get(user_id)).isoformat()
         else:
             target_date = date
         
-        # Get food logs for the specified date
-        start_of_day = f"{target_date}T00:00:00"
-        end_of_day = f"{target_date}T23:59:59"
-        
-        response = supabase.table('food_logs').select('*').eq('user_id', user_id).gte('logged_at', start_of_day).lte('logged_at', end_of_day).execute()
-        
-        # Calculate totals
-        total_calories = 0
-        total_protein = 0
-        total_carbs = 0
-        total_fat = 0
-        meals = []
-        
-        if response.data:
-            for log in response.data:
-                total_calories += log['calories']
-                total_protein += log['protein']
-                total_carbs += log['carbs']
-                total_fat += log['fat']
-                
-                meals.append({
-                    'meal_type': log['meal_type'],
-                    'calories': log['calories'],
-                    'protein': log['protein'],
-                    'carbs': log['carbs'],
-                    'fat': log['fat']
-                })
-        
-        # Get user's macro goals
-        goals_response = supabase.table('macro_goals').select('*').eq('user_id', user_id).execute()
-        
-        if goals_response.data:
-            goals = goals_response.data[0]
-            goal_calories = goals['total_calories']
-            goal_protein = (goals['protein_pct'] / 100) * goal_calories / 4  # Convert percentage to grams
-            goal_carbs = (goals['carb_pct'] / 100) * goal_calories / 4
-            goal_fat = (goals['fat_pct'] / 100) * goal_calories / 9
-        else:
-            # Default goals if none set
-            goal_calories = 2000
-            goal_protein = 150.0
-            goal_carbs = 200.0
-            goal_fat = 67.0
-        
-        # Calculate remaining macros
-        calories_remaining = max(0, goal_calories - total_calories)
-        protein_remaining = max(0, goal_protein - total_protein)
-        carbs_remaining = max(0, goal_carbs - total_carbs)
-        fat_remaining = max(0, goal_fat - total_fat)
-        
-        return DailySummaryResponse(
-            date=target_date,
-            total_calories=total_calories,
-            total_protein=round(total_protein, 1),
-            total_carbs=round(total_carbs, 1),
-            total_fat=round(total_fat, 1),
-            goal_calories=goal_calories,
-            goal_protein=round(goal_protein, 1),
-            goal_carbs=round(goal_carbs, 1),
-            goal_fat=round(goal_fat, 1),
-            calories_remaining=calories_remaining,
-            protein_remaining=round(protein_remaining, 1),
-            carbs_remaining=round(carbs_remaining, 1),
-            fat_remaining=round(fat_remaining, 1),
-            meals=meals
-        )
+        # Per-meal totals for the day from the daily rollup
+        groups = await rollup_service.totals(user_id, target_date, target_date)
+        
+        # Get user's macro goals (in grams), cached per user
+        goals = await goals_cache.get_goal_grams(user_id)
+        
+        return daily_summary_serializer.response(daily_summary(target_date, groups, goals))
         
     except Exception as e:
         raise HTTPException(
@@ -288,15 +390,14 @@ async def get_weekly_summary(
 ):
     """
     Get weekly macro summary for the current user.
-    If no week_start is provided, uses the current week.
+    If no week_start is provided, uses the current week in the user's time zone.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
         # Calculate week start and end dates
         if week_start is None:
-            today = datetime.now()
+            today = local_today(await timezone_cache.get(user_id))
             week_start_date = today - timedelta(days=today.weekday())
             week_start = week_start_date.strftime("%Y-%m-%d")
         
@@ -304,28 +405,12 @@ async def get_weekly_summary(
         week_end_date = week_start_date + timedelta(days=6)
         week_end = week_end_date.strftime("%Y-%m-%d")
         
-        # Get food logs for the week
-        start_of_week = f"{week_start}T00:00:00"
-        end_of_week = f"{week_end}T23:59:59"
-        
-        response = supabase.table('food_logs').select('*').eq('user_id', user_id).gte('logged_at', start_of_week).lte('logged_at', end_of_week).execute()
+        # Per-day totals for the week from the daily rollup
+        groups = await rollup_service.totals(user_id, week_start, week_end)
         
         # Calculate daily totals
-        daily_totals = {}
-        days_with_data = set()
-        
-        if response.data:
-            for log in response.data:
-                log_date = log['logged_at'][:10]  # Extract date part
-                days_with_data.add(log_date)
-                
-                if log_date not in daily_totals:
-                    daily_totals[log_date] = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
-                
-                daily_totals[log_date]['calories'] += log['calories']
-                daily_totals[log_date]['protein'] += log['protein']
-                daily_totals[log_date]['carbs'] += log['carbs']
-                daily_totals[log_date]['fat'] += log['fat']
+        daily_totals = totals_by_date(groups)
+        days_with_data = set(daily_totals)
         
         # Calculate averages
         if daily_totals:
@@ -345,21 +430,12 @@ async def get_weekly_summary(
         else:
             daily_averages = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0}
         
-        # Get user's macro goals
-        goals_response = supabase.table('macro_goals').select('*').eq('user_id', user_id).execute()
-        
-        if goals_response.data:
-            goals = goals_response.data[0]
-            goal_calories = goals['total_calories']
-            goal_protein = (goals['protein_pct'] / 100) * goal_calories / 4
-            goal_carbs = (goals['carb_pct'] / 100) * goal_calories / 4
-            goal_fat = (goals['fat_pct'] / 100) * goal_calories / 9
-        else:
-            # Default goals if none set
-            goal_calories = 2000
-            goal_protein = 150.0
-            goal_carbs = 200.0
-            goal_fat = 67.0
+        # Get user's macro goals (in grams), cached per user
+        goals = await goals_cache.get_goal_grams(user_id)
+        goal_calories = goals['calories']
+        goal_protein = goals['protein']
+        goal_carbs = goals['carbs']
+        goal_fat = goals['fat']
         
         goal_averages = {
             'calories': goal_calories,
@@ -368,17 +444,123 @@ async def get_weekly_summary(
             'fat': round(goal_fat, 1)
         }
         
-        return WeeklySummaryResponse(
-            week_start=week_start,
-            week_end=week_end,
-            daily_averages=daily_averages,
-            goal_averages=goal_averages,
-            days_with_data=len(days_with_data),
-            total_days=7
-        )
+        return weekly_summary_serializer.response({
+            'week_start': week_start,
+            'week_end': week_end,
+            'daily_averages': daily_averages,
+            'goal_averages': goal_averages,
+            'days_with_data': len(days_with_data),
+            'total_days': 7
+        })
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error getting weekly summary: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/summary/monthly", response_model=MonthlySummaryResponse)
+async def get_monthly_summary(
+    month: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get every day of a calendar month for the current user in one call.
+    If no month (YYYY-MM) is provided, uses the current month in the user's time zone.
+    
+    Each day carries its totals and whether it was within
+    TREND_GOAL_TOLERANCE of the calorie goal and of all macro goals, plus
+    a Monday-first week grid for rendering a calendar heatmap.
+    """
+    try:
+        user_id = current_user["user_id"]
+        
+        if month is None:
+            month = local_today(await timezone_cache.get(user_id)).strftime("%Y-%m")
+        
+        try:
+            month_start_date = datetime.strptime(month, "%Y-%m")
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="month must be in YYYY-MM format"
+            )
+        
+        year, month_number = month_start_date.year, month_start_date.month
+        days_in_month = calendar.monthrange(year, month_number)[1]
+        month_start = month_start_date.strftime("%Y-%m-%d")
+        month_end = month_start_date.replace(day=days_in_month).strftime("%Y-%m-%d")
+        
+        # One rollup read for the whole month, bucketed in-process
+        rows = await rollup_service.day_totals(user_id, month_start, month_end)
+        goals = await goals_cache.get_goal_grams(user_id)
+        
+        return monthly_summary_serializer.response(monthly_summary(
+            rows, year, month_number, goals, settings.TREND_GOAL_TOLERANCE
+        ))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting monthly summary: {str(e)}"
+        )
+
+@router.get("/summary/range", response_model=RangeSummaryResponse)
+async def get_range_summary(
+    start_date: str = None,
+    end_date: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get macro trends for the current user over any range of days (up to TREND_MAX_DAYS).
+    If no dates are provided, covers the 90 days ending today in the user's time zone.
+    
+    Returns per-day totals, rolling 7- and 30-day averages, the share of
+    logged days within TREND_GOAL_TOLERANCE of each goal, and logging and
+    calorie-goal streaks.
+    """
+    try:
+        user_id = current_user["user_id"]
+        today = local_today(await timezone_cache.get(user_id)).isoformat()
+        
+        try:
+            end = datetime.strptime(end_date or today, "%Y-%m-%d")
+            start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else end - timedelta(days=89)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Dates must be in YYYY-MM-DD format"
+            )
+        
+        if start > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_date must not be after end_date"
+            )
+        if (end - start).days + 1 > settings.TREND_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A range can cover at most {settings.TREND_MAX_DAYS} days"
+            )
+        
+        start_date = start.strftime("%Y-%m-%d")
+        end_date = end.strftime("%Y-%m-%d")
+        
+        # Day totals from the rollup, starting early enough to fill the first rolling windows
+        rows = await rollup_service.day_totals(user_id, lookback_start(start_date), end_date)
+        goals = await goals_cache.get_goal_grams(user_id)
+        
+        return range_summary_serializer.response(range_trends(
+            rows, start_date, end_date, goals, settings.TREND_GOAL_TOLERANCE, today=today
+        ))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting range summary: {str(e)}"
+        )
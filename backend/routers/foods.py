@@ -0,0 +1,44 @@
+from fastapi import APIRouter, status, HTTPException, Depends, Query
+from backend.models import FoodSearchResponse, FoodSearchResult
+from backend.dependencies import get_current_user
+from backend.services.food_catalog import food_catalog
+
+router = APIRouter(prefix="/foods", tags=["foods"])
+
+@router.get("/search", response_model=FoodSearchResponse)
+async def search_foods(
+    q: str = Query(..., min_length=1, max_length=100, description="Food name or the start of it"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Autocomplete food names with their macros.
+    
+    Searches the foods the current user has logged before (ranked first,
+    with the macros they last used) and the built-in nutrition table.
+    Matches word prefixes, and falls back to fuzzy matching for typos.
+    """
+    try:
+        foods = await food_catalog.search(current_user["user_id"], q, limit)
+        
+        return FoodSearchResponse(
+            query=q,
+            results=[
+                FoodSearchResult(
+                    name=food.name,
+                    serving=food.serving,
+                    calories=food.calories,
+                    protein=food.protein,
+                    carbs=food.carbs,
+                    fat=food.fat,
+                    source=food.source
+                )
+                for food in foods
+            ]
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching foods: {str(e)}"
+        )
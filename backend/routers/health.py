@@ -1,6 +1,15 @@
-from fastapi import APIRouter
-from backend.database import get_supabase
-from backend.services.email_service import EmailService
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from backend.config import settings
+from backend.database import get_supabase, client_registry
+from backend.services.email_service import get_email_service
+from backend.services.goals_cache import goals_cache
+from backend.services.food_catalog import food_catalog
+from backend.services.frequent_foods import frequent_foods
+from backend.services.timezone_cache import timezone_cache
+from backend.services.email_outbox import email_outbox, outbox_worker
+from backend.services.metrics import metrics_registry
+from anyio import to_thread
 
 router = APIRouter(tags=["health & testing"])
 
@@ -12,6 +21,44 @@ async def health_check():
         "message": "Server is running"
     }
 
+@router.get("/health/database")
+async def database_pool_health():
+    """Connection pool usage for the shared Supabase clients."""
+    return {
+        "status": "healthy",
+        "pool": client_registry.stats()
+    }
+
+@router.get("/health/cache")
+async def cache_health():
+    """Hit/miss counters for the per-user macro goals cache, and sizes of the food caches."""
+    return {
+        "status": "healthy",
+        "goals_cache": goals_cache.stats(),
+        "timezone_cache": timezone_cache.stats(),
+        "food_catalog": food_catalog.stats(),
+        "frequent_foods": frequent_foods.stats()
+    }
+
+@router.get("/health/email-outbox")
+async def email_outbox_health():
+    """Queued/sent/failed email counts and whether the outbox worker is running."""
+    return {
+        "status": "healthy" if outbox_worker.running else "degraded",
+        "worker_running": outbox_worker.running,
+        "outbox": await to_thread.run_sync(email_outbox.stats)
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-route request metrics for this worker, in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 @router.get("/test-table")
 async def test_user_profiles_table():
     """Test reading from the user_profiles table"""
@@ -37,8 +84,7 @@ async def test_user_profiles_table():
 async def test_sendgrid_connection(test_email: str):
     """Test SendGrid connection by sending a test email"""
     try:
-        email_service = EmailService()
-        result = await email_service.test_connection(test_email)
+        result = await get_email_service().test_connection(test_email)
         
         return {
             "status": "success" if result["success"] else "error",
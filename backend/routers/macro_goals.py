@@ -1,10 +1,15 @@
 from fastapi import APIRouter, status, HTTPException, Depends
 from backend.models import MacroGoalsCreate, MacroGoalsResponse, MacroGoalsUpdate
-from backend.database import get_supabase
-from backend.routers.auth import get_current_user
+from backend.repositories import macro_goals_repository
+from backend.services.goals_cache import goals_cache
+from backend.services.serialization import ResponseSerializer
+from backend.dependencies import get_current_user
 
 router = APIRouter(prefix="/macro-goals", tags=["macro goals"])
 
+# Validates and encodes the goals row straight to JSON
+goals_serializer = ResponseSerializer(MacroGoalsResponse)
+
 @router.post("/", response_model=MacroGoalsResponse, status_code=status.HTTP_201_CREATED)
 async def create_macro_goals(
     goals_data: MacroGoalsCreate,
@@ -16,41 +21,20 @@ async def create_macro_goals(
     If the user already has goals, this will replace them.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
-        # Check if user already has goals
-        existing_goals = supabase.table('macro_goals').select('*').eq('user_id', user_id).execute()
-        
-        if existing_goals.data:
-            # Update existing goals
-            response = supabase.table('macro_goals').update({
-                'total_calories': goals_data.total_calories,
-                'protein_pct': goals_data.protein_pct,
-                'carb_pct': goals_data.carb_pct,
-                'fat_pct': goals_data.fat_pct
-            }).eq('user_id', user_id).execute()
-        else:
-            # Create new goals
-            response = supabase.table('macro_goals').insert({
-                'user_id': user_id,
-                'total_calories': goals_data.total_calories,
-                'protein_pct': goals_data.protein_pct,
-                'carb_pct': goals_data.carb_pct,
-                'fat_pct': goals_data.fat_pct
-            }).execute()
+        # Insert or replace the user's goals in a single atomic statement
+        goal = await macro_goals_repository.upsert({
+            'user_id': user_id,
+            'total_calories': goals_data.total_calories,
+            'protein_pct': goals_data.protein_pct,
+            'carb_pct': goals_data.carb_pct,
+            'fat_pct': goals_data.fat_pct
+        })
         
-        if response.data:
-            goal = response.data[0]
-            return MacroGoalsResponse(
-                user_id=goal['user_id'],
-                total_calories=goal['total_calories'],
-                protein_pct=goal['protein_pct'],
-                carb_pct=goal['carb_pct'],
-                fat_pct=goal['fat_pct'],
-                created_at=goal['created_at'],
-                updated_at=goal['updated_at']
-            )
+        if goal:
+            await goals_cache.store(user_id, goal)
+            return goals_serializer.response(goal, status_code=status.HTTP_201_CREATED)
         else:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,22 +53,12 @@ async def get_macro_goals(current_user: dict = Depends(get_current_user)):
     Get the current user's macro goals.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
-        response = supabase.table('macro_goals').select('*').eq('user_id', user_id).execute()
+        goal = await macro_goals_repository.get(user_id)
         
-        if response.data:
-            goal = response.data[0]
-            return MacroGoalsResponse(
-                user_id=goal['user_id'],
-                total_calories=goal['total_calories'],
-                protein_pct=goal['protein_pct'],
-                carb_pct=goal['carb_pct'],
-                fat_pct=goal['fat_pct'],
-                created_at=goal['created_at'],
-                updated_at=goal['updated_at']
-            )
+        if goal:
+            return goals_serializer.response(goal)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -109,7 +83,6 @@ async def update_macro_goals(
     Only provided fields will be updated.
     """
     try:
-        supabase = get_supabase()
         user_id = current_user["user_id"]
         
         # Build update data with only provided fields
@@ -129,19 +102,11 @@ async def update_macro_goals(
                 detail="No fields provided for update"
             )
         
-        response = supabase.table('macro_goals').update(update_data).eq('user_id', user_id).execute()
+        goal = await macro_goals_repository.update(user_id, update_data)
         
-        if response.data:
-            goal = response.data[0]
-            return MacroGoalsResponse(
-                user_id=goal['user_id'],
-                total_calories=goal['total_calories'],
-                protein_pct=goal['protein_pct'],
-                carb_pct=goal['carb_pct'],
-                fat_pct=goal['fat_pct'],
-                created_at=goal['created_at'],
-                updated_at=goal['updated_at']
-            )
+        if goal:
+            await goals_cache.store(user_id, goal)
+            return goals_serializer.response(goal)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
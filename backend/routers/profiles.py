@@ -1,25 +1,52 @@
-from fastapi import APIRouter, status, HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, BackgroundTasks, status, HTTPException, Depends
 from backend.models import UserProfileCreate, UserProfileResponse
-from backend.database import get_supabase
-from backend.services.auth_service import AuthService
+from backend.repositories import profile_repository
+from backend.config import settings
+from backend.dependencies import get_current_user
+from backend.services.day_buckets import DEFAULT_TIMEZONE, is_valid_timezone
+from backend.services.rollup_service import rollup_service
+from backend.services.serialization import ResponseSerializer
+from backend.services.timezone_cache import timezone_cache
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/profiles", tags=["user profiles"])
-auth_service = AuthService()
-security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Dependency to get current user from JWT token"""
-    token = credentials.credentials
-    result = await auth_service.get_current_user(token)
-    
-    if not result["success"]:
+# Validates and encodes the profile row straight to JSON
+profile_serializer = ResponseSerializer(UserProfileResponse)
+
+def _check_timezone(timezone):
+    if timezone is not None and not is_valid_timezone(timezone):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=result["error"]
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown time zone '{timezone}'; use an IANA name such as 'America/New_York'"
         )
-    
-    return result
+
+def _profile_response(profile: dict, status_code: int = status.HTTP_200_OK):
+    return profile_serializer.response({
+        **profile,
+        'timezone': profile.get('timezone') or DEFAULT_TIMEZONE,
+        'created_at': str(profile['created_at']),
+        'updated_at': str(profile['updated_at'])
+    }, status_code=status_code)
+
+async def _rebuild_rollup(user_id: str):
+    try:
+        await rollup_service.rebuild(user_id)
+    except Exception as e:
+        logger.error(f"Failed to rebuild daily totals for {user_id} after a time zone change: {e}")
+
+async def _timezone_changed(user_id: str, timezone: str, background_tasks: BackgroundTasks):
+    """
+    Start bucketing the user's days in their new zone and re-key their daily
+    rollup to match. The rebuild reads the user's whole history, so it runs
+    after the response is sent; a failure is logged and left for
+    rebuild_daily_totals to repair.
+    """
+    await timezone_cache.store(user_id, timezone)
+    if settings.USE_DAILY_ROLLUPS:
+        background_tasks.add_task(_rebuild_rollup, user_id)
 
 @router.get("/me", response_model=UserProfileResponse)
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
@@ -27,19 +54,11 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
     Get the current user's profile from the database.
     """
     try:
-        supabase = get_supabase()
-        
         # Query for the user's profile using their user_id
-        response = supabase.table('user_profiles').select('*').eq('user_id', current_user["user_id"]).execute()
+        profile = await profile_repository.get(current_user["user_id"])
         
-        if response.data:
-            profile = response.data[0]
-            return UserProfileResponse(
-                user_id=profile['user_id'],
-                display_name=profile['display_name'],
-                created_at=str(profile['created_at']),
-                updated_at=str(profile['updated_at'])
-            )
+        if profile:
+            return _profile_response(profile)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -57,6 +76,7 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
 @router.post("/", response_model=UserProfileResponse, status_code=status.HTTP_201_CREATED)
 async def create_user_profile(
     profile_data: UserProfileCreate, 
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -64,26 +84,25 @@ async def create_user_profile(
     
     The user_id is automatically taken from the authenticated user.
     """
+    _check_timezone(profile_data.timezone)
+    
     try:
-        supabase = get_supabase()
-        
         # Use the authenticated user's ID instead of the one in the request
         profile_to_insert = {
             "user_id": current_user["user_id"],  # Real user ID from auth
             "display_name": profile_data.display_name
         }
+        if profile_data.timezone is not None:
+            profile_to_insert["timezone"] = profile_data.timezone
         
         # Insert the profile into the database
-        response = supabase.table('user_profiles').insert(profile_to_insert).execute()
+        created_profile = await profile_repository.create(profile_to_insert)
         
-        if response.data:
-            created_profile = response.data[0]
-            return UserProfileResponse(
-                user_id=created_profile['user_id'],
-                display_name=created_profile['display_name'],
-                created_at=str(created_profile['created_at']),
-                updated_at=str(created_profile['updated_at'])
-            )
+        if created_profile:
+            # Logs made before the profile existed were bucketed in UTC
+            if (created_profile.get('timezone') or DEFAULT_TIMEZONE) != DEFAULT_TIMEZONE:
+                await _timezone_changed(current_user["user_id"], created_profile['timezone'], background_tasks)
+            return _profile_response(created_profile, status_code=status.HTTP_201_CREATED)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -99,18 +118,24 @@ async def create_user_profile(
 @router.put("/me", response_model=UserProfileResponse)
 async def update_user_profile(
     profile_data: UserProfileCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Update the current user's profile in the database.
+    
+    Changing the time zone re-buckets the user's existing food logs into
+    their new local days.
     """
+    _check_timezone(profile_data.timezone)
+    
     try:
-        supabase = get_supabase()
-        
         # Prepare the update data
         update_data = {}
         if profile_data.display_name is not None:
             update_data["display_name"] = profile_data.display_name
+        if profile_data.timezone is not None:
+            update_data["timezone"] = profile_data.timezone
         
         if not update_data:
             raise HTTPException(
@@ -118,17 +143,15 @@ async def update_user_profile(
                 detail="No fields to update"
             )
         
+        previous_timezone = await timezone_cache.get(current_user["user_id"]) if "timezone" in update_data else None
+        
         # Update the profile in the database
-        response = supabase.table('user_profiles').update(update_data).eq('user_id', current_user["user_id"]).execute()
+        updated_profile = await profile_repository.update(current_user["user_id"], update_data)
         
-        if response.data:
-            updated_profile = response.data[0]
-            return UserProfileResponse(
-                user_id=updated_profile['user_id'],
-                display_name=updated_profile['display_name'],
-                created_at=str(updated_profile['created_at']),
-                updated_at=str(updated_profile['updated_at'])
-            )
+        if updated_profile:
+            if previous_timezone is not None and updated_profile.get('timezone') != previous_timezone:
+                await _timezone_changed(current_user["user_id"], updated_profile['timezone'], background_tasks)
+            return _profile_response(updated_profile)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -149,16 +172,16 @@ async def delete_user_profile(current_user: dict = Depends(get_current_user)):
     Delete the current user's profile from the database.
     """
     try:
-        supabase = get_supabase()
-        
         # Delete the profile from the database
-        response = supabase.table('user_profiles').delete().eq('user_id', current_user["user_id"]).execute()
+        deleted = await profile_repository.delete(current_user["user_id"])
         
-        if not response.data:
+        if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User profile not found"
             )
+        
+        await timezone_cache.invalidate(current_user["user_id"])
             
     except HTTPException:
         raise
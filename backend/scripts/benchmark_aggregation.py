@@ -0,0 +1,185 @@
+"""
+Compare how summary totals are fetched: raw rows vs database GROUP BY.
+
+    python -m backend.scripts.benchmark_aggregation
+    python -m backend.scripts.benchmark_aggregation --logs-per-day 40 --db-latency-ms 5 --mbps 20
+
+Seeds one heavy logger into MemoryPostgrest and computes the daily and
+weekly per-(day, meal) totals three ways, through the real repositories:
+
+- select('*') of every log in the window, in the keyset pages GET
+  /food-logs/ reads, summed in Python (the handlers before server-side
+  aggregation)
+- only the macro columns, summed in Python (AGGREGATION_BACKEND=python)
+- the food_log_totals function, grouped in the database (the default)
+
+Every PostgREST response is metered, so the bytes on the wire are exact.
+Latency adds --db-latency-ms per round trip and the response size at
+--mbps to the in-process work; the stand-in's GROUP BY runs in Python,
+so read the latency column as a model of the network cost rather than
+of Postgres. All three must produce the same totals.
+Needs no database or API keys.
+"""
+import os
+
+# The app reads its settings at import; point it at placeholders before loading it
+os.environ.setdefault("SUPABASE_URL", "http://memory-postgrest.invalid")
+os.environ.setdefault("SUPABASE_KEY", "memory.postgrest.key")
+os.environ.setdefault("STORAGE_BACKEND", "supabase")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+import httpx
+from backend.database import client_registry
+from backend.repositories import food_log_repository
+from backend.scripts.memory_postgrest import MemoryPostgrest
+from backend.services.aggregation_service import aggregate_rows
+from backend.services.day_buckets import utc_range
+
+USER_ID = "00000000-0000-4000-8000-000000000001"
+# PostgREST's max-rows
+PAGE_SIZE = 1000
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Counts response bytes and charges them against a simulated link"""
+
+    def __init__(self, transport: httpx.BaseTransport, mbps: float):
+        self.transport = transport
+        self.bytes_per_second = mbps * 1e6 / 8 if mbps else 0
+        self.received = 0
+        self.requests = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        size = len(response.read())
+        self.received += size
+        self.requests += 1
+        if self.bytes_per_second:
+            time.sleep(size / self.bytes_per_second)
+        return response
+
+
+def seed(store: MemoryPostgrest, days: int, logs_per_day: int, rng: random.Random):
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    logs = []
+    for day in range(days):
+        for entry in range(logs_per_day):
+            logs.append({
+                'user_id': USER_ID,
+                'meal_type': MEAL_TYPES[entry % len(MEAL_TYPES)],
+                'food_name': f'Food {rng.randrange(200)}',
+                'calories': rng.randrange(50, 700),
+                'protein': round(rng.uniform(0, 50), 1),
+                'carbs': round(rng.uniform(0, 90), 1),
+                'fat': round(rng.uniform(0, 40), 1),
+                'logged_at': (today - timedelta(days=day) + timedelta(minutes=entry * 1440 // logs_per_day)).isoformat(),
+            })
+    store.insert_rows('food_logs', logs)
+
+
+async def all_rows(start: str, end: str):
+    rows, cursor = [], None
+    while True:
+        page = await food_log_repository.list_page(USER_ID, PAGE_SIZE, cursor, start=start, end=end)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return aggregate_rows(rows)
+        cursor = (page[-1]['logged_at'], page[-1]['id'])
+
+
+async def macro_columns(start: str, end: str):
+    return aggregate_rows(await food_log_repository.list_macros_between(USER_ID, start, end))
+
+
+async def database(start: str, end: str):
+    groups = await food_log_repository.totals_by_day_and_meal(USER_ID, start, end)
+    return [{**group, 'log_date': str(group['log_date'])[:10]} for group in groups]
+
+
+STRATEGIES = (
+    ("select * + Python", all_rows),
+    ("macro columns + Python", macro_columns),
+    ("food_log_totals", database),
+)
+
+
+def same_totals(a, b) -> bool:
+    key = lambda group: (group['log_date'], group['meal_type'])
+    if [key(group) for group in a] != [key(group) for group in b]:
+        return False
+    return all(
+        group_a['entry_count'] == group_b['entry_count']
+        and all(abs(group_a[field] - group_b[field]) < 1e-6 for field in ('calories', 'protein', 'carbs', 'fat'))
+        for group_a, group_b in zip(a, b)
+    )
+
+
+async def measure(meter: MeteredTransport, strategy, start: str, end: str, rounds: int):
+    """(bytes, round trips, median ms, min ms) per call"""
+    timings = []
+    received, requests = meter.received, meter.requests
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await strategy(start, end)
+        timings.append((time.perf_counter() - started) * 1000)
+    return (meter.received - received) / rounds, (meter.requests - requests) / rounds, statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary aggregation strategies")
+    parser.add_argument("--logs-per-day", type=int, default=20, help="Food logs per day for the seeded user")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed calls per strategy and window")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="Simulated round trip per request")
+    parser.add_argument("--mbps", type=float, default=50.0, help="Simulated bandwidth (0 for unlimited)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    store = MemoryPostgrest(latency=args.db_latency_ms / 1000)
+    seed(store, 7, args.logs_per_day, random.Random(args.seed))
+    meter = MeteredTransport(store.transport(), args.mbps)
+    client_registry.use_transport(meter)
+
+    today = datetime.now(timezone.utc).date()
+    windows = (
+        ("daily", today.isoformat(), today.isoformat()),
+        ("weekly", (today - timedelta(days=6)).isoformat(), today.isoformat()),
+    )
+
+    async def run():
+        results = []
+        for label, first_day, last_day in windows:
+            start, end = utc_range(first_day, last_day, "UTC")
+            expected = await database(start, end)
+            for name, strategy in STRATEGIES:
+                assert same_totals(await strategy(start, end), expected), f"{name} totals differ ({label})"
+                results.append((label, name, *await measure(meter, strategy, start, end, args.rounds)))
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        client_registry.use_transport(None)
+
+    print(f"{args.logs_per_day} logs/day, {args.db_latency_ms}ms round trip, "
+          f"{args.mbps or 'unlimited'} Mbit/s simulated link\n")
+    print(f"{'window':<7} {'strategy':<24} {'bytes/call':>11} {'round trips':>12} {'median ms':>10} {'min ms':>8}")
+    baseline = {}
+    for label, name, received, requests, median_ms, min_ms in results:
+        baseline.setdefault(label, (received, min_ms))
+        print(f"{label:<7} {name:<24} {received:>11.0f} {requests:>12.1f} {median_ms:>10.2f} {min_ms:>8.2f}")
+    print()
+    for label, name, received, requests, median_ms, min_ms in results:
+        if name == "food_log_totals":
+            baseline_bytes, baseline_ms = baseline[label]
+            print(f"{label}: {baseline_bytes / received:.1f}x fewer bytes, {baseline_ms / min_ms:.1f}x faster than select *")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measure email render throughput.
+
+    python -m backend.scripts.benchmark_email_templates
+    python -m backend.scripts.benchmark_email_templates --messages 100000 --template daily_summary
+
+Compares building each body with an f-string (how emails used to be
+rendered) against the precompiled templates, both fully rendered per
+recipient and as shared tagged bodies with per-recipient substitutions
+(what the outbox sends). Needs no network or API keys.
+"""
+import argparse
+import html
+import time
+from backend.models import DailySummaryEmailRequest
+from backend.services.email_service import daily_summary_email
+from backend.services.email_templates import email_templates
+
+
+def sample_summary(i: int):
+    return {
+        'date': '2025-07-01',
+        'total_calories': 1800 + i % 400, 'goal_calories': 2000, 'calories_remaining': max(0, 200 - i % 400),
+        'total_protein': 120.5, 'goal_protein': 150.0, 'protein_remaining': 29.5,
+        'total_carbs': 180.0, 'goal_carbs': 200.0, 'carbs_remaining': 20.0,
+        'total_fat': 60.2, 'goal_fat': 66.7, 'fat_remaining': 6.5,
+        'meals': [
+            {'meal_type': 'breakfast', 'calories': 450, 'protein': 30.0, 'carbs': 50.0, 'fat': 12.0},
+            {'meal_type': 'lunch', 'calories': 700, 'protein': 45.5, 'carbs': 70.0, 'fat': 25.2},
+            {'meal_type': 'dinner', 'calories': 650 + i % 400, 'protein': 45.0, 'carbs': 60.0, 'fat': 23.0},
+        ],
+    }
+
+
+def fstring_welcome(user_name: str) -> str:
+    return f"""
+            <h2>Welcome to Macro Tracking App!</h2>
+            <p>Hi {html.escape(user_name)},</p>
+            <p>Thank you for joining Macro Tracking App! We're excited to help you reach your fitness goals.</p>
+            <p>Get started by:</p>
+            <ul>
+                <li>Setting your macro goals</li>
+                <li>Logging your first meal</li>
+                <li>Tracking your daily progress</li>
+            </ul>
+            <p>Happy tracking!</p>
+            <p>- The Macro Tracking Team</p>
+            """
+
+
+def bench(label: str, count: int, render):
+    started = time.perf_counter()
+    for i in range(count):
+        render(i)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed:8.3f}s  {count / elapsed:12,.0f} msgs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email template rendering")
+    parser.add_argument("--messages", type=int, default=100_000, help="Messages rendered per variant")
+    parser.add_argument("--template", choices=["welcome", "daily_summary"], default="welcome")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    email_templates.load()
+    print(f"Compiled {len(email_templates.load())} templates in {(time.perf_counter() - started) * 1000:.2f}ms")
+    print(f"Rendering {args.messages:,} '{args.template}' messages\n")
+
+    if args.template == "welcome":
+        template = email_templates.get("welcome")
+        bench("f-string (html only)", args.messages, lambda i: fstring_welcome(f"user<{i}>"))
+        bench("template render (html + text)", args.messages,
+              lambda i: template.render(f"user{i}@example.com", {"user_name": f"user<{i}>"}))
+        bench("template batch (substitutions)", args.messages,
+              lambda i: template.render_for_batch(f"user{i}@example.com", {"user_name": f"user<{i}>"}))
+    else:
+        summaries = [sample_summary(i) for i in range(1000)]
+        requests = [DailySummaryEmailRequest(user_id=str(i), email=f"user{i}@example.com", date='2025-07-01') for i in range(1000)]
+        bench("template batch (substitutions)", args.messages,
+              lambda i: daily_summary_email(requests[i % 1000], summaries[i % 1000]))
+
+
+if __name__ == "__main__":
+    main()
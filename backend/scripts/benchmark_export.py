@@ -0,0 +1,171 @@
+"""
+Check that GET /food-logs/export streams in bounded memory.
+
+    python -m backend.scripts.benchmark_export
+    python -m backend.scripts.benchmark_export --rows 1000000 --format csv --gzip
+
+Exports histories of increasing size (up to --rows, 1M by default)
+through the real route over direct ASGI calls, with food_log_repository
+replaced by a synthetic history that builds each keyset page on demand,
+so nothing but the export itself holds rows. Reports the peak memory
+traced during each export and the process's peak RSS, and exits with
+status 1 if the largest export's traced peak exceeds --max-growth times
+the smallest's. Finally checks that a database error mid-stream aborts
+the response instead of ending it as if it were complete.
+
+Tracing allocations slows the export several times over, so the default
+1M rows take a few minutes. Needs no database or API keys.
+"""
+import os
+
+# The app reads its settings at import; point it at placeholders before loading it
+os.environ.setdefault("SUPABASE_URL", "http://export-benchmark.invalid")
+os.environ.setdefault("SUPABASE_KEY", "export.benchmark.key")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-jwt-secret")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import resource
+import sys
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta, timezone
+import jwt
+from fastapi import FastAPI
+from backend.config import settings
+from backend.routers import food_logs
+from backend.services import export_service
+
+USER_ID = "d5c1e8a2-0000-4000-8000-000000000001"
+START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+
+class SyntheticFoodLogs:
+    """A user history of `rows` logs, one a minute, generated page by page"""
+
+    def __init__(self, rows: int, fail_after: int = None):
+        self.rows = rows
+        self.fail_after = fail_after
+
+    def log(self, index: int):
+        stamp = (START + timedelta(minutes=index)).isoformat()
+        return {
+            'id': f'b1a7c6de-0000-4000-8000-{index:012d}',
+            'user_id': USER_ID,
+            'meal_type': ('breakfast', 'lunch', 'dinner', 'snack')[index % 4],
+            'food_name': f'Greek yogurt {index % 50}',
+            'calories': 146 + index % 300,
+            'protein': 20.0,
+            'carbs': 7.8,
+            'fat': 3.8,
+            'logged_at': stamp,
+            'idempotency_key': None,
+            'created_at': stamp,
+            'updated_at': stamp,
+        }
+
+    async def list_page(self, user_id, limit, cursor=None, newer=False, **filters):
+        first = int(cursor[1].rsplit('-', 1)[1]) + 1 if cursor else 0
+        if self.fail_after is not None and first >= self.fail_after:
+            raise RuntimeError("connection reset by the database")
+        return [self.log(index) for index in range(first, min(first + limit, self.rows))]
+
+
+async def export(app, token: str, query: str):
+    """Stream one export; returns (bytes received, rows decoded)"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/food-logs/export',
+        'raw_path': b'/food-logs/export',
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'bench'), (b'authorization', f'Bearer {token}'.encode())],
+        'server': ('bench', 80),
+        'client': ('127.0.0.1', 1234),
+    }
+    decompressor = zlib.decompressobj(wbits=31) if 'gzip=true' in query else None
+    received = lines = 0
+    done = asyncio.Event()
+
+    async def receive():
+        # Only answered once the body is sent, as a disconnect
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal received, lines
+        if message['type'] == 'http.response.start':
+            assert message['status'] == 200, message
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            received += len(body)
+            lines += (decompressor.decompress(body) if decompressor else body).count(b'\n')
+            if not message.get('more_body'):
+                done.set()
+
+    await app(scope, receive, send)
+    return received, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check food log export memory use")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows in the largest export")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Export gzip-compressed")
+    parser.add_argument("--max-growth", type=float, default=2.0,
+                        help="Largest allowed ratio of the largest export's traced peak to the smallest's")
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(food_logs.router)
+    now = int(time.time())
+    token = jwt.encode(
+        {'sub': USER_ID, 'email': 'export@example.com', 'aud': settings.JWT_AUDIENCE, 'exp': now + 3600},
+        settings.JWT_SECRET_KEY,
+        algorithm="HS256",
+    )
+    query = f"format={args.format}" + ("&gzip=true" if args.gzip else "")
+    sizes = sorted({min(size, args.rows) for size in (10000, 100000, args.rows)})
+    expected_lines = (lambda rows: rows + 1) if args.format == 'csv' else (lambda rows: rows)
+
+    tracemalloc.start()
+    peaks = []
+    print(f"{'rows':>10} {'MiB sent':>9} {'seconds':>8} {'traced peak KiB':>16} {'peak RSS MiB':>13}")
+    for rows in sizes:
+        export_service.food_log_repository = SyntheticFoodLogs(rows)
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        received, lines = asyncio.run(export(app, token, query))
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        peaks.append(peak)
+        assert lines == expected_lines(rows), f"expected {expected_lines(rows)} lines, got {lines}"
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{rows:>10} {received / 2 ** 20:>9.1f} {elapsed:>8.1f} {peak / 1024:>16.0f} {rss:>13.0f}")
+    tracemalloc.stop()
+
+    growth = peaks[-1] / peaks[0]
+    print(f"traced peak growth from {sizes[0]} to {sizes[-1]} rows: {growth:.2f}x")
+
+    # A failing page must abort the response, not end it like a complete file
+    export_service.food_log_repository = SyntheticFoodLogs(10 * settings.EXPORT_CHUNK_SIZE, fail_after=settings.EXPORT_CHUNK_SIZE)
+    try:
+        asyncio.run(export(app, token, query))
+        print("mid-stream error: response completed normally (truncated export)")
+        sys.exit(1)
+    except RuntimeError:
+        print("mid-stream error: response aborted")
+
+    if growth > args.max_growth:
+        print(f"FAIL: memory grew {growth:.2f}x, more than --max-growth {args.max_growth}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure food search latency at catalog scale.
+
+    python -m backend.scripts.benchmark_food_search
+    python -m backend.scripts.benchmark_food_search --entries 50000 --queries 2000
+
+Builds an index of synthetic foods (the local nutrition table combined
+with brands and preparations) and reports build time plus p50/p95/p99
+latency for autocomplete prefixes, full names and misspelled queries.
+Needs no database.
+"""
+import argparse
+import random
+import statistics
+import time
+from backend.services.food_catalog import DEFAULT_CATALOG_PATH, FoodEntry, FoodSearchIndex, load_catalog_file
+
+BRANDS = ["", "Kirkland", "Trader Joe's", "Great Value", "Organic", "Homemade", "Chobani", "Kraft", "Tyson", "Quaker"]
+PREPARATIONS = ["", "Grilled", "Baked", "Fried", "Raw", "Steamed", "Roasted", "Low Fat", "Spicy", "Frozen", "Canned"]
+
+
+def synthetic_entries(count: int, rng: random.Random):
+    base = load_catalog_file(DEFAULT_CATALOG_PATH)
+    entries = []
+    while len(entries) < count:
+        food = rng.choice(base)
+        name = " ".join(part for part in (rng.choice(BRANDS), rng.choice(PREPARATIONS), food.name) if part)
+        entries.append(FoodEntry(
+            name=f"{name} #{len(entries)}" if rng.random() < 0.8 else name,
+            calories=food.calories, protein=food.protein, carbs=food.carbs, fat=food.fat,
+        ))
+    return entries
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+def report(label: str, timings):
+    timings = sorted(timings)
+    pick = lambda q: timings[min(len(timings) - 1, int(q * len(timings)))] * 1000
+    print(f"{label:<20} p50 {pick(0.50):7.3f}ms  p95 {pick(0.95):7.3f}ms  p99 {pick(0.99):7.3f}ms  mean {statistics.mean(timings) * 1000:7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark food search latency")
+    parser.add_argument("--entries", type=int, default=50_000, help="Foods in the index")
+    parser.add_argument("--queries", type=int, default=2_000, help="Queries per query type")
+    parser.add_argument("--limit", type=int, default=10, help="Results per query")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    entries = synthetic_entries(args.entries, rng)
+
+    started = time.perf_counter()
+    index = FoodSearchIndex(entries)
+    print(f"Indexed {len(index):,} foods in {(time.perf_counter() - started) * 1000:.1f}ms\n")
+
+    names = [entry.name.split("#")[0].strip() for entry in rng.sample(entries, args.queries)]
+    workloads = {
+        "prefix (3 chars)": [name.split()[-1][:3] for name in names],
+        "prefix (2 words)": [" ".join(word[:4] for word in name.split()[-2:]) for name in names],
+        "full name": names,
+        "misspelled": [" ".join(misspell(word, rng) for word in name.split()) for name in names],
+    }
+
+    for label, queries in workloads.items():
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, args.limit)
+            timings.append(time.perf_counter() - started)
+        report(label, timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Fire parallel macro goal saves and check they leave one row per user.
+
+    python -m backend.scripts.benchmark_macro_goals_upsert
+    python -m backend.scripts.benchmark_macro_goals_upsert --users 50 --writers 10 --db-latency-ms 5
+
+Against MemoryPostgrest (which enforces the unique user_id index from
+backend/sql/005_macro_goals_upsert.sql), every user saves their goals
+from --writers concurrent requests at once, two ways:
+
+- read then write: SELECT the goals, then UPDATE or INSERT (the POST
+  /macro-goals/ handler before the upsert)
+- upsert: macro_goals_repository.upsert, one round trip
+
+Reports failed saves, rows left per user and the save latency of each.
+Concurrent first saves race in the read-then-write path: both see no
+row and both insert, so one fails on the unique index (or, without it,
+leaves a duplicate row). Finally fires the same parallel saves through
+the real POST /macro-goals/ route. Exits with status 1 if an upsert or
+route save failed or any user is left with other than one row.
+Needs no database or API keys.
+"""
+import os
+
+# The app reads its settings at import; point it at placeholders before loading it
+os.environ.setdefault("SUPABASE_URL", "http://memory-postgrest.invalid")
+os.environ.setdefault("SUPABASE_KEY", "memory.postgrest.key")
+os.environ.setdefault("STORAGE_BACKEND", "supabase")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-jwt-secret")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import httpx
+import jwt
+from fastapi import FastAPI
+from backend.config import settings
+from backend.database import client_registry
+from backend.repositories import macro_goals_repository
+from backend.repositories.base import run_query
+from backend.routers import macro_goals
+from backend.scripts.memory_postgrest import MemoryPostgrest
+
+
+def goals_for(user_id: str, writer: int):
+    return {
+        'user_id': user_id,
+        'total_calories': 2000 + writer * 50,
+        'protein_pct': 30.0,
+        'carb_pct': 40.0,
+        'fat_pct': 30.0,
+    }
+
+
+async def read_then_write(goals):
+    existing = await macro_goals_repository.get(goals['user_id'])
+    if existing:
+        changes = {key: value for key, value in goals.items() if key != 'user_id'}
+        return await macro_goals_repository.update(goals['user_id'], changes)
+    response = await run_query(macro_goals_repository.table().insert(goals))
+    return response.data[0] if response.data else None
+
+
+async def upsert(goals):
+    return await macro_goals_repository.upsert(goals)
+
+
+STRATEGIES = (
+    ("read then write", read_then_write),
+    ("upsert", upsert),
+)
+
+
+def user_ids(count: int):
+    return [f"00000000-0000-4000-8000-{index:012d}" for index in range(count)]
+
+
+async def timed(save, goals):
+    """(latency ms, failed)"""
+    started = time.perf_counter()
+    try:
+        failed = await save(goals) is None
+    except Exception:
+        failed = True
+    return (time.perf_counter() - started) * 1000, failed
+
+
+async def fire(users, writers: int, save):
+    return await asyncio.gather(*(
+        timed(save, goals_for(user_id, writer)) for user_id in users for writer in range(writers)
+    ))
+
+
+def rows_per_user(store: MemoryPostgrest, users):
+    return [len(store.partition('macro_goals', user_id)) for user_id in users]
+
+
+def access_token(user_id: str) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "email": f"{user_id}@benchmark.invalid",
+        "aud": settings.JWT_AUDIENCE,
+        "role": "authenticated",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm="HS256")
+
+
+async def post_route(users, writers: int):
+    """Parallel POST /macro-goals/ through the real route; returns the status codes"""
+    app = FastAPI()
+    app.include_router(macro_goals.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def post(user_id: str, writer: int):
+            goals = goals_for(user_id, writer)
+            del goals['user_id']
+            response = await client.post(
+                "/macro-goals/", json=goals, headers={"Authorization": f"Bearer {access_token(user_id)}"}
+            )
+            return response.status_code
+        return await asyncio.gather(*(post(user_id, writer) for user_id in users for writer in range(writers)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent macro goal saves")
+    parser.add_argument("--users", type=int, default=20, help="Users saving goals for the first time")
+    parser.add_argument("--writers", type=int, default=5, help="Concurrent saves per user")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="Simulated round trip per request")
+    args = parser.parse_args()
+
+    users = user_ids(args.users)
+    results = []
+    try:
+        for name, save in STRATEGIES:
+            store = MemoryPostgrest(latency=args.db_latency_ms / 1000)
+            client_registry.use_transport(store.transport())
+            saves = asyncio.run(fire(users, args.writers, save))
+            results.append((name, saves, rows_per_user(store, users), store.requests))
+
+        store = MemoryPostgrest(latency=args.db_latency_ms / 1000)
+        client_registry.use_transport(store.transport())
+        statuses = asyncio.run(post_route(users, args.writers))
+        route_rows = rows_per_user(store, users)
+    finally:
+        client_registry.use_transport(None)
+
+    print(f"{args.users} users x {args.writers} concurrent saves, {args.db_latency_ms}ms round trip\n")
+    print(f"{'strategy':<16} {'saves':>6} {'failed':>7} {'users != 1 row':>15} {'round trips':>12} {'median ms':>10} {'p95 ms':>8}")
+    medians = {}
+    for name, saves, rows, requests in results:
+        timings = sorted(latency for latency, _ in saves)
+        failed = sum(1 for _, failed in saves if failed)
+        wrong = sum(1 for count in rows if count != 1)
+        medians[name] = statistics.median(timings)
+        print(f"{name:<16} {len(saves):>6} {failed:>7} {wrong:>15} {requests / len(saves):>12.1f} "
+              f"{medians[name]:>10.2f} {timings[int(len(timings) * 0.95) - 1]:>8.2f}")
+    print(f"\nupsert median latency: {medians['upsert'] / medians['read then write']:.2f}x read then write")
+
+    route_failed = sum(1 for code in statuses if code != 201)
+    route_wrong = sum(1 for count in route_rows if count != 1)
+    print(f"POST /macro-goals/: {len(statuses) - route_failed}/{len(statuses)} returned 201, "
+          f"{args.users - route_wrong}/{args.users} users have one row")
+
+    _, upsert_saves, upsert_rows, _ = results[-1]
+    if route_failed or route_wrong or any(failed for _, failed in upsert_saves) or any(count != 1 for count in upsert_rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
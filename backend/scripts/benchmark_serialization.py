@@ -0,0 +1,163 @@
+"""
+Measure the CPU cost of serializing food log list responses.
+
+    python -m backend.scripts.benchmark_serialization
+    python -m backend.scripts.benchmark_serialization --rows 10000 --rounds 7
+
+Serves the same page of food log rows from two FastAPI apps over direct
+ASGI calls: one builds a FoodLogResponse per row and lets FastAPI
+validate the page against `response_model` and encode it with
+JSONResponse (the handlers before ResponseSerializer), the other returns
+ResponseSerializer's FastJSONResponse built from the row dicts (as
+routers/food_logs.py does now). Both bodies are checked to decode to the
+same JSON. Needs no database or API keys.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from backend.models import FoodLogPageResponse, FoodLogResponse
+from backend.services.serialization import FastJSONResponse, ResponseSerializer
+
+PATH = "/food-logs/"
+
+
+def make_rows(count: int):
+    """Rows as the repositories return them, including columns the response drops"""
+    return [
+        {
+            'id': f'b1a7c6de-0000-4000-8000-{i:012d}',
+            'user_id': 'd5c1e8a2-0000-4000-8000-000000000001',
+            'meal_type': ('breakfast', 'lunch', 'dinner', 'snack')[i % 4],
+            'food_name': f'Greek yogurt {i % 50}',
+            'calories': 146 + i % 300,
+            'protein': 20.0 + (i % 7) / 10,
+            'carbs': 7.8,
+            'fat': 3.8,
+            'logged_at': f'2025-07-01T07:30:{i % 60:02d}.{i:06d}+00:00',
+            'idempotency_key': None,
+            'created_at': '2025-07-01T07:30:00+00:00',
+            'updated_at': '2025-07-01T07:30:00+00:00',
+        }
+        for i in range(count)
+    ]
+
+
+def build_model_app(rows) -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get(PATH, response_model=FoodLogPageResponse)
+    async def list_logs():
+        return FoodLogPageResponse(
+            items=[
+                FoodLogResponse(
+                    id=log['id'],
+                    user_id=log['user_id'],
+                    meal_type=log['meal_type'],
+                    food_name=log['food_name'],
+                    calories=log['calories'],
+                    protein=log['protein'],
+                    carbs=log['carbs'],
+                    fat=log['fat'],
+                    logged_at=log['logged_at'],
+                    created_at=log['created_at'],
+                    updated_at=log['updated_at']
+                )
+                for log in rows
+            ],
+            next_cursor='next',
+            prev_cursor=None,
+            has_more=True
+        )
+
+    return app
+
+
+def build_fast_app(rows) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    serializer = ResponseSerializer(FoodLogPageResponse)
+
+    @app.get(PATH, response_model=FoodLogPageResponse)
+    async def list_logs():
+        return serializer.response({
+            'items': rows,
+            'next_cursor': 'next',
+            'prev_cursor': None,
+            'has_more': True
+        })
+
+    return app
+
+
+async def request(app) -> bytes:
+    """One GET straight to the ASGI app; returns the response body"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': PATH,
+        'raw_path': PATH.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'bench')],
+        'server': ('bench', 80),
+        'client': ('127.0.0.1', 1234),
+    }
+    chunks = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return b''.join(chunks)
+
+
+async def cpu_ms(app, requests: int) -> float:
+    """CPU milliseconds per request, which the event loop cannot spend on anything else"""
+    started = time.process_time()
+    for _ in range(requests):
+        await request(app)
+    return (time.process_time() - started) * 1000 / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark food log list serialization")
+    parser.add_argument("--rows", type=int, default=10000, help="Food logs per response")
+    parser.add_argument("--requests", type=int, default=3, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per app, interleaved")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    models = build_model_app(rows)
+    fast = build_fast_app(rows)
+
+    async def run():
+        model_body, fast_body = await request(models), await request(fast)
+        assert json.loads(model_body) == json.loads(fast_body), "responses differ"
+        model_timings, fast_timings = [], []
+        for _ in range(args.rounds):
+            model_timings.append(await cpu_ms(models, args.requests))
+            fast_timings.append(await cpu_ms(fast, args.requests))
+        return len(fast_body), model_timings, fast_timings
+
+    size, model_timings, fast_timings = asyncio.run(run())
+
+    print(f"{args.rows} rows, {size / 1024:.0f} KiB response")
+    for label, timings in (("models + response_model", model_timings), ("ResponseSerializer", fast_timings)):
+        print(f"{label:<24} median {statistics.median(timings):8.2f}ms   min {min(timings):8.2f}ms CPU per request")
+    # The fastest round is the least disturbed by GC and scheduling noise
+    model_ms, fast_ms = min(model_timings), min(fast_timings)
+    print(f"CPU reduction: {(1 - fast_ms / model_ms) * 100:.1f}% ({model_ms / fast_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
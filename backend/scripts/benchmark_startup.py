@@ -0,0 +1,117 @@
+"""
+Measure the cold-start time of backend.main.
+
+    python -m backend.scripts.benchmark_startup
+    python -m backend.scripts.benchmark_startup --runs 20 --imports 15
+
+Starts a fresh interpreter per run that imports backend.main and then
+runs the app's lifespan startup and shutdown, with placeholder Supabase
+settings pointing at an unresolvable host. Reports the median and
+fastest import and startup times, and fails (exit status 1) if any run
+created a Supabase client or opened a network connection: startup must
+not need the network. --imports lists the slowest modules imported
+(python -X importtime) in one extra run.
+Needs no database or API keys.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Runs in the child interpreter; prints one JSON line of measurements
+CHILD = """
+import asyncio, json, sys, time
+connections = []
+sys.addaudithook(lambda event, args: connections.append(repr(args[1])) if event == "socket.connect" else None)
+
+started = time.perf_counter()
+import backend.main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with backend.main.app.router.lifespan_context(backend.main.app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(lifespan())
+from backend.database import client_registry
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "clients_created": client_registry.clients_created,
+    "connections": connections,
+}))
+"""
+
+
+def child_env(outbox_path: str) -> dict:
+    return {
+        **os.environ,
+        "SUPABASE_URL": "http://startup-benchmark.invalid",
+        "SUPABASE_KEY": "startup.benchmark.key",
+        "JWT_SECRET_KEY": "startup-benchmark-secret",
+        "EMAIL_TRANSPORT": "fake",
+        "EMAIL_OUTBOX_PATH": outbox_path,
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": REPO_ROOT,
+    }
+
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, count: int):
+    """(cumulative microseconds, module) for the slowest imports under -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        timings.append((int(cumulative), module.strip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend.main cold start")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to start")
+    parser.add_argument("--imports", type=int, default=10, help="Slowest imports to list (0 to skip)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = child_env(os.path.join(directory, "outbox.db"))
+        runs = [run_once(env) for _ in range(args.runs)]
+        imports = slowest_imports(env, args.imports) if args.imports else []
+
+    for label, key in (("import backend.main", "import_ms"), ("lifespan startup", "startup_ms")):
+        timings = [run[key] for run in runs]
+        print(f"{label:<20} median {statistics.median(timings):8.1f}ms   min {min(timings):8.1f}ms")
+
+    if imports:
+        print("\nslowest imports (cumulative):")
+        for microseconds, module in imports:
+            print(f"  {microseconds / 1000:8.1f}ms  {module}")
+
+    clients = max(run["clients_created"] for run in runs)
+    connections = sorted({address for run in runs for address in run["connections"]})
+    print(f"\nSupabase clients created: {clients}; network connections: {len(connections)}")
+    if clients or connections:
+        for address in connections:
+            print(f"  connected to {address}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
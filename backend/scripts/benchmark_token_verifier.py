@@ -0,0 +1,134 @@
+"""
+Measure what the get_current_user dependency costs per request.
+
+    python -m backend.scripts.benchmark_token_verifier
+    python -m backend.scripts.benchmark_token_verifier --calls 20000 --rounds 9
+
+Times backend.dependencies.get_current_user (TokenVerifier behind
+AuthService) with HS256 access tokens signed by a local secret:
+
+- a repeat token, served from the verified-claims LRU
+- a token seen for the first time, whose signature and expiry are checked
+
+The unverified decode the dependency used to do is timed for reference.
+RS256 verification is timed with an in-memory key in place of the JWKS
+fetch, which is what PyJWKClient's cache serves between rotations.
+Needs no database or API keys.
+"""
+import os
+
+# TokenVerifier reads the secret at import; give it one before loading it
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-jwt-secret")
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from backend.config import settings
+from backend.dependencies import get_current_user
+from backend.services.token_verifier import TokenVerifier, token_verifier
+
+
+def make_token(key, algorithm: str = "HS256", headers=None) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "email": "bench@example.com",
+        "aud": settings.JWT_AUDIENCE,
+        "iat": now,
+        "exp": now + 3600,
+        "role": "authenticated",
+    }
+    return jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+
+def credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+async def dependency_us(tokens) -> float:
+    """Microseconds per get_current_user call over `tokens`"""
+    started = time.perf_counter()
+    for token in tokens:
+        await get_current_user(token)
+    return (time.perf_counter() - started) * 1e6 / len(tokens)
+
+
+def per_call_us(function, tokens) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        function(token)
+    return (time.perf_counter() - started) * 1e6 / len(tokens)
+
+
+class InMemoryKeySet:
+    """Stands in for PyJWKClient once it has cached the project's key set"""
+
+    def __init__(self, key, key_id: str):
+        self.signing_keys = [type("SigningKey", (), {"key": key, "key_id": key_id})()]
+
+    def get_signing_keys(self, refresh: bool = False):
+        return self.signing_keys
+
+
+def report(label: str, timings):
+    print(f"{label:<28} median {statistics.median(timings):8.2f}us   min {min(timings):8.2f}us per call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark access token verification")
+    parser.add_argument("--calls", type=int, default=5000, help="Calls per round")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per case, interleaved")
+    args = parser.parse_args()
+
+    secret = settings.JWT_SECRET_KEY
+    repeat = [credentials(make_token(secret))] * args.calls
+    fresh = [credentials(make_token(secret)) for _ in range(args.calls)]
+    raw = [c.credentials for c in fresh]
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    rs256 = TokenVerifier(jwks_url="")
+    rs256._jwks_client = InMemoryKeySet(private_key.public_key(), "bench")
+    rs256_tokens = [make_token(private_key, "RS256", {"kid": "bench"}) for _ in range(min(args.calls, 1000))]
+
+    def unverified(token):
+        return jwt.decode(token, options={"verify_signature": False})
+
+    def rs256_cold(token):
+        rs256.clear()
+        return rs256.verify(token)
+
+    async def run():
+        # Every token must verify before anything is timed
+        for c in (repeat[0], fresh[0]):
+            user = await get_current_user(c)
+            assert user["success"], user
+        timings = {"cached": [], "first sight": [], "unverified": [], "rs256": []}
+        for _ in range(args.rounds):
+            token_verifier.clear()
+            await get_current_user(repeat[0])
+            timings["cached"].append(await dependency_us(repeat))
+            token_verifier.clear()
+            timings["first sight"].append(await dependency_us(fresh))
+            timings["unverified"].append(per_call_us(unverified, raw))
+            timings["rs256"].append(per_call_us(rs256_cold, rs256_tokens))
+        return timings
+
+    timings = asyncio.run(run())
+
+    report("get_current_user, cached", timings["cached"])
+    report("get_current_user, HS256", timings["first sight"])
+    report("TokenVerifier, RS256", timings["rs256"])
+    report("unverified decode (before)", timings["unverified"])
+    # The fastest round is the least disturbed by GC and scheduling noise
+    cached, unverified_us = min(timings["cached"]), min(timings["unverified"])
+    print(f"cached vs unverified decode: {cached - unverified_us:+.2f}us per request")
+    print(f"token cache: {token_verifier.cache_hits} hits, {token_verifier.cache_misses} misses")
+
+
+if __name__ == "__main__":
+    main()
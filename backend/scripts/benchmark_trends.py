@@ -0,0 +1,120 @@
+"""
+Measure range summary computation over years of daily data.
+
+    python -m backend.scripts.benchmark_trends
+    python -m backend.scripts.benchmark_trends --years 10 --runs 50
+
+Builds dense synthetic day totals (one row per day) and compares a
+per-row dict accumulation (how the weekly summary aggregates) against the
+column-wise NumPy computation behind GET /food-logs/summary/range, and
+checks that both agree. Needs no database or API keys.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from backend.services.aggregation_service import MACRO_FIELDS
+from backend.services.trend_service import ROLLING_WINDOWS, lookback_start, range_trends
+
+GOALS = {'calories': 2000, 'protein': 150.0, 'carbs': 200.0, 'fat': 66.7}
+TOLERANCE = 0.1
+
+
+def sample_rows(start: date, days: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(days):
+        # Skip roughly one day in ten so the streaks and averages have gaps
+        if rng.random() < 0.1:
+            continue
+        rows.append({
+            'log_date': (start + timedelta(days=i)).isoformat(),
+            'calories': rng.randint(1500, 2500),
+            'protein': round(rng.uniform(100, 200), 1),
+            'carbs': round(rng.uniform(150, 250), 1),
+            'fat': round(rng.uniform(50, 80), 1),
+            'entry_count': 3,
+        })
+    return rows
+
+
+def per_row_trends(rows, start_date: str, end_date: str):
+    """Reference implementation: dicts keyed by date, one Python loop per window and day"""
+    by_date = {row['log_date']: row for row in rows}
+    first, last = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    history_start = date.fromisoformat(lookback_start(start_date))
+    all_days = [(history_start + timedelta(days=i)).isoformat() for i in range((last - history_start).days + 1)]
+    days = all_days[(first - history_start).days:]
+
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        averages = {}
+        for i, day in enumerate(all_days):
+            window_rows = [by_date[d] for d in all_days[max(0, i - window + 1):i + 1] if d in by_date]
+            if window_rows:
+                averages[day] = {field: sum(r[field] for r in window_rows) / len(window_rows) for field in MACRO_FIELDS}
+        rolling[window] = [averages.get(day) for day in days]
+
+    logged = [day for day in days if day in by_date]
+    on_goal = {
+        field: sum(1 for day in logged if abs(by_date[day][field] - GOALS[field]) <= TOLERANCE * GOALS[field])
+        for field in MACRO_FIELDS
+    }
+
+    longest = current = 0
+    for day in days:
+        current = current + 1 if day in by_date else 0
+        longest = max(longest, current)
+
+    return {'rolling': rolling, 'on_goal': on_goal, 'longest_logging': longest}
+
+
+def time_runs(fn, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, timings
+
+
+def report(label: str, timings):
+    print(f"{label:<22} median {statistics.median(timings):8.2f}ms   min {min(timings):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark range summary computation")
+    parser.add_argument("--years", type=int, default=5, help="Years of daily data")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per implementation")
+    args = parser.parse_args()
+
+    end = date(2025, 7, 1)
+    start = end - timedelta(days=365 * args.years - 1)
+    start_date, end_date = start.isoformat(), end.isoformat()
+    history_start = date.fromisoformat(lookback_start(start_date))
+    rows = sample_rows(history_start, (end - history_start).days + 1)
+    print(f"{len(rows)} logged days between {start_date} and {end_date}")
+
+    baseline, baseline_timings = time_runs(lambda: per_row_trends(rows, start_date, end_date), max(1, args.runs // 10))
+    vectorized, vectorized_timings = time_runs(
+        lambda: range_trends(rows, start_date, end_date, GOALS, TOLERANCE), args.runs
+    )
+
+    # Both implementations must agree before their timings mean anything
+    assert vectorized['streaks']['longest_logging'] == baseline['longest_logging']
+    for field in MACRO_FIELDS:
+        expected = round(baseline['on_goal'][field] * 100 / vectorized['days_with_data'], 1)
+        assert vectorized['adherence'][field] == expected, field
+    for window in ROLLING_WINDOWS:
+        for day, expected in zip(vectorized[f"rolling_{window}"]['protein'], baseline['rolling'][window]):
+            assert (day is None) == (expected is None)
+            assert day is None or abs(day - expected['protein']) <= 0.051
+
+    report("per-row dicts", baseline_timings)
+    report("vectorized (NumPy)", vectorized_timings)
+    print(f"speedup: {statistics.median(baseline_timings) / statistics.median(vectorized_timings):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Load-test the API in-process against in-memory tables.
+
+    python -m backend.scripts.load_test
+    python -m backend.scripts.load_test --workload read-heavy --concurrency 32 --requests 5000
+    python -m backend.scripts.load_test --db-latency-ms 5 --compare benchmark-results/load-abc1234-20250701-120000.json
+
+Boots backend.main:app (lifespan included) with every PostgREST call
+served by MemoryPostgrest and requests authenticated with locally signed
+access tokens, seeds users with profiles, goals and food log history,
+then drives a weighted mix of endpoints from --concurrency clients.
+
+Reports throughput, p50/p95/p99 latency, database calls and peak memory
+allocated per request for each operation, and saves the results as JSON
+under benchmark-results/ named after the current commit. --compare
+prints the change against an earlier results file and exits with status
+1 if any operation regressed by more than --threshold percent.
+
+Latencies include the in-process HTTP client and an instant database
+(unless --db-latency-ms is set), so compare runs against each other on
+the same machine rather than reading them as production numbers.
+"""
+import os
+
+# The app reads its settings at import; point it at placeholders before loading it
+os.environ.setdefault("SUPABASE_URL", "http://memory-postgrest.invalid")
+os.environ.setdefault("SUPABASE_KEY", "memory.postgrest.key")
+os.environ.setdefault("JWT_SECRET_KEY", "load-test-jwt-secret")
+os.environ.setdefault("EMAIL_TRANSPORT", "fake")
+os.environ.setdefault("EMAIL_OUTBOX_PATH", os.path.join(os.getenv("TMPDIR", "/tmp"), "load_test_outbox.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+import jwt
+from backend.config import settings
+from backend.database import client_registry
+from backend.main import app
+from backend.scripts.memory_postgrest import MemoryPostgrest
+from backend.services.metrics import metrics_registry
+from backend.services.rollup_service import rollup_service
+
+RESULTS_DIR = "benchmark-results"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+FOODS = (
+    ("Oatmeal", 150, 5.0, 27.0, 3.0),
+    ("Greek yogurt", 146, 20.0, 7.8, 3.8),
+    ("Chicken breast", 165, 31.0, 0.0, 3.6),
+    ("Brown rice", 216, 5.0, 45.0, 1.8),
+    ("Banana", 105, 1.3, 27.0, 0.4),
+    ("Salmon", 208, 20.0, 0.0, 13.0),
+    ("Almonds", 164, 6.0, 6.1, 14.0),
+    ("Broccoli", 55, 3.7, 11.2, 0.6),
+)
+
+
+@dataclass
+class User:
+    user_id: str
+    headers: Dict[str, str]
+
+
+@dataclass
+class Operation:
+    name: str
+    method: str
+    # Route template, as labelled in the request metrics
+    route: str
+    build: Callable[[User, random.Random], Tuple[str, Optional[Dict[str, Any]]]]
+
+
+def _food_log(user: User, rng: random.Random):
+    name, calories, protein, carbs, fat = rng.choice(FOODS)
+    return "/food-logs/", {
+        "meal_type": rng.choice(MEAL_TYPES),
+        "food_name": name,
+        "calories": calories,
+        "protein": protein,
+        "carbs": carbs,
+        "fat": fat,
+    }
+
+
+OPERATIONS = {
+    operation.name: operation for operation in (
+        Operation("log_food", "POST", "/food-logs/", _food_log),
+        Operation("list_logs", "GET", "/food-logs/", lambda user, rng: ("/food-logs/?limit=50", None)),
+        Operation("daily_summary", "GET", "/food-logs/summary/daily", lambda user, rng: ("/food-logs/summary/daily", None)),
+        Operation("weekly_summary", "GET", "/food-logs/summary/weekly", lambda user, rng: ("/food-logs/summary/weekly", None)),
+        Operation("get_goals", "GET", "/macro-goals/", lambda user, rng: ("/macro-goals/", None)),
+        Operation("edit_goals", "PUT", "/macro-goals/", lambda user, rng: ("/macro-goals/", {"total_calories": rng.randrange(1800, 2800, 50)})),
+    )
+}
+
+# Relative weight of each operation in a workload
+WORKLOADS = {
+    "mixed": {"log_food": 30, "list_logs": 25, "daily_summary": 25, "weekly_summary": 10, "get_goals": 5, "edit_goals": 5},
+    "read-heavy": {"log_food": 5, "list_logs": 35, "daily_summary": 35, "weekly_summary": 15, "get_goals": 10},
+    "write-heavy": {"log_food": 70, "list_logs": 10, "daily_summary": 10, "edit_goals": 10},
+}
+
+
+def access_token(user_id: str) -> str:
+    """An access token the app verifies locally, as Supabase Auth would issue it"""
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "email": f"{user_id}@load-test.invalid",
+        "aud": settings.JWT_AUDIENCE,
+        "role": "authenticated",
+        "iat": now,
+        "exp": now + 24 * 3600,
+    }
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm="HS256")
+
+
+def seed(store: MemoryPostgrest, users: int, days: int, logs_per_day: int, rng: random.Random) -> List[User]:
+    """Profiles, goals and `days` of food log history ending now, for each user"""
+    seeded = []
+    now = datetime.now(timezone.utc)
+    for index in range(users):
+        user_id = f"00000000-0000-4000-8000-{index:012d}"
+        store.insert_rows("user_profiles", [{"user_id": user_id, "display_name": f"User {index}", "timezone": "UTC"}])
+        store.insert_rows("macro_goals", [{
+            "user_id": user_id, "total_calories": 2200, "protein_pct": 30.0, "carb_pct": 40.0, "fat_pct": 30.0,
+        }])
+        logs = []
+        for day in range(days):
+            for entry in range(logs_per_day):
+                name, calories, protein, carbs, fat = rng.choice(FOODS)
+                logged_at = now - timedelta(days=day, minutes=entry * 180 + rng.randrange(60))
+                logs.append({
+                    "user_id": user_id,
+                    "meal_type": MEAL_TYPES[entry % len(MEAL_TYPES)],
+                    "food_name": name,
+                    "calories": calories,
+                    "protein": protein,
+                    "carbs": carbs,
+                    "fat": fat,
+                    "logged_at": logged_at.isoformat(),
+                })
+        store.insert_rows("food_logs", logs)
+        seeded.append(User(user_id, {"Authorization": f"Bearer {access_token(user_id)}"}))
+    return seeded
+
+
+async def send(client: httpx.AsyncClient, operation: Operation, user: User, rng: random.Random) -> int:
+    url, body = operation.build(user, rng)
+    response = await client.request(operation.method, url, json=body, headers=user.headers)
+    return response.status_code
+
+
+async def run_workload(client, users, weights, concurrency, requests, duration, seed_value):
+    """Drive the workload from `concurrency` clients; returns latencies (seconds) and error counts per operation"""
+    names = list(weights)
+    cumulative = []
+    total = 0
+    for name in names:
+        total += weights[name]
+        cumulative.append(total)
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(index: int):
+        nonlocal issued
+        rng = random.Random(seed_value + index)
+        while (requests is None or issued < requests) and (deadline is None or time.perf_counter() < deadline):
+            issued += 1
+            name = rng.choices(names, cum_weights=cumulative)[0]
+            started = time.perf_counter()
+            status = await send(client, OPERATIONS[name], rng.choice(users), rng)
+            latencies[name].append(time.perf_counter() - started)
+            if status >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def measure_allocations(client, users, names, samples: int, seed_value: int) -> Dict[str, float]:
+    """Median peak memory (KiB) allocated while serving one request of each operation"""
+    rng = random.Random(seed_value)
+    peaks: Dict[str, List[float]] = {name: [] for name in names}
+    tracemalloc.start()
+    try:
+        for name in names:
+            for _ in range(samples):
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                await send(client, OPERATIONS[name], rng.choice(users), rng)
+                peaks[name].append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+    return {name: round(statistics.median(values), 1) for name, values in peaks.items()}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput": round(len(ordered) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def db_calls_per_request(operation: Operation) -> Optional[float]:
+    route = metrics_registry.routes.get((operation.method, operation.route))
+    if route is None or not route.db_calls.count:
+        return None
+    return round(route.db_calls.sum / route.db_calls.count, 2)
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    store = MemoryPostgrest(latency=args.db_latency_ms / 1000)
+    client_registry.use_transport(store.transport())
+    users = seed(store, args.users, args.days, args.logs_per_day, rng)
+    weights = WORKLOADS[args.workload]
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            started = time.perf_counter()
+            for user in users:
+                await rollup_service.rebuild(user.user_id)
+            print(
+                f"Seeded {len(users)} users x {args.days} days x {args.logs_per_day} logs "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+
+            # Warm caches (goals, time zones, verified tokens) for every user
+            for user in users:
+                for name in weights:
+                    if OPERATIONS[name].method == "GET":
+                        await send(client, OPERATIONS[name], user, rng)
+            metrics_registry.reset()
+
+            latencies, errors, elapsed = await run_workload(
+                client, users, weights, args.concurrency, args.requests, args.duration, args.seed
+            )
+            allocations = await measure_allocations(client, users, list(weights), args.allocation_samples, args.seed)
+
+    client_registry.use_transport(None)
+
+    everything = [value for values in latencies.values() for value in values]
+    operations = {}
+    for name in weights:
+        operations[name] = {
+            **summarize(latencies[name], errors[name], elapsed),
+            "db_calls": db_calls_per_request(OPERATIONS[name]),
+            "peak_alloc_kib": allocations[name],
+        }
+
+    return {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "workload": args.workload,
+            "users": args.users,
+            "days": args.days,
+            "logs_per_day": args.logs_per_day,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "duration": args.duration,
+            "db_latency_ms": args.db_latency_ms,
+            "seed": args.seed,
+        },
+        "total": summarize(everything, sum(errors.values()), elapsed),
+        "operations": operations,
+    }
+
+
+def print_results(results: Dict[str, Any]):
+    print(f"\n{'operation':<16}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'db calls':>10}{'peak KiB':>10}")
+    rows = list(results["operations"].items()) + [("total", results["total"])]
+    for name, stats in rows:
+        if not stats["requests"]:
+            continue
+        db_calls = stats.get("db_calls")
+        alloc = stats.get("peak_alloc_kib")
+        print(
+            f"{name:<16}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput']:>9.1f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+            f"{'' if db_calls is None else db_calls:>10}{'' if alloc is None else alloc:>10}"
+        )
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change from `baseline` and return the operations that regressed"""
+    print(f"\nChange since {baseline['commit']} ({baseline['created_at']}):")
+    if baseline.get("config") != results["config"]:
+        print("  note: runs used different settings; differences may not be meaningful")
+    regressions = []
+    for name, stats in list(results["operations"].items()) + [("total", results["total"])]:
+        before = baseline["operations"].get(name) if name != "total" else baseline["total"]
+        if not before or not before.get("requests") or not stats["requests"]:
+            continue
+        changes = {
+            "p50": (stats["p50_ms"] / before["p50_ms"] - 1) * 100,
+            "p95": (stats["p95_ms"] / before["p95_ms"] - 1) * 100,
+            "req/s": (stats["throughput"] / before["throughput"] - 1) * 100,
+        }
+        regressed = changes["p95"] > threshold or changes["req/s"] < -threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            f"  {name:<16}" + "  ".join(f"{label} {change:+6.1f}%" for label, change in changes.items())
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against in-memory tables")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed", help="Operation mix")
+    parser.add_argument("--users", type=int, default=50, help="Seeded users")
+    parser.add_argument("--days", type=int, default=30, help="Days of food log history per user")
+    parser.add_argument("--logs-per-day", type=int, default=4, help="Food logs per user per day")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated round trip per database call")
+    parser.add_argument("--allocation-samples", type=int, default=20, help="Traced requests per operation")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for data and request mix")
+    parser.add_argument("--output", default=None, help="Results file (default benchmark-results/load-<commit>-<time>.json)")
+    parser.add_argument("--no-save", action="store_true", help="Do not write a results file")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+    if args.duration:
+        args.requests = None
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    if not args.no_save:
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"load-{results['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\nRegressed beyond {args.threshold:g}%: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+In-memory stand-in for the Supabase PostgREST API, used by load_test.
+
+Serves the subset of PostgREST the repositories use (eq/neq/gt/gte/lt/
+lte/in filters, `or` cursors, order, limit, insert, upsert with
+on_conflict, update, delete) plus the app's database functions, over an
+httpx transport. Install it with
+`client_registry.use_transport(MemoryPostgrest().transport())`.
+
+Rows are partitioned by user_id, as the real tables are indexed, so a
+user's query costs the same however many users are loaded. It is not a
+full PostgREST: `select` takes a plain column list (no embedded
+resources or renames).
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from backend.services.aggregation_service import MACRO_FIELDS, aggregate_rows
+from backend.services.day_buckets import parse_timestamp
+import httpx
+import json
+import threading
+import time
+import uuid
+
+# Columns identifying a row for upserts and duplicate checks, per table
+PRIMARY_KEYS = {
+    'food_logs': ('id',),
+    'macro_goals': ('user_id',),
+    'user_profiles': ('user_id',),
+    'daily_totals': ('user_id', 'log_date'),
+}
+
+# Server-side column defaults applied on insert
+TIMESTAMP_DEFAULTS = {
+    'food_logs': ('created_at', 'updated_at', 'logged_at'),
+    'macro_goals': ('created_at', 'updated_at'),
+    'user_profiles': ('created_at', 'updated_at'),
+}
+
+Filter = Tuple[str, str, str]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in expression:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+def _comparable(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column.endswith('_at'):
+        return parse_timestamp(value)
+    return value
+
+
+def _coerce(column: str, raw: str, sample: Any) -> Any:
+    """Filter operand as the same type as the column's stored values"""
+    raw = raw.strip('"')
+    if column.endswith('_at'):
+        return parse_timestamp(raw)
+    if isinstance(sample, bool):
+        return raw == 'true'
+    if isinstance(sample, (int, float)):
+        return float(raw)
+    return raw
+
+
+def _matches(row: Dict[str, Any], condition: Filter) -> bool:
+    column, op, raw = condition
+    value = _comparable(column, row.get(column))
+    if op == 'in':
+        options = [option.strip('"') for option in _split_top_level(raw.strip('()'))]
+        return str(row.get(column)) in options
+    if op == 'is':
+        return value is None if raw == 'null' else str(value).lower() == raw
+    operand = _coerce(column, raw, value)
+    if op == 'eq':
+        return value == operand
+    if op == 'neq':
+        return value != operand
+    if value is None:
+        return False
+    if op == 'gt':
+        return value > operand
+    if op == 'gte':
+        return value >= operand
+    if op == 'lt':
+        return value < operand
+    if op == 'lte':
+        return value <= operand
+    raise ValueError(f"Unsupported filter operator '{op}'")
+
+
+def _parse_condition(text: str) -> Filter:
+    column, op, raw = text.split('.', 2)
+    return column, op, raw
+
+
+def _matches_or(row: Dict[str, Any], expression: str) -> bool:
+    """PostgREST `or=(a.lt.x,and(b.eq.y,c.lt.z))`"""
+    for part in _split_top_level(expression.strip()[1:-1]):
+        if part.startswith('and('):
+            conditions = [_parse_condition(item) for item in _split_top_level(part[4:-1])]
+            if all(_matches(row, condition) for condition in conditions):
+                return True
+        elif _matches(row, _parse_condition(part)):
+            return True
+    return False
+
+
+class _Query:
+    """Filters, `or` expressions, order, limit and on_conflict from a PostgREST query string"""
+
+    def __init__(self, request: httpx.Request):
+        self.filters: List[Filter] = []
+        self.ors: List[str] = []
+        self.order: List[Tuple[str, bool]] = []
+        self.limit: Optional[int] = None
+        self.on_conflict: Optional[Tuple[str, ...]] = None
+        self.columns: Optional[List[str]] = None
+        for key, value in parse_qsl(request.url.query.decode(), keep_blank_values=True):
+            if key in ('columns', 'offset'):
+                continue
+            if key == 'select':
+                self.columns = None if value == '*' else value.split(',')
+                continue
+            if key == 'order':
+                self.order = [(part.split('.')[0], '.desc' in part) for part in value.split(',')]
+            elif key == 'limit':
+                self.limit = int(value)
+            elif key == 'on_conflict':
+                self.on_conflict = tuple(value.split(','))
+            elif key == 'or':
+                self.ors.append(value)
+            else:
+                op, raw = value.split('.', 1)
+                self.filters.append((key, op, raw))
+
+    def select(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            row for row in rows
+            if all(_matches(row, condition) for condition in self.filters)
+            and all(_matches_or(row, expression) for expression in self.ors)
+        ]
+
+    def arrange(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply order, limit and the selected columns"""
+        for column, descending in reversed(self.order):
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: _comparable(column, row[column]), reverse=descending)
+            rows = missing + present if descending else present + missing
+        rows = rows[:self.limit] if self.limit is not None else rows
+        if self.columns is not None:
+            rows = [{column: row.get(column) for column in self.columns} for row in rows]
+        return rows
+
+
+class MemoryPostgrest:
+    """Thread-safe in-memory tables behind a PostgREST-shaped HTTP API"""
+
+    def __init__(self, latency: float = 0.0):
+        # Simulated network round trip per request, in seconds
+        self.latency = latency
+        self.tables: Dict[str, Dict[Optional[str], List[Dict[str, Any]]]] = {}
+        self.functions: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            'apply_daily_totals_delta': self._apply_daily_totals_delta,
+            'food_log_totals': self._food_log_totals,
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def partition(self, table: str, user_id: Optional[str]) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(table, {}).setdefault(user_id, [])
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """Load rows directly, bypassing HTTP (for seeding)"""
+        with self._lock:
+            for row in rows:
+                self._insert(table, dict(row))
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return [row for partition in self.tables.get(table, {}).values() for row in partition]
+
+    # HTTP
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            time.sleep(self.latency)
+        self.requests += 1
+
+        path = request.url.path.split('/rest/v1/', 1)[1]
+        try:
+            with self._lock:
+                query = _Query(request)
+                if path.startswith('rpc/'):
+                    return self._call(path[4:], json.loads(request.content or b'{}'), query)
+                return self._table_request(path, request, query)
+        except ValueError as e:
+            return _error(400, 'PGRST100', str(e))
+
+    def _call(self, name: str, params: Dict[str, Any], query: '_Query') -> httpx.Response:
+        function = self.functions.get(name)
+        if function is None:
+            return _error(404, 'PGRST202', f"Could not find the function public.{name}")
+        result = function(params)
+        # Set-returning functions can be filtered, ordered and limited like tables
+        if isinstance(result, list):
+            result = query.arrange(query.select(result))
+        return httpx.Response(200, json=result)
+
+    def _table_request(self, table: str, request: httpx.Request, query: '_Query') -> httpx.Response:
+        user_ids = [raw for column, op, raw in query.filters if column == 'user_id' and op == 'eq']
+        candidates = self.partition(table, user_ids[0]) if user_ids else self.rows(table)
+        selected = query.select(candidates)
+
+        if request.method == 'GET':
+            return httpx.Response(200, json=query.arrange(selected))
+
+        if request.method == 'POST':
+            body = json.loads(request.content)
+            prefer = request.headers.get('prefer', '')
+            return self._insert_request(table, body if isinstance(body, list) else [body], prefer, query.on_conflict)
+
+        if request.method == 'PATCH':
+            changes = json.loads(request.content)
+            for row in selected:
+                row.update(changes)
+                if 'updated_at' in TIMESTAMP_DEFAULTS.get(table, ()) and 'updated_at' not in changes:
+                    row['updated_at'] = _now()
+            return httpx.Response(200, json=selected)
+
+        if request.method == 'DELETE':
+            for row in selected:
+                self.partition(table, row.get('user_id')).remove(row)
+            return httpx.Response(200, json=selected)
+
+        return _error(405, 'PGRST117', f"Unsupported HTTP method {request.method}")
+
+    def _insert_request(self, table, rows, prefer, on_conflict) -> httpx.Response:
+        keys = on_conflict or PRIMARY_KEYS.get(table, ('id',))
+        upsert = 'resolution=' in prefer
+        written = []
+        for row in rows:
+            existing = self._find(table, keys, row)
+            if existing is not None:
+                if not upsert:
+                    return _error(409, '23505', f"duplicate key value violates unique constraint on {table}")
+                if 'ignore-duplicates' in prefer:
+                    continue
+                existing.update(row)
+                if 'updated_at' in TIMESTAMP_DEFAULTS.get(table, ()):
+                    existing['updated_at'] = _now()
+                written.append(existing)
+            else:
+                written.append(self._insert(table, dict(row)))
+        return httpx.Response(201, json=written)
+
+    def _find(self, table: str, keys: Tuple[str, ...], row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if any(row.get(key) is None for key in keys):
+            return None
+        for candidate in self.partition(table, row.get('user_id')):
+            if all(str(candidate.get(key)) == str(row[key]) for key in keys):
+                return candidate
+        return None
+
+    def _insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        if 'id' in PRIMARY_KEYS.get(table, ()):
+            row.setdefault('id', str(uuid.uuid4()))
+        now = _now()
+        for column in TIMESTAMP_DEFAULTS.get(table, ()):
+            if row.get(column) is None:
+                row[column] = now
+        self.partition(table, row.get('user_id')).append(row)
+        return row
+
+    # Database functions (backend/sql)
+
+    def _apply_daily_totals_delta(self, params: Dict[str, Any]):
+        key = {'user_id': params['p_user_id'], 'log_date': params['p_log_date']}
+        row = self._find('daily_totals', PRIMARY_KEYS['daily_totals'], key)
+        if row is None:
+            row = self._insert('daily_totals', {
+                **key, **{field: 0 for field in MACRO_FIELDS}, 'entry_count': 0, 'meals': {},
+            })
+        meal = row['meals'].setdefault(
+            params['p_meal_type'], {**{field: 0 for field in MACRO_FIELDS}, 'entry_count': 0}
+        )
+        for field in MACRO_FIELDS + ('entry_count',):
+            row[field] += params[f'p_{field}']
+            meal[field] += params[f'p_{field}']
+        return None
+
+    def _food_log_totals(self, params: Dict[str, Any]):
+        start, end = parse_timestamp(params['p_start']), parse_timestamp(params['p_end'])
+        rows = [
+            row for row in self.partition('food_logs', params['p_user_id'])
+            if start <= parse_timestamp(row['logged_at']) < end
+        ]
+        return aggregate_rows(rows, params.get('p_timezone', 'UTC'))
+
+
+def _error(status: int, code: str, message: str) -> httpx.Response:
+    return httpx.Response(status, json={'code': code, 'message': message, 'details': None, 'hint': None})
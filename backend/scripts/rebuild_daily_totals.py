@@ -0,0 +1,58 @@
+"""
+Verify or rebuild the daily_totals rollup from the raw food_logs rows.
+
+    python -m backend.scripts.rebuild_daily_totals --verify
+    python -m backend.scripts.rebuild_daily_totals --user-id <uuid> --from 2025-07-01 --to 2025-07-31
+
+Without --user-id every user with food logs is processed, which needs a
+service-role SUPABASE_KEY so RLS does not hide other users' rows. Exits
+with status 1 when --verify finds drift.
+"""
+import argparse
+import asyncio
+import sys
+from backend.database import close_supabase
+from backend.logging_config import configure_logging, stop_logging
+from backend.repositories import food_log_repository
+from backend.services.rollup_service import rollup_service, MIN_DATE, MAX_DATE
+
+
+async def run(user_ids, start_date: str, end_date: str, verify_only: bool) -> bool:
+    """Process every user and return True if any drift was found"""
+    if not user_ids:
+        user_ids = await food_log_repository.list_user_ids()
+
+    drift_found = False
+    for user_id in user_ids:
+        report = await rollup_service.rebuild(user_id, start_date, end_date, verify_only=verify_only)
+        drifted = report['drifted_days'] + report['stale_days']
+        drift_found = drift_found or bool(drifted)
+
+        status = "ok" if not drifted else ("DRIFT" if verify_only else "repaired")
+        print(f"{user_id}: {report['days_checked']} days checked, {len(drifted)} drifted ({status})")
+        for log_date in drifted:
+            print(f"    {log_date}")
+
+    return drift_found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify or rebuild the daily_totals rollup")
+    parser.add_argument("--user-id", action="append", dest="user_ids", help="Only process this user (repeatable)")
+    parser.add_argument("--from", dest="start_date", default=MIN_DATE, help="First day to check (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", default=MAX_DATE, help="Last day to check (YYYY-MM-DD)")
+    parser.add_argument("--verify", action="store_true", help="Report drift without repairing it")
+    args = parser.parse_args()
+
+    configure_logging()
+    try:
+        drift_found = asyncio.run(run(args.user_ids, args.start_date, args.end_date, args.verify))
+    finally:
+        close_supabase()
+        stop_logging()
+
+    sys.exit(1 if drift_found and args.verify else 0)
+
+
+if __name__ == "__main__":
+    main()
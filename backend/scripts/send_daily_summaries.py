@@ -0,0 +1,66 @@
+"""
+Email every active user their daily macro summary.
+
+    python -m backend.scripts.send_daily_summaries
+    python -m backend.scripts.send_daily_summaries --date 2025-07-01 --shards 4 --shard 0 --deliver
+
+Defaults to yesterday. Digests are queued to the email outbox, where the
+running app's outbox worker sends them; pass --deliver to drain the outbox
+from this process instead. Run one process per shard to split the users
+between workers. Needs a service-role SUPABASE_KEY.
+"""
+import argparse
+import asyncio
+from datetime import date, timedelta
+from backend.database import close_supabase
+from backend.logging_config import configure_logging, stop_logging
+from backend.services.daily_digest_service import daily_digest_job
+from backend.services.email_outbox import email_outbox, outbox_worker
+from backend.services.email_transports import close_transport
+
+
+async def run(log_date: str, shard_index: int, shard_count: int, page_size: int, deliver: bool):
+    stats = await daily_digest_job.run(log_date, shard_index, shard_count, page_size)
+    print(
+        f"{stats['date']} shard {stats['shard']}/{stats['shards']}: "
+        f"{stats['users']} users, {stats['queued']} queued, {stats['already_queued']} already queued, "
+        f"{stats['skipped']} skipped "
+        f"in {stats['elapsed_seconds']}s ({stats['users_per_second']} users/s)"
+    )
+
+    if deliver:
+        # Fail here rather than count every queued email as a failed attempt
+        outbox_worker.transport
+        while await outbox_worker.drain_once():
+            pass
+        print(f"Outbox: {email_outbox.stats()}")
+        await close_transport()
+
+
+def main():
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    parser = argparse.ArgumentParser(description="Queue daily summary emails for every active user")
+    parser.add_argument("--date", default=yesterday, help="Day to summarise (YYYY-MM-DD, default yesterday)")
+    parser.add_argument("--shards", type=int, default=1, help="Total number of shards")
+    parser.add_argument("--shard", type=int, default=0, help="Shard handled by this process (0-based)")
+    parser.add_argument("--page-size", type=int, default=None, help="Users fetched per database round trip")
+    parser.add_argument("--deliver", action="store_true", help="Send the queued emails before exiting")
+    args = parser.parse_args()
+
+    try:
+        daily_digest_job.check_configuration()
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    configure_logging()
+    try:
+        asyncio.run(run(args.date, args.shard, args.shards, args.page_size, args.deliver))
+    finally:
+        email_outbox.close()
+        close_supabase()
+        stop_logging()
+
+
+if __name__ == "__main__":
+    main()
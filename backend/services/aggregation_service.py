@@ -0,0 +1,138 @@
+from typing import Any, Dict, Iterable, List
+from postgrest.exceptions import APIError
+from backend.config import settings
+from backend.repositories import food_log_repository
+from backend.services.day_buckets import DEFAULT_TIMEZONE, buckets_covering, parse_timestamp
+import logging
+
+logger = logging.getLogger(__name__)
+
+MACRO_FIELDS = ('calories', 'protein', 'carbs', 'fat')
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {'calories': 0, 'protein': 0.0, 'carbs': 0.0, 'fat': 0.0, 'entry_count': 0}
+
+
+def aggregate_rows(rows: Iterable[Dict[str, Any]], timezone: str = DEFAULT_TIMEZONE) -> List[Dict[str, Any]]:
+    """
+    In-process equivalent of the food_log_totals database function.
+
+    Groups raw food log rows by (local log_date, meal_type) and sums their
+    macros. Days are looked up in one precomputed offset table spanning
+    the rows instead of converting every timestamp to `timezone`.
+    """
+    rows = list(rows)
+    stamps = [parse_timestamp(row['logged_at']) for row in rows]
+    buckets = buckets_covering(stamps, timezone)
+
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for row, stamp in zip(rows, stamps):
+        key = (buckets.day_of(stamp), row['meal_type'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'log_date': key[0], 'meal_type': key[1], **_empty_totals()}
+        for field in MACRO_FIELDS:
+            group[field] += row[field]
+        group['entry_count'] += 1
+
+    return [groups[key] for key in sorted(groups)]
+
+
+def combine_totals(groups: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum a set of (log_date, meal_type) groups into a single total"""
+    totals = _empty_totals()
+    for group in groups:
+        for field in MACRO_FIELDS:
+            totals[field] += group[field]
+        totals['entry_count'] += group['entry_count']
+    return totals
+
+
+def totals_by_date(groups: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Collapse groups into one total per log_date"""
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for group in groups:
+        by_date.setdefault(group['log_date'], []).append(group)
+    return {log_date: combine_totals(day_groups) for log_date, day_groups in by_date.items()}
+
+
+def totals_by_meal(groups: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse groups into one total per meal_type"""
+    by_meal: Dict[str, List[Dict[str, Any]]] = {}
+    for group in groups:
+        by_meal.setdefault(group['meal_type'], []).append(group)
+    return [
+        {'meal_type': meal_type, **combine_totals(meal_groups)}
+        for meal_type, meal_groups in by_meal.items()
+    ]
+
+
+def daily_summary(target_date: str, groups: List[Dict[str, Any]], goals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the daily summary (DailySummaryResponse fields) from a day's
+    per-meal groups and the user's goal grams.
+    """
+    day_totals = combine_totals(groups)
+    meals = [
+        {
+            'meal_type': meal['meal_type'],
+            'calories': meal['calories'],
+            'protein': round(meal['protein'], 1),
+            'carbs': round(meal['carbs'], 1),
+            'fat': round(meal['fat'], 1)
+        }
+        for meal in totals_by_meal(groups)
+    ]
+
+    return {
+        'date': target_date,
+        'total_calories': day_totals['calories'],
+        'total_protein': round(day_totals['protein'], 1),
+        'total_carbs': round(day_totals['carbs'], 1),
+        'total_fat': round(day_totals['fat'], 1),
+        'goal_calories': goals['calories'],
+        'goal_protein': round(goals['protein'], 1),
+        'goal_carbs': round(goals['carbs'], 1),
+        'goal_fat': round(goals['fat'], 1),
+        'calories_remaining': max(0, goals['calories'] - day_totals['calories']),
+        'protein_remaining': round(max(0, goals['protein'] - day_totals['protein']), 1),
+        'carbs_remaining': round(max(0, goals['carbs'] - day_totals['carbs']), 1),
+        'fat_remaining': round(max(0, goals['fat'] - day_totals['fat']), 1),
+        'meals': meals
+    }
+
+
+class AggregationService:
+    """
+    Computes per-day, per-meal macro totals for a user over a time window.
+
+    With AGGREGATION_BACKEND="database" the GROUP BY runs in Postgres via the
+    food_log_totals function (backend/sql/001_food_log_totals.sql, made time
+    zone aware by 007_user_timezones.sql) and only the totals cross the wire.
+    With "python", or if the function is not installed, only the macro
+    columns are fetched and aggregated in-process.
+
+    `start`/`end` are half-open UTC bounds (see day_buckets.utc_range) and
+    logs are grouped by their local day in `timezone`.
+    """
+
+    def __init__(self, repository=food_log_repository):
+        self.repository = repository
+
+    async def totals(self, user_id: str, start: str, end: str, timezone: str = DEFAULT_TIMEZONE) -> List[Dict[str, Any]]:
+        if settings.AGGREGATION_BACKEND == "database":
+            try:
+                groups = await self.repository.totals_by_day_and_meal(user_id, start, end, timezone)
+                return [
+                    {**group, 'log_date': str(group['log_date'])[:10]}
+                    for group in groups
+                ]
+            except APIError as e:
+                logger.warning(f"food_log_totals unavailable, aggregating in-process: {e}")
+
+        rows = await self.repository.list_macros_between(user_id, start, end)
+        return aggregate_rows(rows, timezone)
+
+
+aggregation_service = AggregationService()
@@ -1,12 +1,24 @@
+from typing import Optional
 from supabase import Client
 from backend.database import get_supabase
+from backend.services.token_verifier import token_verifier
 import logging
 
 logger = logging.getLogger(__name__)
+# Logged on every authenticated request; sampled by LOG_SAMPLE_RATES
+token_logger = logging.getLogger(f"{__name__}.tokens")
 
 class AuthService:
     def __init__(self):
-        self.supabase: Client = get_supabase()
+        self._supabase: Optional[Client] = None
+    
+    @property
+    def supabase(self) -> Client:
+        """Supabase client, created on first use so importing the app does no I/O"""
+        if self._supabase is None:
+            # Dedicated client: signing users in must not touch the shared data client
+            self._supabase = get_supabase("auth")
+        return self._supabase
     
     async def signup_user(self, email: str, password: str):
         """
@@ -75,16 +87,12 @@ class AuthService:
     
     async def get_current_user(self, access_token: str):
         """
-        Get current user from access token by decoding JWT
+        Get current user from access token by verifying the JWT locally
         """
         try:
-            import jwt
-            
-            # Decode the JWT token without verification (for now)
-            # In production, you'd want to verify the signature
-            decoded = jwt.decode(access_token, options={"verify_signature": False})
+            decoded = await token_verifier.verify_async(access_token)
             
-            # Extract user info from the decoded token
+            # Extract user info from the verified token
             user_id = decoded.get('sub')
             email = decoded.get('email')
             
@@ -95,7 +103,7 @@ class AuthService:
                     "error": "Invalid token format"
                 }
             
-            logger.info(f"Retrieved user from token: {email}")
+            token_logger.info("Retrieved user from token", extra={"user_id": user_id})
             return {
                 "success": True,
                 "user_id": user_id,
@@ -107,4 +115,13 @@ class AuthService:
             return {
                 "success": False,
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+
+_auth_service: Optional[AuthService] = None
+
+def get_auth_service() -> AuthService:
+    """Return the process-wide AuthService, creating it on first use"""
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+    return _auth_service
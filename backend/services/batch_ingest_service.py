@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from backend.config import settings
+from backend.models import FoodLogBatchItem
+from backend.repositories import food_log_repository
+from backend.services.rollup_service import rollup_service
+from backend.services.food_catalog import food_catalog
+from backend.services.frequent_foods import frequent_foods
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def ingest_food_logs(user_id: str, items: List[FoodLogBatchItem]) -> List[Dict[str, Any]]:
+    """
+    Insert a batch of food logs with one multi-row insert per chunk.
+
+    Returns one result per item, in request order, with status "created",
+    "duplicate" (its idempotency_key was already stored, or repeats an
+    earlier item in the batch) or "error" (its chunk failed to insert).
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    first_index_by_key: Dict[str, int] = {}
+    repeats: Dict[int, int] = {}
+    pending = []
+
+    for index, item in enumerate(items):
+        key = item.idempotency_key
+        if key is not None:
+            if key in first_index_by_key:
+                repeats[index] = first_index_by_key[key]
+                continue
+            first_index_by_key[key] = index
+
+        pending.append((index, {
+            'id': str(uuid4()),
+            'user_id': user_id,
+            'meal_type': item.meal_type,
+            'food_name': item.food_name,
+            'calories': item.calories,
+            'protein': item.protein,
+            'carbs': item.carbs,
+            'fat': item.fat,
+            'idempotency_key': key,
+        }))
+
+    created_logs = []
+    for chunk in _chunks(pending, settings.BATCH_INSERT_CHUNK_SIZE):
+        try:
+            inserted = await food_log_repository.insert_many([row for _, row in chunk])
+        except Exception as e:
+            logger.error(f"Batch insert of {len(chunk)} food logs failed: {e}")
+            for index, _ in chunk:
+                results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+
+        inserted_by_id = {log['id']: log for log in inserted}
+        for index, row in chunk:
+            log = inserted_by_id.get(row['id'])
+            if log is not None:
+                results[index] = {'index': index, 'status': 'created', 'log': log}
+                created_logs.append(log)
+
+    # Rows skipped by the insert carry a key that was already stored
+    skipped = {row['idempotency_key']: index for index, row in pending if results[index] is None}
+    for keys in _chunks(list(skipped), settings.BATCH_INSERT_CHUNK_SIZE):
+        existing = await food_log_repository.list_by_idempotency_keys(user_id, keys)
+        for log in existing:
+            index = skipped[log['idempotency_key']]
+            results[index] = {'index': index, 'status': 'duplicate', 'log': log}
+
+    for index, first_index in repeats.items():
+        first = results[first_index]
+        results[index] = {'index': index, 'status': 'duplicate', 'log': first.get('log') if first else None}
+
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = {'index': index, 'status': 'error', 'error': "Food log was not inserted"}
+
+    await rollup_service.record_created_many(created_logs)
+    food_catalog.record_logged(created_logs)
+    frequent_foods.record_created(created_logs)
+    return results
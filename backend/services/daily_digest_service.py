@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Tuple
+from pydantic import ValidationError
+from backend.config import settings
+from backend.models import DailySummaryEmailRequest
+from backend.repositories import daily_totals_repository
+from backend.services.aggregation_service import daily_summary
+from backend.services.email_service import get_email_service
+from backend.services.goals_cache import compute_goal_grams
+from backend.services.rollup_service import rollup_rows_to_groups
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+GOAL_COLUMNS = ('total_calories', 'protein_pct', 'carb_pct', 'fat_pct')
+
+
+def digest_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Daily summary for one daily_summary_digests row (rollup, email and goals joined)"""
+    log_date = str(row['log_date'])[:10]
+    goals = {column: row[column] for column in GOAL_COLUMNS} if row.get('total_calories') is not None else None
+    return daily_summary(log_date, rollup_rows_to_groups([row]), compute_goal_grams(goals))
+
+
+class DailyDigestJob:
+    """
+    Emails every active user their daily summary for one day.
+
+    Rather than calling the summary endpoint per user, each page of users
+    comes from one set-based query (daily_totals joined with emails and
+    goals, backend/sql/006_daily_summary_digests.sql), is summarised
+    in-process and queued to the email outbox in one write, where the
+    outbox worker sends them in batches. Users are split into disjoint
+    shards by user_id so several processes can share the run, and each
+    digest is keyed by user and day so re-running a shard queues nothing
+    twice.
+    """
+
+    def __init__(self, repository=daily_totals_repository, email_service=None):
+        self.repository = repository
+        self._email_service = email_service
+
+    def check_configuration(self):
+        """Raise RuntimeError if the storage backend has no email addresses to send digests to"""
+        if settings.STORAGE_BACKEND == "sqlite":
+            raise RuntimeError(
+                "Daily summary emails need the email addresses in Supabase Auth (auth.users), "
+                "which a local STORAGE_BACKEND=sqlite database does not have. "
+                "Run the job with STORAGE_BACKEND=supabase or postgres."
+            )
+
+    @property
+    def email_service(self):
+        return self._email_service if self._email_service is not None else get_email_service()
+
+    async def run(self, log_date: str, shard_index: int = 0, shard_count: int = 1, page_size: int = None) -> Dict[str, Any]:
+        """Queue the digests for `log_date` in one shard and return timing stats"""
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError("shard index must be between 0 and shard count - 1")
+        page_size = page_size or settings.DAILY_DIGEST_PAGE_SIZE
+
+        started = time.perf_counter()
+        stats = {'date': log_date, 'shard': shard_index, 'shards': shard_count,
+                 'users': 0, 'queued': 0, 'already_queued': 0, 'skipped': 0, 'pages': 0}
+        after_user_id = None
+
+        while True:
+            rows = await self.repository.list_digests(log_date, shard_count, shard_index, after_user_id, page_size)
+            if not rows:
+                break
+
+            digests, skipped = self._build_digests(log_date, rows)
+            result = await self.email_service.queue_daily_summary_emails(digests)
+            if not result["success"]:
+                raise RuntimeError(result["message"])
+
+            stats['pages'] += 1
+            stats['users'] += len(rows)
+            stats['queued'] += result["queued"]
+            stats['already_queued'] += len(digests) - result["queued"]
+            stats['skipped'] += skipped
+            after_user_id = str(rows[-1]['user_id'])
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Daily digest {log_date} shard {shard_index}/{shard_count}: "
+                f"{stats['users']} users in {elapsed:.2f}s ({stats['users'] / elapsed:.0f} users/s)"
+            )
+            if len(rows) < page_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['users_per_second'] = round(stats['users'] / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+    def _build_digests(self, log_date: str, rows: List[Dict[str, Any]]) -> Tuple[List[Tuple[DailySummaryEmailRequest, Dict[str, Any]]], int]:
+        digests = []
+        skipped = 0
+        for row in rows:
+            try:
+                request = DailySummaryEmailRequest(user_id=str(row['user_id']), email=row['email'], date=log_date)
+            except ValidationError:
+                logger.warning(f"Skipping daily digest for user {row['user_id']}: invalid email address")
+                skipped += 1
+                continue
+            digests.append((request, digest_summary(row)))
+        return digests, skipped
+
+
+daily_digest_job = DailyDigestJob()
@@ -0,0 +1,126 @@
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+class InvalidTimezoneError(ValueError):
+    """Raised for names that are not IANA time zones (e.g. 'Mars/Olympus' or 'CEST')"""
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise InvalidTimezoneError(f"Unknown time zone '{name}'")
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        get_zone(name)
+        return True
+    except InvalidTimezoneError:
+        return False
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """Aware datetime for a logged_at value; naive values are taken as UTC"""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def local_today(timezone: str = DEFAULT_TIMEZONE) -> date:
+    return datetime.now(get_zone(timezone)).date()
+
+
+def local_date(logged_at: Any, timezone: str = DEFAULT_TIMEZONE) -> str:
+    """Day (YYYY-MM-DD) a single timestamp falls on in `timezone`"""
+    return parse_timestamp(logged_at).astimezone(get_zone(timezone)).date().isoformat()
+
+
+def day_start_utc(day: date, timezone: str = DEFAULT_TIMEZONE) -> datetime:
+    """
+    UTC instant at which `day` begins in `timezone`.
+
+    Where a DST change skips local midnight the day starts at the
+    transition itself, which is what the pre-transition offset gives.
+    """
+    try:
+        return datetime.combine(day, time(), tzinfo=get_zone(timezone)).astimezone(dt_timezone.utc)
+    except OverflowError:
+        # Only reachable at the ends of the calendar (0001-01-01 / 9999-12-31)
+        return datetime.combine(day, time(), tzinfo=dt_timezone.utc)
+
+
+def utc_range(start_date: str, end_date: str, timezone: str = DEFAULT_TIMEZONE) -> Tuple[str, str]:
+    """
+    Half-open `[start, end)` UTC bounds, as ISO strings, covering the local
+    days `start_date` through `end_date` inclusive.
+
+    Query with `logged_at >= start and logged_at < end`, so the last
+    second of the final day is included and the range stays one index
+    scan on (user_id, logged_at).
+    """
+    start = day_start_utc(date.fromisoformat(start_date), timezone)
+    last = date.fromisoformat(end_date)
+    if last == date.max:
+        end = datetime.max.replace(tzinfo=dt_timezone.utc)
+    else:
+        end = day_start_utc(last + timedelta(days=1), timezone)
+    return start.isoformat(), end.isoformat()
+
+
+class DayBuckets:
+    """
+    Precomputed UTC start of every local day between two dates.
+
+    Bucketing a timestamp is then a binary search over the boundaries
+    rather than a time zone conversion per row, and stays correct across
+    DST changes (days of 23 or 25 hours) inside the range.
+    """
+
+    def __init__(self, start_day: date, end_day: date, timezone: str = DEFAULT_TIMEZONE):
+        self.timezone = timezone
+        self.days: List[str] = []
+        self.boundaries: List[float] = []
+
+        day = start_day
+        while True:
+            self.boundaries.append(day_start_utc(day, timezone).timestamp())
+            if day > end_day:
+                break
+            self.days.append(day.isoformat())
+            day += timedelta(days=1)
+
+    def day_of(self, logged_at: Any) -> Optional[str]:
+        """Local day of `logged_at`, or None when it falls outside the table"""
+        index = bisect_right(self.boundaries, parse_timestamp(logged_at).timestamp()) - 1
+        if 0 <= index < len(self.days):
+            return self.days[index]
+        return None
+
+
+@lru_cache(maxsize=256)
+def day_buckets(start_date: str, end_date: str, timezone: str = DEFAULT_TIMEZONE) -> DayBuckets:
+    """Shared offset table for a date range (summary windows repeat across users and requests)"""
+    return DayBuckets(date.fromisoformat(start_date), date.fromisoformat(end_date), timezone)
+
+
+def buckets_covering(timestamps: Iterable[Any], timezone: str = DEFAULT_TIMEZONE) -> Optional[DayBuckets]:
+    """Offset table spanning every local day the given timestamps fall on"""
+    parsed = [parse_timestamp(value) for value in timestamps]
+    if not parsed:
+        return None
+    zone = get_zone(timezone)
+    first = min(parsed).astimezone(zone).date()
+    last = max(parsed).astimezone(zone).date()
+    return day_buckets(first.isoformat(), last.isoformat(), timezone)
@@ -0,0 +1,288 @@
+from typing import Any, Dict, List, Optional
+from anyio import to_thread
+from backend.config import settings
+from backend.services.email_transports import OutgoingEmail, get_transport, MAX_PERSONALIZATIONS
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+create table if not exists email_outbox (
+    id integer primary key autoincrement,
+    to_email text not null,
+    subject text not null,
+    html_content text,
+    text_content text,
+    substitutions text not null default '{}',
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    next_attempt_at real not null,
+    claimed_at real,
+    last_error text,
+    message_id text,
+    created_at real not null,
+    sent_at real
+);
+create index if not exists email_outbox_pending_idx
+    on email_outbox (status, next_attempt_at);
+"""
+
+# Created after the column is added to outbox files that predate it
+IDEMPOTENCY_INDEX = """
+create unique index if not exists email_outbox_idempotency_key_idx
+    on email_outbox (idempotency_key) where idempotency_key is not null
+"""
+
+
+class EmailOutbox:
+    """
+    Durable SQLite queue of emails waiting to be delivered.
+
+    Requests only insert a row; EmailOutboxWorker delivers it later, so
+    request latency never includes a call to SendGrid. Rows survive
+    restarts, and claims are made in an IMMEDIATE transaction so several
+    worker processes can share one outbox file. An email with an
+    idempotency_key already in the outbox is not queued again, so a job
+    that is re-run does not send duplicates.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.EMAIL_OUTBOX_PATH
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("pragma journal_mode=wal")
+            self._connection.executescript(SCHEMA)
+            columns = {row['name'] for row in self._connection.execute("pragma table_info(email_outbox)")}
+            if 'idempotency_key' not in columns:
+                self._connection.execute("alter table email_outbox add column idempotency_key text")
+            self._connection.execute(IDEMPOTENCY_INDEX)
+        return self._connection
+
+    def _enqueue(self, emails: List[OutgoingEmail]) -> List[int]:
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("begin immediate")
+            try:
+                ids = []
+                for email in emails:
+                    cursor = connection.execute(
+                        "insert into email_outbox (to_email, subject, html_content, text_content, "
+                        "substitutions, idempotency_key, next_attempt_at, created_at) "
+                        "values (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "on conflict (idempotency_key) where idempotency_key is not null do nothing",
+                        (email.to_email, email.subject, email.html_content, email.text_content,
+                         json.dumps(email.substitutions), email.idempotency_key, now, now),
+                    )
+                    if cursor.rowcount:
+                        ids.append(cursor.lastrowid)
+                connection.execute("commit")
+            except Exception:
+                connection.execute("rollback")
+                raise
+        return ids
+
+    async def enqueue(self, *emails: OutgoingEmail) -> List[int]:
+        """Persist emails for delivery and return the outbox ids of those not already queued"""
+        return await to_thread.run_sync(self._enqueue, list(emails))
+
+    def claim_batch(self, limit: int) -> List[Dict[str, Any]]:
+        """Mark up to `limit` due emails as sending and return them"""
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("begin immediate")
+            try:
+                rows = connection.execute(
+                    "select * from email_outbox where status = 'pending' and next_attempt_at <= ? "
+                    "order by id limit ?",
+                    (now, limit),
+                ).fetchall()
+                connection.executemany(
+                    "update email_outbox set status = 'sending', claimed_at = ? where id = ?",
+                    [(now, row['id']) for row in rows],
+                )
+                connection.execute("commit")
+            except Exception:
+                connection.execute("rollback")
+                raise
+        return [dict(row) for row in rows]
+
+    def mark_sent(self, ids: List[int], message_id: Optional[str]):
+        with self._lock:
+            self.connection.executemany(
+                "update email_outbox set status = 'sent', sent_at = ?, message_id = ?, last_error = null where id = ?",
+                [(time.time(), message_id, outbox_id) for outbox_id in ids],
+            )
+
+    def mark_failed_attempt(self, ids: List[int], error: str):
+        """Schedule a retry with exponential backoff, or give up after EMAIL_MAX_ATTEMPTS"""
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            for outbox_id in ids:
+                attempts = connection.execute(
+                    "select attempts from email_outbox where id = ?", (outbox_id,)
+                ).fetchone()['attempts'] + 1
+                if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    connection.execute(
+                        "update email_outbox set status = 'failed', attempts = ?, last_error = ? where id = ?",
+                        (attempts, error, outbox_id),
+                    )
+                else:
+                    delay = min(settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_DELAY)
+                    connection.execute(
+                        "update email_outbox set status = 'pending', attempts = ?, last_error = ?, "
+                        "next_attempt_at = ? where id = ?",
+                        (attempts, error, now + delay, outbox_id),
+                    )
+
+    def release_stale_claims(self, older_than: float):
+        """Return emails claimed by a worker that died mid-send to the queue"""
+        with self._lock:
+            self.connection.execute(
+                "update email_outbox set status = 'pending' where status = 'sending' and claimed_at < ?",
+                (time.time() - older_than,),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self.connection.execute(
+                "select status, count(*) as count from email_outbox group by status"
+            ).fetchall()
+        return {row['status']: row['count'] for row in rows}
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def group_for_batch_send(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group outbox rows that share a subject and body, so each group is one API request"""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        key = (row['subject'], row['html_content'], row['text_content'])
+        groups.setdefault(key, []).append(row)
+
+    return [
+        rows[start:start + MAX_PERSONALIZATIONS]
+        for rows in groups.values()
+        for start in range(0, len(rows), MAX_PERSONALIZATIONS)
+    ]
+
+
+def _to_outgoing(row: Dict[str, Any]) -> OutgoingEmail:
+    return OutgoingEmail(
+        to_email=row['to_email'],
+        subject=row['subject'],
+        html_content=row['html_content'],
+        text_content=row['text_content'],
+        substitutions=json.loads(row['substitutions']),
+    )
+
+
+class EmailOutboxWorker:
+    """
+    Background task that drains the outbox.
+
+    Claims up to EMAIL_BATCH_SIZE due emails at a time, sends each group
+    of identical messages as one batch, with at most EMAIL_SEND_CONCURRENCY
+    requests in flight, and retries failures with exponential backoff.
+    """
+
+    def __init__(self, outbox: EmailOutbox, transport=None):
+        self.outbox = outbox
+        self._transport = transport
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def transport(self):
+        return self._transport if self._transport is not None else get_transport()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        try:
+            self.transport
+        except Exception as e:
+            logger.warning(f"Email outbox worker not started: {e}")
+            return
+
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(settings.EMAIL_SEND_CONCURRENCY)
+        await to_thread.run_sync(self.outbox.release_stale_claims, settings.EMAIL_CLAIM_TIMEOUT)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """Start draining now instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                sent = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+                sent = 0
+
+            if sent == 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EMAIL_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Claim and send one batch of due emails; returns how many were claimed"""
+        rows = await to_thread.run_sync(self.outbox.claim_batch, settings.EMAIL_BATCH_SIZE)
+        if rows:
+            await asyncio.gather(*(self._send_group(group) for group in group_for_batch_send(rows)))
+        return len(rows)
+
+    async def _send_group(self, rows: List[Dict[str, Any]]):
+        ids = [row['id'] for row in rows]
+        semaphore = self._semaphore or asyncio.Semaphore(settings.EMAIL_SEND_CONCURRENCY)
+        async with semaphore:
+            try:
+                result = await self.transport.send_batch([_to_outgoing(row) for row in rows])
+            except Exception as e:
+                logger.warning(f"Sending {len(ids)} emails failed, will retry: {e}")
+                await to_thread.run_sync(self.outbox.mark_failed_attempt, ids, str(e))
+                return
+
+        await to_thread.run_sync(self.outbox.mark_sent, ids, result.get("message_id"))
+
+
+# Shared outbox and worker, started and stopped by the app lifespan
+email_outbox = EmailOutbox()
+outbox_worker = EmailOutboxWorker(email_outbox)
@@ -1,54 +1,77 @@
-import os
-from typing import Dict, Any
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
+from typing import Dict, Any, List, Optional, Tuple
 from backend.config import settings
+from backend.models import DailySummaryEmailRequest
+from backend.services.email_transports import OutgoingEmail, get_transport
+from backend.services.email_outbox import email_outbox, outbox_worker
+from backend.services.email_templates import email_templates
+import dataclasses
+import logging
+
+logger = logging.getLogger(__name__)
+
+DAILY_SUMMARY_FIELDS = (
+    'date', 'total_calories', 'goal_calories', 'calories_remaining',
+    'total_protein', 'goal_protein', 'protein_remaining',
+    'total_carbs', 'goal_carbs', 'carbs_remaining',
+    'total_fat', 'goal_fat', 'fat_remaining',
+)
+
+
+def reset_url_for(reset_token: str) -> str:
+    return f"http://localhost:3000/reset-password?token={reset_token}"
+
+
+def daily_summary_context(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Template variables for the daily_summary email, with the per-meal lines pre-rendered"""
+    meal_template = email_templates.get("daily_summary_meal")
+    meals = [{**meal, 'meal_type': meal['meal_type'].title()} for meal in summary['meals']]
+    return {
+        **{field: summary[field] for field in DAILY_SUMMARY_FIELDS},
+        'meals_html': "".join(meal_template.render_html(meal) for meal in meals),
+        'meals_text': "".join(meal_template.render_text(meal) for meal in meals),
+    }
+
+
+def daily_summary_email(request: DailySummaryEmailRequest, summary: Dict[str, Any]) -> OutgoingEmail:
+    """
+    Daily summary digest for one user; all users share a body and differ only in substitutions.
+    Keyed by user and day so a re-run of the job does not queue it twice.
+    """
+    email = email_templates.get("daily_summary").render_for_batch(request.email, daily_summary_context(summary))
+    return dataclasses.replace(email, idempotency_key=f"daily_summary:{request.user_id}:{request.date}")
 
 class EmailService:
-    def __init__(self):
+    """
+    Sends and queues the app's emails.
+    
+    Use get_email_service() rather than constructing one per request: the
+    underlying transport (and its keep-alive HTTP connections) is created
+    on first send and shared by the whole process.
+    """
+    
+    def __init__(self, transport=None):
         self.sendgrid_api_key = settings.SENDGRID_API_KEY
         self.from_email = settings.FROM_EMAIL
         self.from_name = settings.FROM_NAME
-        
-        if not self.sendgrid_api_key:
-            raise ValueError("SENDGRID_API_KEY environment variable is required")
-        
-        self.sg = SendGridAPIClient(api_key=self.sendgrid_api_key)
+        self._transport = transport
+    
+    @property
+    def transport(self):
+        return self._transport if self._transport is not None else get_transport()
     
     async def send_welcome_email(self, user_email: str, user_name: str) -> Dict[str, Any]:
         """
         Send welcome email to new users
         """
         try:
-            mail = Mail(
-                from_email=Email(self.from_email, self.from_name),
-                to_emails=To(user_email),
-                subject="Welcome to Macro Tracking App!"
-            )
-            
-            html_content = f"""
-            <h2>Welcome to Macro Tracking App!</h2>
-            <p>Hi {user_name},</p>
-            <p>Thank you for joining Macro Tracking App! We're excited to help you reach your fitness goals.</p>
-            <p>Get started by:</p>
-            <ul>
-                <li>Setting your macro goals</li>
-                <li>Logging your first meal</li>
-                <li>Tracking your daily progress</li>
-            </ul>
-            <p>Happy tracking!</p>
-            <p>- The Macro Tracking Team</p>
-            """
-            
-            mail.content = Content("text/html", html_content)
-            
-            response = self.sg.send(mail)
+            email = email_templates.get("welcome").render(user_email, {"user_name": user_name})
+            response = await self.transport.send_batch([email])
             
             return {
                 "success": True,
                 "message": "Welcome email sent successfully",
-                "status_code": response.status_code,
-                "message_id": response.headers.get('X-Message-Id')
+                "status_code": response["status_code"],
+                "message_id": response["message_id"]
             }
             
         except Exception as e:
@@ -58,38 +81,27 @@ class EmailService:
                 "error": str(e)
             }
     
+    async def queue_welcome_email(self, user_email: str, user_name: str) -> Dict[str, Any]:
+        """
+        Queue a welcome email for background delivery
+        """
+        return await self._queue(
+            email_templates.get("welcome").render_for_batch(user_email, {"user_name": user_name})
+        )
+    
     async def send_password_reset_email(self, user_email: str, reset_token: str) -> Dict[str, Any]:
         """
         Send password reset email
         """
         try:
-            mail = Mail(
-                from_email=Email(self.from_email, self.from_name),
-                to_emails=To(user_email),
-                subject="Password Reset - Macro Tracking App"
-            )
-            
-            reset_url = f"http://localhost:3000/reset-password?token={reset_token}"
-            
-            html_content = f"""
-            <h2>Password Reset Request</h2>
-            <p>You requested a password reset for your Macro Tracking App account.</p>
-            <p>Click the link below to reset your password:</p>
-            <p><a href="{reset_url}">Reset Password</a></p>
-            <p>If you didn't request this, please ignore this email.</p>
-            <p>This link will expire in 1 hour.</p>
-            <p>- The Macro Tracking Team</p>
-            """
-            
-            mail.content = Content("text/html", html_content)
-            
-            response = self.sg.send(mail)
+            email = email_templates.get("password_reset").render(user_email, {"reset_url": reset_url_for(reset_token)})
+            response = await self.transport.send_batch([email])
             
             return {
                 "success": True,
                 "message": "Password reset email sent successfully",
-                "status_code": response.status_code,
-                "message_id": response.headers.get('X-Message-Id')
+                "status_code": response["status_code"],
+                "message_id": response["message_id"]
             }
             
         except Exception as e:
@@ -99,44 +111,87 @@ class EmailService:
                 "error": str(e)
             }
     
+    async def queue_password_reset_email(self, user_email: str, reset_token: str) -> Dict[str, Any]:
+        """
+        Queue a password reset email for background delivery
+        """
+        return await self._queue(
+            email_templates.get("password_reset").render_for_batch(user_email, {"reset_url": reset_url_for(reset_token)})
+        )
+    
+    async def queue_daily_summary_emails(
+        self, digests: List[Tuple[DailySummaryEmailRequest, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Queue daily summary emails for many users in a single outbox write.
+        Digests already in the outbox for that user and day are not queued again.
+        """
+        if not digests:
+            return {"success": True, "message": "No emails to queue", "queued": 0}
+        
+        return await self._queue(*(daily_summary_email(request, summary) for request, summary in digests))
+    
+    async def _queue(self, *emails: OutgoingEmail) -> Dict[str, Any]:
+        """Persist emails to the outbox and nudge the worker"""
+        try:
+            outbox_ids = await email_outbox.enqueue(*emails)
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to queue email: {str(e)}",
+                "error": str(e)
+            }
+        
+        outbox_worker.wake()
+        return {
+            "success": True,
+            "message": "Email queued for delivery" if outbox_ids else "Email already queued",
+            "outbox_id": outbox_ids[0] if outbox_ids else None,
+            "queued": len(outbox_ids)
+        }
+    
     async def test_connection(self, test_email: str) -> Dict[str, Any]:
         """
         Test SendGrid connection by sending a simple email.
         """
         try:
-            print(f"Testing SendGrid connection...")
-            print(f"   API Key: {self.sendgrid_api_key[:10]}...")
-            print(f"   From: {self.from_email}")
-            print(f"   To: {test_email}")
+            logger.info(f"Testing SendGrid connection from {self.from_email} to {test_email}")
             
-            # Create a simple test email with correct Content syntax
-            mail = Mail(
-                from_email=Email(self.from_email, self.from_name),
-                to_emails=To(test_email),
-                subject="SendGrid Connection Test - Macro Tracking App"
+            email = OutgoingEmail(
+                to_email=test_email,
+                subject="SendGrid Connection Test - Macro Tracking App",
+                text_content="This is a test email to verify SendGrid connection is working!"
             )
             
-            # Add content separately
-            mail.content = Content("text/plain", "This is a test email to verify SendGrid connection is working!")
-            
             # Send the email
-            response = self.sg.send(mail)
+            response = await self.transport.send_batch([email])
             
-            print(f"Email sent successfully!")
-            print(f"   Status Code: {response.status_code}")
-            print(f"   Message ID: {response.headers.get('X-Message-Id', 'N/A')}")
+            logger.info(
+                "SendGrid test email sent",
+                extra={"status_code": response["status_code"], "message_id": response["message_id"]}
+            )
             
             return {
                 "success": True,
                 "message": "SendGrid connection test successful",
-                "status_code": response.status_code,
-                "message_id": response.headers.get('X-Message-Id')
+                "status_code": response["status_code"],
+                "message_id": response["message_id"]
             }
             
         except Exception as e:
-            print(f"SendGrid connection failed: {str(e)}")
+            logger.error(f"SendGrid connection failed: {str(e)}")
             return {
                 "success": False,
                 "message": f"SendGrid connection failed: {str(e)}",
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+
+
+_email_service: Optional[EmailService] = None
+
+def get_email_service() -> EmailService:
+    """Return the process-wide EmailService, creating it on first use"""
+    global _email_service
+    if _email_service is None:
+        _email_service = EmailService()
+    return _email_service
@@ -0,0 +1,193 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from backend.services.email_transports import OutgoingEmail
+import html
+import re
+import threading
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# {{ name }} is escaped for the part it appears in; {{ name|safe }} is
+# inserted as is, for fragments the caller has already rendered.
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*(\|\s*safe\s*)?\}\}")
+
+TEMPLATE_FILES = {'subject': 'subject.txt', 'html': 'body.html', 'text': 'body.txt'}
+
+
+class TemplateError(Exception):
+    """Raised for unknown templates or missing template variables"""
+
+
+def _no_escape(value: str) -> str:
+    return value
+
+
+class CompiledTemplate:
+    """
+    A template split once into its static text and placeholders.
+
+    Rendering only escapes the values and joins them with the cached
+    static parts; the source is never re-parsed.
+    """
+
+    def __init__(self, name: str, source: str, escape: Callable[[str], str]):
+        self.name = name
+        self.escape = escape
+
+        statics, fields = [], []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            statics.append(source[position:match.start()])
+            fields.append((match.group(1), bool(match.group(2))))
+            position = match.end()
+        statics.append(source[position:])
+
+        self.statics: Tuple[str, ...] = tuple(statics)
+        self.fields: Tuple[Tuple[str, bool], ...] = tuple(fields)
+
+        # Static parts interleaved with empty slots; a render copies this list,
+        # drops the values into the odd positions and joins it
+        self._parts = [None] * (2 * len(statics) - 1)
+        self._parts[0::2] = statics
+        self._lookups = tuple((name, not safe and escape is not _no_escape) for name, safe in fields)
+        self._tagged: Dict[str, str] = {}
+        self._tags: Dict[str, Tuple[str, ...]] = {}
+
+    @property
+    def field_names(self):
+        return {name for name, _ in self.fields}
+
+    def _values(self, context: Dict[str, Any]) -> list:
+        escape = self.escape
+        values = []
+        try:
+            for name, escaped in self._lookups:
+                value = context[name]
+                # Numbers never contain markup, so skip escaping them
+                values.append(escape(str(value)) if escaped and not isinstance(value, (int, float)) else str(value))
+            return values
+        except KeyError as e:
+            raise TemplateError(f"Template '{self.name}' is missing variable {e}")
+
+    def render(self, context: Dict[str, Any]) -> str:
+        return self._join(self._values(context))
+
+    def _join(self, values) -> str:
+        parts = self._parts.copy()
+        parts[1::2] = values
+        return "".join(parts)
+
+    def tagged(self, suffix: str = "") -> str:
+        """The template with every placeholder replaced by a `-name{suffix}-` substitution tag (cached)"""
+        body = self._tagged.get(suffix)
+        if body is None:
+            body = self._tagged[suffix] = self._join(self._tag_names(suffix))
+        return body
+
+    def substitutions(self, context: Dict[str, Any], suffix: str = "") -> Dict[str, str]:
+        """Escaped values for the tags in `tagged(suffix)`"""
+        return dict(zip(self._tag_names(suffix), self._values(context)))
+
+    def _tag_names(self, suffix: str) -> Tuple[str, ...]:
+        tags = self._tags.get(suffix)
+        if tags is None:
+            tags = self._tags[suffix] = tuple(f"-{name}{suffix}-" for name, _ in self.fields)
+        return tags
+
+
+class EmailTemplate:
+    """Subject plus HTML and/or plain-text body of one email type"""
+
+    def __init__(self, name: str, subject: Optional[CompiledTemplate], html_body: Optional[CompiledTemplate], text_body: Optional[CompiledTemplate]):
+        self.name = name
+        self.subject = subject
+        self.html = html_body
+        self.text = text_body
+
+    def render_html(self, context: Dict[str, Any]) -> str:
+        return self.html.render(context) if self.html else ""
+
+    def render_text(self, context: Dict[str, Any]) -> str:
+        return self.text.render(context) if self.text else ""
+
+    def render(self, to_email: str, context: Dict[str, Any]) -> OutgoingEmail:
+        """Fully rendered multipart email for a single recipient"""
+        return OutgoingEmail(
+            to_email=to_email,
+            subject=self.subject.render(context) if self.subject else "",
+            html_content=self.html.render(context) if self.html else None,
+            text_content=self.text.render(context) if self.text else None,
+        )
+
+    def render_for_batch(self, to_email: str, context: Dict[str, Any]) -> OutgoingEmail:
+        """
+        Email whose bodies are the cached tagged templates, with this
+        recipient's values as substitutions.
+
+        Every recipient of the same template (and subject) then shares
+        identical bodies, so the outbox worker can send them in one
+        SendGrid request. HTML and text values are escaped differently,
+        so the text body uses `-name:text-` tags.
+        """
+        substitutions = {}
+        if self.html:
+            substitutions.update(self.html.substitutions(context))
+        if self.text:
+            substitutions.update(self.text.substitutions(context, ":text"))
+
+        return OutgoingEmail(
+            to_email=to_email,
+            subject=self.subject.render(context) if self.subject else "",
+            html_content=self.html.tagged() if self.html else None,
+            text_content=self.text.tagged(":text") if self.text else None,
+            substitutions=substitutions,
+        )
+
+
+class EmailTemplateRegistry:
+    """
+    Loads and compiles every template under backend/templates/email once.
+
+    Each template is a directory holding any of subject.txt, body.html and
+    body.txt. The registry is loaded at app startup (or on first use).
+    """
+
+    def __init__(self, directory: Path = TEMPLATE_DIR):
+        self.directory = Path(directory)
+        self._templates: Optional[Dict[str, EmailTemplate]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, EmailTemplate]:
+        with self._lock:
+            if self._templates is None:
+                self._templates = {
+                    path.name: self._compile(path)
+                    for path in sorted(self.directory.iterdir())
+                    if path.is_dir()
+                }
+        return self._templates
+
+    def _compile(self, path: Path) -> EmailTemplate:
+        sources = {}
+        for part, filename in TEMPLATE_FILES.items():
+            file = path / filename
+            sources[part] = file.read_text(encoding="utf-8") if file.exists() else None
+
+        subject = sources['subject'].strip() if sources['subject'] is not None else None
+        return EmailTemplate(
+            path.name,
+            CompiledTemplate(f"{path.name}/subject", subject, _no_escape) if subject is not None else None,
+            CompiledTemplate(f"{path.name}/html", sources['html'], html.escape) if sources['html'] is not None else None,
+            CompiledTemplate(f"{path.name}/text", sources['text'], _no_escape) if sources['text'] is not None else None,
+        )
+
+    def get(self, name: str) -> EmailTemplate:
+        templates = self._templates if self._templates is not None else self.load()
+        try:
+            return templates[name]
+        except KeyError:
+            raise TemplateError(f"Unknown email template '{name}'")
+
+
+# Shared registry, compiled once per process
+email_templates = EmailTemplateRegistry()
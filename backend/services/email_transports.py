@@ -0,0 +1,171 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from sendgrid.helpers.mail import Mail, Email, Content, To, Personalization, Substitution
+from backend.config import settings
+import httpx
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+
+@dataclass
+class OutgoingEmail:
+    """One recipient's copy of a message, with its `-key-` substitutions"""
+    to_email: str
+    subject: str
+    html_content: Optional[str] = None
+    text_content: Optional[str] = None
+    substitutions: Dict[str, str] = field(default_factory=dict)
+    # Queued at most once: the outbox skips emails whose key it already holds
+    idempotency_key: Optional[str] = None
+
+
+class EmailTransportError(Exception):
+    """Raised when a transport fails to hand a batch over for delivery"""
+
+
+class SendGridTransport:
+    """
+    Delivers emails through the SendGrid v3 API.
+
+    Emails that share a subject and body are sent as one API request with
+    a personalization per recipient, so a batch of N welcome emails costs
+    one HTTP call instead of N. Requests go through one async HTTP client
+    whose keep-alive connections are reused across sends, rather than a
+    new connection (and TLS handshake) per email.
+    """
+
+    def __init__(self, api_key: str = None, from_email: str = None, from_name: str = None):
+        self.api_key = api_key or settings.SENDGRID_API_KEY
+        self.from_email = from_email or settings.FROM_EMAIL
+        self.from_name = from_name or settings.FROM_NAME
+
+        if not self.api_key:
+            raise ValueError(
+                "SENDGRID_API_KEY environment variable is required "
+                "(set EMAIL_TRANSPORT=fake to record emails in memory instead)"
+            )
+
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(settings.EMAIL_REQUEST_TIMEOUT, connect=settings.EMAIL_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.EMAIL_SEND_CONCURRENCY,
+                    max_keepalive_connections=settings.EMAIL_SEND_CONCURRENCY,
+                ),
+            )
+        return self._client
+
+    def build_mail(self, emails: List[OutgoingEmail]) -> Mail:
+        """Build one Mail with a personalization for each email (same subject and body)"""
+        first = emails[0]
+        mail = Mail(from_email=Email(self.from_email, self.from_name), subject=first.subject)
+
+        if first.text_content:
+            mail.add_content(Content("text/plain", first.text_content))
+        if first.html_content:
+            mail.add_content(Content("text/html", first.html_content))
+
+        for email in emails:
+            personalization = Personalization()
+            personalization.add_to(To(email.to_email))
+            for key, value in email.substitutions.items():
+                personalization.add_substitution(Substitution(key, value))
+            mail.add_personalization(personalization)
+
+        return mail
+
+    async def send_batch(self, emails: List[OutgoingEmail]) -> Dict[str, Any]:
+        """Send emails sharing a subject and body in a single API request"""
+        try:
+            response = await self.client.post(SENDGRID_SEND_URL, json=self.build_mail(emails).get())
+        except httpx.HTTPError as e:
+            raise EmailTransportError(str(e))
+
+        if response.status_code >= 300:
+            raise EmailTransportError(f"SendGrid returned status {response.status_code}: {response.text}")
+
+        return {
+            "status_code": response.status_code,
+            "message_id": response.headers.get('X-Message-Id'),
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeSendGridTransport:
+    """
+    Offline stand-in for SendGridTransport that records batches in memory.
+
+    Used for local and test deployments without a SendGrid account, only
+    when EMAIL_TRANSPORT=fake. Only the newest `max_batches` batches are
+    kept, so a long-running process does not grow without bound. Set
+    `fail_times` to make the next N sends raise, to exercise retries.
+    """
+
+    def __init__(self, fail_times: int = 0, max_batches: int = 1000):
+        self.batches: "deque[List[OutgoingEmail]]" = deque(maxlen=max_batches)
+        self.batches_sent = 0
+        self.fail_times = fail_times
+
+    @property
+    def sent(self) -> List[OutgoingEmail]:
+        return [email for batch in self.batches for email in batch]
+
+    async def send_batch(self, emails: List[OutgoingEmail]) -> Dict[str, Any]:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise EmailTransportError("Simulated SendGrid failure")
+
+        self.batches.append(list(emails))
+        self.batches_sent += 1
+        return {"status_code": 202, "message_id": f"fake-{self.batches_sent}"}
+
+    async def aclose(self):
+        pass
+
+
+def create_transport():
+    """Build the transport selected by EMAIL_TRANSPORT"""
+    if settings.EMAIL_TRANSPORT == "fake":
+        logger.warning("EMAIL_TRANSPORT=fake: emails are recorded in memory and never delivered")
+        return FakeSendGridTransport()
+    return SendGridTransport()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the process-wide email transport, creating it on first use"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = create_transport()
+                logger.info(f"Created {type(_transport).__name__} email transport")
+    return _transport
+
+
+async def close_transport():
+    """Close the shared transport's HTTP connections (called on app shutdown)"""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
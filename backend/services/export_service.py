@@ -0,0 +1,83 @@
+from typing import Any, AsyncIterator, Dict, List
+from backend.config import settings
+from backend.repositories import food_log_repository
+import csv
+import io
+import json
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    'id', 'meal_type', 'food_name', 'calories', 'protein', 'carbs', 'fat',
+    'logged_at', 'created_at', 'updated_at',
+]
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+async def iter_food_log_chunks(user_id: str, chunk_size: int = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield a user's food logs oldest first, one keyset page at a time.
+
+    Only one page is held in memory at once, so memory use does not grow
+    with the size of the history.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    cursor = None
+    while True:
+        logs = await food_log_repository.list_page(user_id, chunk_size, cursor=cursor, newer=True)
+        if not logs:
+            return
+        yield logs
+        if len(logs) < chunk_size:
+            return
+        cursor = (str(logs[-1]['logged_at']), str(logs[-1]['id']))
+
+
+def _ndjson_chunk(logs: List[Dict[str, Any]]) -> bytes:
+    return ''.join(
+        json.dumps({column: log.get(column) for column in EXPORT_COLUMNS}, default=str) + '\n'
+        for log in logs
+    ).encode()
+
+
+def _csv_chunk(logs: List[Dict[str, Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([log.get(column) for column in EXPORT_COLUMNS] for log in logs)
+    return buffer.getvalue().encode()
+
+
+async def stream_food_logs(user_id: str, export_format: str) -> AsyncIterator[bytes]:
+    """Encode a user's food logs as NDJSON or CSV, one chunk per page"""
+    if export_format == 'csv':
+        yield _csv_chunk([], header=True)
+
+    try:
+        async for logs in iter_food_log_chunks(user_id):
+            if export_format == 'csv':
+                yield _csv_chunk(logs, header=False)
+            else:
+                yield _ndjson_chunk(logs)
+    except Exception as e:
+        # Headers are already sent: re-raise so the server aborts the response
+        # and the client sees an incomplete transfer, not a truncated file
+        logger.error(f"Food log export for {user_id} failed mid-stream: {e}")
+        raise
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream incrementally into gzip format"""
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
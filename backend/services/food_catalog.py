@@ -0,0 +1,375 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from backend.config import settings
+from backend.repositories import food_log_repository
+import csv
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "foods.csv"
+
+# Minimum Dice similarity of word trigrams for a typo correction
+FUZZY_THRESHOLD = 0.45
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    """Lowercase and collapse punctuation/whitespace, e.g. 'Greek Yogurt (2%)' -> 'greek yogurt 2'"""
+    return _NON_WORD.sub(" ", name.lower()).strip()
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class FoodEntry:
+    name: str
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    serving: Optional[str] = None
+    source: str = "catalog"
+
+
+class FoodSearchIndex:
+    """
+    In-memory autocomplete and fuzzy index over food names.
+
+    Every word of every name is kept in one sorted array, so the entries
+    with a word starting with a prefix are a contiguous range found with
+    two bisects - the same lookup a trie gives, without a Python object
+    per node. Multi-word queries intersect those ranges as sets. Full
+    names are kept in a second sorted array, so names starting with the
+    whole query (ranked above other matches) are also a single range.
+
+    Bulk-built indexes number entries by (name length, name), the result
+    order, so the best matches in a range are simply its smallest ids.
+
+    Misspelled words are corrected against the vocabulary of distinct
+    words through a trigram index, then looked up the same way, so fuzzy
+    matching costs scale with the vocabulary rather than the entries.
+
+    Entries are keyed by normalized name, so re-adding a name replaces its
+    macros without touching the index.
+    """
+
+    def __init__(self, entries: Iterable[FoodEntry] = ()):
+        self.entries: List[FoodEntry] = []
+        self._names: List[str] = []
+        self._words: List[Tuple[str, ...]] = []
+        self._ids_by_name: Dict[str, int] = {}
+        self._token_words: List[str] = []
+        self._token_ids: List[int] = []
+        self._sorted_names: List[str] = []
+        self._sorted_name_ids: List[int] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._vocabulary_trigrams: Dict[str, List[str]] = {}
+
+        # Later entries with the same name replace earlier ones
+        by_name: Dict[str, FoodEntry] = {}
+        for entry in entries:
+            name = normalize(entry.name)
+            if name:
+                by_name[name] = entry
+
+        tokens = []
+        for name in sorted(by_name, key=lambda name: (len(name), name)):
+            entry_id = self._store(name, by_name[name])
+            tokens.extend((word, entry_id) for word in self._words[entry_id])
+        tokens.sort()
+        self._token_words = [word for word, _ in tokens]
+        self._token_ids = [entry_id for _, entry_id in tokens]
+
+        names = sorted((name, entry_id) for name, entry_id in self._ids_by_name.items())
+        self._sorted_names = [name for name, _ in names]
+        self._sorted_name_ids = [entry_id for _, entry_id in names]
+
+        # Ids follow result order until an incremental add appends out of order
+        self._ordered = True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: FoodEntry):
+        """Add an entry, or replace the entry with the same normalized name"""
+        name = normalize(entry.name)
+        if not name:
+            return
+
+        entry_id = self._ids_by_name.get(name)
+        if entry_id is not None:
+            self.entries[entry_id] = entry
+            return
+
+        entry_id = self._store(name, entry)
+        for word in self._words[entry_id]:
+            position = bisect_left(self._token_words, word)
+            self._token_words.insert(position, word)
+            self._token_ids.insert(position, entry_id)
+
+        position = bisect_left(self._sorted_names, name)
+        self._sorted_names.insert(position, name)
+        self._sorted_name_ids.insert(position, entry_id)
+        self._ordered = False
+
+    def _store(self, name: str, entry: FoodEntry) -> int:
+        entry_id = len(self.entries)
+        words = tuple(dict.fromkeys(name.split()))
+        self.entries.append(entry)
+        self._names.append(name)
+        self._words.append(words)
+        self._ids_by_name[name] = entry_id
+
+        for word in words:
+            if word not in self._vocabulary:
+                grams = trigrams(word)
+                self._vocabulary[word] = len(grams)
+                for gram in grams:
+                    self._vocabulary_trigrams.setdefault(gram, []).append(word)
+        return entry_id
+
+    @staticmethod
+    def _range(array: List[str], prefix: str) -> Tuple[int, int]:
+        # Names only contain [a-z0-9 ], all of which sort before "{"
+        return bisect_left(array, prefix), bisect_left(array, prefix + "{")
+
+    def _best(self, ids: Iterable[int], count: int) -> List[int]:
+        """The `count` ids that rank first: shortest name, then alphabetical"""
+        if self._ordered:
+            return heapq.nsmallest(count, ids)
+        names = self._names
+        return heapq.nsmallest(count, ids, key=lambda entry_id: (len(names[entry_id]), names[entry_id]))
+
+    def prefix_search(self, query: str, limit: int) -> List[Tuple[float, FoodEntry]]:
+        """
+        Entries where every query word is a prefix of a word in the name.
+
+        Ranked exact name first, then names starting with the query, then
+        the rest; shorter names first within each group.
+        """
+        query = normalize(query)
+        words = list(dict.fromkeys(query.split()))
+        if not words:
+            return []
+
+        ranked: List[Tuple[float, int]] = []
+        chosen = set()
+
+        exact = self._ids_by_name.get(query)
+        if exact is not None:
+            ranked.append((3.0, exact))
+            chosen.add(exact)
+
+        if len(ranked) < limit:
+            start, end = self._range(self._sorted_names, query)
+            starts_with = (entry_id for entry_id in self._sorted_name_ids[start:end] if entry_id not in chosen)
+            for entry_id in self._best(starts_with, limit - len(ranked)):
+                ranked.append((2.0, entry_id))
+                chosen.add(entry_id)
+
+        if len(ranked) < limit:
+            ranges = sorted((self._range(self._token_words, word) for word in words), key=lambda r: r[1] - r[0])
+            start, end = ranges[0]
+            candidates = set(self._token_ids[start:end])
+            for start, end in ranges[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(self._token_ids[start:end])
+            candidates -= chosen
+            for entry_id in self._best(candidates, limit - len(ranked)):
+                ranked.append((1.0, entry_id))
+
+        return [(score - len(self._names[entry_id]) / 1000, self.entries[entry_id]) for score, entry_id in ranked]
+
+    def correct(self, word: str) -> Optional[Tuple[float, str]]:
+        """Most similar vocabulary word (Dice similarity of trigrams), if any is close enough"""
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._vocabulary_trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        best = None
+        for candidate, common in shared.items():
+            similarity = 2 * common / (len(grams) + self._vocabulary[candidate])
+            if similarity >= FUZZY_THRESHOLD and (best is None or similarity > best[0]):
+                best = (similarity, candidate)
+        return best
+
+    def fuzzy_search(self, query: str, limit: int, exclude: Set[str] = frozenset()) -> List[Tuple[float, FoodEntry]]:
+        """Prefix search after correcting query words that match no indexed word (typo tolerant)"""
+        words = normalize(query).split()
+        corrected, similarities = [], []
+        for word in words:
+            start, end = self._range(self._token_words, word)
+            if end > start:
+                corrected.append(word)
+                similarities.append(1.0)
+                continue
+            best = self.correct(word)
+            if best is not None:
+                corrected.append(best[1])
+                similarities.append(best[0])
+
+        if not corrected or corrected == words:
+            return []
+
+        # Every match of the corrected query shares its similarity; prefix order is kept
+        similarity = sum(similarities) / len(words)
+        return [
+            (similarity, entry)
+            for _, entry in self.prefix_search(" ".join(corrected), limit + len(exclude))
+            if normalize(entry.name) not in exclude
+        ][:limit]
+
+    def search(self, query: str, limit: int) -> List[Tuple[float, FoodEntry]]:
+        """Prefix matches first, topped up with fuzzy matches when there are too few"""
+        results = self.prefix_search(query, limit)
+        if len(results) < limit:
+            seen = {normalize(entry.name) for _, entry in results}
+            # Shift fuzzy scores below zero so they always rank after prefix matches
+            results += [
+                (similarity - 1.0, entry)
+                for similarity, entry in self.fuzzy_search(query, limit - len(results), exclude=seen)
+            ]
+        return results
+
+
+def load_catalog_file(path: Path) -> List[FoodEntry]:
+    """Read the local nutrition table (CSV with name, serving, calories, protein, carbs, fat)"""
+    with open(path, newline="", encoding="utf-8") as file:
+        return [
+            FoodEntry(
+                name=row['name'],
+                serving=row.get('serving') or None,
+                calories=int(row['calories']),
+                protein=float(row['protein']),
+                carbs=float(row['carbs']),
+                fat=float(row['fat']),
+            )
+            for row in csv.DictReader(file)
+        ]
+
+
+def history_entry(log: Dict[str, Any]) -> FoodEntry:
+    return FoodEntry(
+        name=log['food_name'],
+        calories=log['calories'],
+        protein=log['protein'],
+        carbs=log['carbs'],
+        fat=log['fat'],
+        source="history",
+    )
+
+
+class FoodCatalog:
+    """
+    Food search over the local nutrition table plus each user's own foods.
+
+    The shared catalog index is built once from FOOD_CATALOG_PATH and
+    rebuilt when the file changes. Each user's previously logged foods get
+    their own small index, built on first search from their most recent
+    logs and kept in an LRU. New logs are added to it in place; edits and
+    deletes drop it so the next search rebuilds it.
+    """
+
+    def __init__(self, path: str = None, repository=food_log_repository):
+        self.path = Path(path or settings.FOOD_CATALOG_PATH or DEFAULT_CATALOG_PATH)
+        self.repository = repository
+        self._catalog: Optional[FoodSearchIndex] = None
+        self._catalog_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._user_indexes: "OrderedDict[str, FoodSearchIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def catalog(self) -> FoodSearchIndex:
+        now = time.monotonic()
+        if self._catalog is None or now - self._checked_at >= settings.FOOD_CATALOG_RELOAD_INTERVAL:
+            self._checked_at = now
+            self.load()
+        return self._catalog
+
+    def load(self, force: bool = False) -> FoodSearchIndex:
+        """(Re)build the catalog index if the file changed since the last build"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                logger.error(f"Food catalog {self.path} not readable: {e}")
+                if self._catalog is None:
+                    self._catalog = FoodSearchIndex()
+                return self._catalog
+
+            if force or self._catalog is None or mtime != self._catalog_mtime:
+                started = time.perf_counter()
+                self._catalog = FoodSearchIndex(load_catalog_file(self.path))
+                self._catalog_mtime = mtime
+                logger.info(
+                    f"Indexed {len(self._catalog)} catalog foods in "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms"
+                )
+        return self._catalog
+
+    async def user_index(self, user_id: str) -> FoodSearchIndex:
+        index = self._user_indexes.get(user_id)
+        if index is not None:
+            self._user_indexes.move_to_end(user_id)
+            return index
+
+        # Most recent first, so only the latest macros for each name are kept
+        logs = await self.repository.list_recent_foods(user_id, settings.FOOD_HISTORY_LIMIT)
+        index = FoodSearchIndex(history_entry(log) for log in reversed(logs))
+
+        self._user_indexes[user_id] = index
+        while len(self._user_indexes) > settings.FOOD_INDEX_CACHE_SIZE:
+            self._user_indexes.popitem(last=False)
+        return index
+
+    async def search(self, user_id: str, query: str, limit: int = 10) -> List[FoodEntry]:
+        """The user's own foods first, then catalog foods not already in their history"""
+        history = (await self.user_index(user_id)).search(query, limit)
+        seen = {normalize(entry.name) for _, entry in history}
+
+        results = [(score + 0.5, entry) for score, entry in history]
+        results += [
+            (score, entry)
+            for score, entry in self.catalog.search(query, limit + len(seen))
+            if normalize(entry.name) not in seen
+        ]
+        results.sort(key=lambda item: -item[0])
+        return [entry for _, entry in results[:limit]]
+
+    def record_logged(self, logs: Iterable[Dict[str, Any]]):
+        """Add newly logged foods to their users' cached indexes"""
+        for log in logs:
+            index = self._user_indexes.get(log['user_id'])
+            if index is not None:
+                index.add(history_entry(log))
+
+    def invalidate_user(self, user_id: str):
+        """Drop a user's index after an edit or delete; it is rebuilt on their next search"""
+        self._user_indexes.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "catalog_entries": len(self._catalog) if self._catalog is not None else 0,
+            "cached_user_indexes": len(self._user_indexes),
+        }
+
+
+# Shared catalog used by the whole process
+food_catalog = FoodCatalog()
@@ -0,0 +1,239 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from backend.config import settings
+from backend.repositories import food_log_repository
+from backend.services.day_buckets import parse_timestamp
+from backend.services.food_catalog import normalize
+import math
+import time
+
+# Scores are kept relative to a per-user reference time; once the newest
+# weight grows past e**REBASE_EXPONENT every score is rescaled
+REBASE_EXPONENT = 500.0
+
+# Newest log times kept per food to match deletes against; older logs
+# are only counted
+RECENT_LOGS_PER_FOOD = 32
+
+FoodKey = Tuple[str, int, float, float, float]
+
+
+def food_key(log: Dict[str, Any]) -> FoodKey:
+    """Normalised name plus macros, so the same meal logged twice counts once"""
+    return (
+        normalize(log['food_name']),
+        int(log['calories']),
+        round(float(log['protein']), 1),
+        round(float(log['carbs']), 1),
+        round(float(log['fat']), 1),
+    )
+
+
+def log_timestamp(log: Dict[str, Any]) -> float:
+    logged_at = log.get('logged_at')
+    if not logged_at:
+        return datetime.now(timezone.utc).timestamp()
+    return parse_timestamp(logged_at).timestamp()
+
+
+@dataclass
+class FoodStats:
+    food_name: str
+    calories: int
+    protein: float
+    carbs: float
+    fat: float
+    score: float = 0.0
+    count: int = 0
+    first_logged_at: float = math.inf
+    # The newest RECENT_LOGS_PER_FOOD log times, oldest first
+    recent: List[float] = field(default_factory=list)
+
+    @property
+    def last_logged_at(self) -> float:
+        return self.recent[-1]
+
+
+class UserFoodFrequencies:
+    """
+    Decayed log counts and last-logged times for one user's foods.
+
+    Uses forward decay: a log at time t adds exp(rate * (t - reference)),
+    so older logs never need rewriting and ordering by score equals
+    ordering by the exponentially decayed count at any later time.
+    Foods are kept sorted by score and by recency, so top-K is a slice.
+    Each food keeps a count and only its newest RECENT_LOGS_PER_FOOD log
+    times, so memory does not grow with the number of logs.
+    """
+
+    def __init__(self, half_life_days: float):
+        self.rate = math.log(2) / (half_life_days * 86400)
+        self.reference: Optional[float] = None
+        self.foods: Dict[FoodKey, FoodStats] = {}
+        self.loaded_at = time.monotonic()
+        # Set when a delete cannot be applied exactly; the owner re-seeds
+        self.stale = False
+        self._by_score: List[Tuple[float, FoodKey]] = []
+        self._by_recency: List[Tuple[float, FoodKey]] = []
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def _weight(self, timestamp: float) -> float:
+        if self.reference is None:
+            self.reference = timestamp
+        exponent = self.rate * (timestamp - self.reference)
+        if exponent > REBASE_EXPONENT:
+            self._rebase(timestamp)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _rebase(self, reference: float):
+        scale = math.exp(-self.rate * (reference - self.reference))
+        self.reference = reference
+        for stats in self.foods.values():
+            stats.score *= scale
+        self._by_score = sorted((-stats.score, key) for key, stats in self.foods.items())
+
+    def _unlink(self, key: FoodKey, stats: FoodStats):
+        del self._by_score[bisect_left(self._by_score, (-stats.score, key))]
+        del self._by_recency[bisect_left(self._by_recency, (-stats.last_logged_at, key))]
+
+    def _link(self, key: FoodKey, stats: FoodStats):
+        insort(self._by_score, (-stats.score, key))
+        insort(self._by_recency, (-stats.last_logged_at, key))
+
+    def add(self, log: Dict[str, Any]):
+        key = food_key(log)
+        timestamp = log_timestamp(log)
+        weight = self._weight(timestamp)
+
+        stats = self.foods.get(key)
+        if stats is None:
+            stats = self.foods[key] = FoodStats(
+                food_name=log['food_name'],
+                calories=log['calories'],
+                protein=log['protein'],
+                carbs=log['carbs'],
+                fat=log['fat'],
+            )
+        else:
+            self._unlink(key, stats)
+
+        stats.score += weight
+        stats.count += 1
+        stats.first_logged_at = min(stats.first_logged_at, timestamp)
+        insort(stats.recent, timestamp)
+        if len(stats.recent) > RECENT_LOGS_PER_FOOD:
+            del stats.recent[0]
+        # Show the spelling the user typed most recently
+        if timestamp >= stats.last_logged_at:
+            stats.food_name = log['food_name']
+        self._link(key, stats)
+
+    def remove(self, log: Dict[str, Any]):
+        key = food_key(log)
+        stats = self.foods.get(key)
+        timestamp = log_timestamp(log)
+        if stats is None:
+            return
+        position = bisect_left(stats.recent, timestamp)
+        in_window = position < len(stats.recent) and stats.recent[position] == timestamp
+        # Logs older than the history the counters were seeded from were never counted;
+        # older logs still counted have only dropped out of the window
+        if not in_window and not stats.first_logged_at <= timestamp < stats.recent[0]:
+            return
+        if in_window and len(stats.recent) == 1 and stats.count > 1:
+            # The food's last-logged time would be unknown
+            self.stale = True
+            return
+
+        self._unlink(key, stats)
+        stats.count -= 1
+        if stats.count == 0:
+            del self.foods[key]
+            return
+        if in_window:
+            del stats.recent[position]
+        stats.score = max(stats.score - math.exp(self.rate * (timestamp - self.reference)), 0.0)
+        self._link(key, stats)
+
+    def most_frequent(self, limit: int) -> List[FoodStats]:
+        return [self.foods[key] for _, key in self._by_score[:limit]]
+
+    def most_recent(self, limit: int) -> List[FoodStats]:
+        return [self.foods[key] for _, key in self._by_recency[:limit]]
+
+    def decayed_count(self, stats: FoodStats, now: float = None) -> float:
+        """The food's log count with each log halved every half-life since it was logged"""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        return stats.score * math.exp(self.rate * (self.reference - now))
+
+
+class FrequentFoods:
+    """
+    Per-user frequent and recent foods, maintained as logs change.
+
+    A user's counters are seeded from their most recent
+    FOOD_HISTORY_LIMIT logs, then updated in place on every create,
+    update and delete, so reading the top foods never scans history.
+    Counters live in a process-local LRU of FOOD_INDEX_CACHE_SIZE users
+    and are re-seeded after FREQUENT_FOODS_TTL seconds, so writes handled
+    by other workers show up and foods no longer in the recent history
+    are dropped.
+    """
+
+    def __init__(self, repository=food_log_repository):
+        self.repository = repository
+        self._users: "OrderedDict[str, UserFoodFrequencies]" = OrderedDict()
+
+    async def for_user(self, user_id: str) -> UserFoodFrequencies:
+        frequencies = self._users.get(user_id)
+        if frequencies is not None:
+            if not frequencies.stale and time.monotonic() - frequencies.loaded_at < settings.FREQUENT_FOODS_TTL:
+                self._users.move_to_end(user_id)
+                return frequencies
+            del self._users[user_id]
+
+        logs = await self.repository.list_recent_foods(user_id, settings.FOOD_HISTORY_LIMIT)
+        frequencies = UserFoodFrequencies(settings.FREQUENT_FOODS_HALF_LIFE_DAYS)
+        for log in reversed(logs):
+            frequencies.add(log)
+
+        # A create may have landed while the history was loading
+        if user_id not in self._users:
+            self._users[user_id] = frequencies
+            while len(self._users) > settings.FOOD_INDEX_CACHE_SIZE:
+                self._users.popitem(last=False)
+        return self._users[user_id]
+
+    def record_created(self, logs: Iterable[Dict[str, Any]]):
+        for log in logs:
+            frequencies = self._users.get(log['user_id'])
+            if frequencies is not None:
+                frequencies.add(log)
+
+    def record_updated(self, old: Dict[str, Any], new: Dict[str, Any]):
+        frequencies = self._users.get(new['user_id'])
+        if frequencies is not None:
+            frequencies.remove(old)
+            frequencies.add(new)
+
+    def record_deleted(self, log: Dict[str, Any]):
+        frequencies = self._users.get(log['user_id'])
+        if frequencies is not None:
+            frequencies.remove(log)
+
+    def invalidate_user(self, user_id: str):
+        """Drop a user's counters; they are re-seeded on their next read"""
+        self._users.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cached_users": len(self._users)}
+
+
+# Shared counters used by the whole process
+frequent_foods = FrequentFoods()
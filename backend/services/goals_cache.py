@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from backend.config import settings
+from backend.repositories import macro_goals_repository
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Used by the summaries when a user has not set any goals
+DEFAULT_GOAL_GRAMS = {
+    'calories': 2000,
+    'protein': 150.0,
+    'carbs': 200.0,
+    'fat': 67.0,
+    'has_goals': False,
+}
+
+
+def compute_goal_grams(goals: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a macro_goals row (percentages of calories) into daily gram targets"""
+    if not goals:
+        return dict(DEFAULT_GOAL_GRAMS)
+
+    calories = goals['total_calories']
+    return {
+        'calories': calories,
+        'protein': (goals['protein_pct'] / 100) * calories / 4,  # 4 kcal per gram
+        'carbs': (goals['carb_pct'] / 100) * calories / 4,
+        'fat': (goals['fat_pct'] / 100) * calories / 9,  # 9 kcal per gram
+        'has_goals': True,
+    }
+
+
+class InMemoryCacheBackend:
+    """Per-process LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by every worker process, so an invalidation in one worker
+    is seen by all of them. Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "macro-goals:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("GOALS_CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self._redis.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        await self._redis.set(self.prefix + key, json.dumps(value), ex=int(self.ttl))
+
+    async def delete(self, key: str):
+        await self._redis.delete(self.prefix + key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def create_cache_backend():
+    if settings.GOALS_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL, settings.GOALS_CACHE_TTL)
+    return InMemoryCacheBackend(settings.GOALS_CACHE_SIZE, settings.GOALS_CACHE_TTL)
+
+
+class GoalsCache:
+    """
+    Caches each user's computed goal grams for the summary endpoints.
+
+    The macro goals endpoints write the new value through on every change,
+    so reads in the same process never see stale goals. With the in-memory
+    backend other workers may serve the old value until GOALS_CACHE_TTL
+    expires; use the redis backend when that matters.
+    """
+
+    def __init__(self, backend=None, repository=macro_goals_repository):
+        self._backend = backend
+        self.repository = repository
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_cache_backend()
+        return self._backend
+
+    async def get_goal_grams(self, user_id: str) -> Dict[str, Any]:
+        """Goal grams for `user_id`, loading and caching them on a miss"""
+        try:
+            cached = await self.backend.get(user_id)
+        except Exception as e:
+            # A cache outage must not take the summaries down with it
+            self.errors += 1
+            logger.error(f"Goals cache read failed: {e}")
+            cached = None
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        goal_grams = compute_goal_grams(await self.repository.get(user_id))
+        await self._set(user_id, goal_grams)
+        return goal_grams
+
+    async def store(self, user_id: str, goals: Optional[Dict[str, Any]]):
+        """Write through a user's new macro_goals row"""
+        self.writes += 1
+        await self._set(user_id, compute_goal_grams(goals))
+
+    async def invalidate(self, user_id: str):
+        try:
+            await self.backend.delete(user_id)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Goals cache invalidation failed: {e}")
+
+    async def _set(self, user_id: str, goal_grams: Dict[str, Any]):
+        try:
+            await self.backend.set(user_id, goal_grams)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Goals cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.GOALS_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "writes": self.writes,
+            "errors": self.errors,
+            "size": self.backend.size(),
+        }
+
+
+goals_cache = GoalsCache()
@@ -0,0 +1,255 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets, as in the Prometheus client defaults
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the DB-calls-per-request histogram
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+# Label for requests that matched no route (404s), so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Prometheus-style histogram: per-bucket counts plus a running sum and count"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((_format_number(bound), total))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None when empty or past the last bound)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return None
+
+
+class RequestStats:
+    """Timings gathered while one request is handled"""
+
+    __slots__ = ("db_calls", "db_seconds", "auth_seconds", "serialization_seconds")
+
+    def __init__(self):
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.auth_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+
+# Stats of the request being handled; None outside a request (scripts, background workers)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_db_call(seconds: float):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_calls += 1
+        stats.db_seconds += seconds
+
+
+def record_auth(seconds: float):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.auth_seconds += seconds
+
+
+def record_serialization(seconds: float):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+class RouteMetrics:
+    """Everything recorded for one (method, route template) pair"""
+
+    __slots__ = ("latency", "db_time", "db_calls", "auth_time", "serialization_time", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.db_calls = Histogram(CALL_COUNT_BUCKETS)
+        self.auth_time = Histogram(LATENCY_BUCKETS)
+        self.serialization_time = Histogram(LATENCY_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics for this worker process.
+
+    Everything is updated from the event loop thread, so no locking is
+    needed. Each worker exposes its own counters; Prometheus sums them
+    across the scrape targets.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+        self.started_at = time.time()
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        return metrics
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        metrics = self.route(method, route)
+        metrics.latency.observe(seconds)
+        metrics.db_time.observe(stats.db_seconds)
+        metrics.db_calls.observe(stats.db_calls)
+        if stats.auth_seconds:
+            metrics.auth_time.observe(stats.auth_seconds)
+        if stats.serialization_seconds:
+            metrics.serialization_time.observe(stats.serialization_seconds)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self):
+        self.routes.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        routes = sorted(self.routes.items())
+
+        lines += [
+            "# HELP http_requests_total Requests handled, by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+        for name, help_text, attribute in (
+            ("http_request_duration_seconds", "Time from receiving a request to sending the last response byte.", "latency"),
+            ("db_query_duration_seconds", "Total time per request spent in database calls.", "db_time"),
+            ("db_queries_per_request", "Database calls made per request.", "db_calls"),
+            ("auth_duration_seconds", "Time per authenticated request spent verifying the access token.", "auth_time"),
+            ("serialization_duration_seconds", "Time per request spent encoding the JSON response body.", "serialization_time"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), metrics in routes:
+                histogram: Histogram = getattr(metrics, attribute)
+                if not histogram.count:
+                    continue
+                labels = _labels(method, route)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {_format_number(histogram.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP process_start_time_seconds Start time of the process since unix epoch in seconds.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {_format_number(self.started_at)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _format_number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and the per-request DB,
+    auth and serialization timings under the matched route template
+    (e.g. "/food-logs/{log_id}"), so path parameters do not explode the
+    label set. Written as plain ASGI rather than BaseHTTPMiddleware to
+    keep the per-request overhead to a couple of microseconds.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry" = None):
+        self.app = app
+        self.registry = registry if registry is not None else metrics_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        registry.in_flight += 1
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            registry.observe(
+                scope["method"],
+                getattr(route, "path", None) or UNMATCHED_ROUTE,
+                status_code,
+                elapsed,
+                stats,
+            )
+
+
+def latency_summary(registry: "MetricsRegistry" = None) -> Iterable[Dict[str, Any]]:
+    """Approximate p50/p95/p99 latency per route, from the histogram buckets"""
+    registry = registry if registry is not None else metrics_registry
+    for (method, route), metrics in sorted(registry.routes.items()):
+        yield {
+            "method": method,
+            "route": route,
+            "requests": metrics.latency.count,
+            "p50": metrics.latency.quantile(0.5),
+            "p95": metrics.latency.quantile(0.95),
+            "p99": metrics.latency.quantile(0.99),
+        }
+
+
+# Shared registry for the process
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,26 @@
+from typing import Any, Dict, Tuple
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a page token cannot be decoded"""
+
+
+def encode_cursor(log: Dict[str, Any]) -> str:
+    """Opaque page token pointing at a food log's (logged_at, id) position"""
+    payload = json.dumps([str(log['logged_at']), str(log['id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[str, str]:
+    """Return the (logged_at, id) pair stored in a page token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        logged_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(logged_at), str(log_id)
+    except Exception:
+        raise InvalidCursorError("Invalid page cursor")
@@ -0,0 +1,278 @@
+from typing import Any, Dict, List, Optional, Tuple
+from postgrest.exceptions import APIError
+from backend.config import settings
+from backend.repositories import daily_totals_repository, food_log_repository
+from backend.services.aggregation_service import (
+    MACRO_FIELDS,
+    aggregation_service,
+    combine_totals,
+    totals_by_date,
+)
+from backend.services.day_buckets import DEFAULT_TIMEZONE, local_date, utc_range
+from backend.services.timezone_cache import timezone_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Floating point sums may differ in the last bits depending on summation order
+DRIFT_TOLERANCE = 1e-6
+
+# Earliest/latest dates used when rebuilding a user's whole history
+MIN_DATE = "0001-01-01"
+MAX_DATE = "9999-12-31"
+
+
+def log_day(log: Dict[str, Any], timezone: str = DEFAULT_TIMEZONE) -> str:
+    """Rollup day a food log belongs to: its local date in the user's time zone"""
+    return local_date(log['logged_at'], timezone)
+
+
+def log_deltas(
+    old: Optional[Dict[str, Any]],
+    new: Optional[Dict[str, Any]],
+    timezone: str = DEFAULT_TIMEZONE,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Per (log_date, meal_type) change in totals when `old` becomes `new`.
+
+    `old` is None for a create and `new` is None for a delete. Keys whose
+    delta is entirely zero are dropped so no-op updates cost no writes.
+    """
+    deltas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    for log, sign in ((old, -1), (new, 1)):
+        if log is None:
+            continue
+        key = (log_day(log, timezone), log['meal_type'])
+        delta = deltas.setdefault(key, {'calories': 0, 'protein': 0.0, 'carbs': 0.0, 'fat': 0.0, 'entry_count': 0})
+        for field in MACRO_FIELDS:
+            delta[field] += sign * log[field]
+        delta['entry_count'] += sign
+
+    return {key: delta for key, delta in deltas.items() if any(delta.values())}
+
+
+def rollup_rows_to_groups(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Expand rollup rows into the (log_date, meal_type) groups used by the summaries"""
+    groups = []
+    for row in rows:
+        for meal_type, meal in sorted((row.get('meals') or {}).items()):
+            if meal.get('entry_count', 0) <= 0:
+                continue
+            groups.append({
+                'log_date': str(row['log_date'])[:10],
+                'meal_type': meal_type,
+                **{field: meal.get(field, 0) for field in MACRO_FIELDS},
+                'entry_count': meal['entry_count'],
+            })
+    return groups
+
+
+def groups_to_rollup_rows(user_id: str, groups: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Build complete rollup rows, keyed by log_date, from aggregated groups"""
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for group in groups:
+        by_date.setdefault(group['log_date'], []).append(group)
+
+    rows = {}
+    for log_date, day_groups in by_date.items():
+        rows[log_date] = {
+            'user_id': user_id,
+            'log_date': log_date,
+            **combine_totals(day_groups),
+            'meals': {
+                group['meal_type']: {
+                    **{field: group[field] for field in MACRO_FIELDS},
+                    'entry_count': group['entry_count'],
+                }
+                for group in day_groups
+            },
+        }
+    return rows
+
+
+def _totals_match(expected: Dict[str, Any], actual: Dict[str, Any]) -> bool:
+    if expected.get('entry_count', 0) != actual.get('entry_count', 0):
+        return False
+    return all(
+        abs(expected.get(field, 0) - actual.get(field, 0)) <= DRIFT_TOLERANCE
+        for field in MACRO_FIELDS
+    )
+
+
+def _rows_match(expected: Dict[str, Any], actual: Dict[str, Any]) -> bool:
+    if not _totals_match(expected, actual):
+        return False
+    expected_meals = expected.get('meals') or {}
+    actual_meals = {
+        meal_type: meal for meal_type, meal in (actual.get('meals') or {}).items()
+        if meal.get('entry_count', 0) > 0
+    }
+    if set(expected_meals) != set(actual_meals):
+        return False
+    return all(_totals_match(expected_meals[meal], actual_meals[meal]) for meal in expected_meals)
+
+
+class DailyRollupService:
+    """
+    Maintains the daily_totals rollup from the food log write paths and
+    serves summary reads from it.
+
+    Writes apply deltas rather than recomputing the day. A failed delta is
+    logged instead of failing the food log write; `rebuild` repairs any
+    drift from the raw food_logs rows.
+    """
+
+    def __init__(
+        self,
+        repository=daily_totals_repository,
+        aggregator=aggregation_service,
+        timezones=timezone_cache,
+        food_logs=food_log_repository,
+    ):
+        self.repository = repository
+        self.aggregator = aggregator
+        self.timezones = timezones
+        self.food_logs = food_logs
+
+    async def record_created(self, log: Dict[str, Any]):
+        await self._apply_change(None, log)
+
+    async def record_created_many(self, logs: List[Dict[str, Any]]):
+        """Apply a batch of new logs with one delta per affected (day, meal)"""
+        if not settings.USE_DAILY_ROLLUPS or not logs:
+            return
+
+        timezone = await self.timezones.get(logs[0]['user_id'])
+        deltas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for log in logs:
+            for key, delta in log_deltas(None, log, timezone).items():
+                total = deltas.setdefault(key, dict.fromkeys(delta, 0))
+                for field, value in delta.items():
+                    total[field] += value
+
+        if deltas:
+            await self._apply(logs[0]['user_id'], deltas)
+
+    async def record_updated(self, old: Dict[str, Any], new: Dict[str, Any]):
+        await self._apply_change(old, new)
+
+    async def record_deleted(self, log: Dict[str, Any]):
+        await self._apply_change(log, None)
+
+    async def _apply_change(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        if not settings.USE_DAILY_ROLLUPS:
+            return
+        user_id = (new or old)['user_id']
+        await self._apply(user_id, log_deltas(old, new, await self.timezones.get(user_id)))
+
+    async def _apply(self, user_id: str, deltas: Dict[Tuple[str, str], Dict[str, Any]]):
+        if not settings.USE_DAILY_ROLLUPS:
+            return
+
+        for (log_date, meal_type), delta in deltas.items():
+            try:
+                await self.repository.apply_delta(user_id, log_date, meal_type, delta)
+            except Exception as e:
+                logger.error(f"Failed to update daily totals for {user_id} on {log_date}: {e}")
+
+    async def totals(self, user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """
+        Per (log_date, meal_type) totals for `start_date <= log_date <= end_date`,
+        where log_date is the local day in the user's time zone.
+
+        Reads one rollup row per day, falling back to aggregating food_logs
+        when rollups are disabled or the table has not been created.
+        """
+        if settings.USE_DAILY_ROLLUPS:
+            try:
+                rows = await self.repository.list_between(user_id, start_date, end_date)
+                return rollup_rows_to_groups(rows)
+            except APIError as e:
+                logger.warning(f"daily_totals unavailable, aggregating food logs: {e}")
+
+        return await self._aggregate(user_id, start_date, end_date)
+
+    async def _aggregate(self, user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Totals straight from food_logs over the user's local days `start_date`..`end_date`"""
+        timezone = await self.timezones.get(user_id)
+        start, end = utc_range(start_date, end_date, timezone)
+        return await self.aggregator.totals(user_id, start, end, timezone)
+
+    async def day_totals(self, user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """
+        One total per logged day for `start_date <= log_date <= end_date`, ordered by date.
+
+        Reads only the rollup's day-level columns, for ranges too long to
+        expand into per-meal groups.
+        """
+        if settings.USE_DAILY_ROLLUPS:
+            try:
+                rows = await self.repository.list_day_totals(user_id, start_date, end_date)
+                return [{**row, 'log_date': str(row['log_date'])[:10]} for row in rows if row['entry_count'] > 0]
+            except APIError as e:
+                logger.warning(f"daily_totals unavailable, aggregating food logs: {e}")
+
+        groups = await self._aggregate(user_id, start_date, end_date)
+        return [
+            {'log_date': log_date, **totals}
+            for log_date, totals in sorted(totals_by_date(groups).items())
+        ]
+
+    async def _day_has_logs(self, user_id: str, log_date: str, timezone: str) -> bool:
+        start, end = utc_range(log_date, log_date, timezone)
+        return bool(await self.food_logs.list_page(user_id, 1, start=start, end=end))
+
+    async def rebuild(
+        self,
+        user_id: str,
+        start_date: str = MIN_DATE,
+        end_date: str = MAX_DATE,
+        verify_only: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Compare the rollup with totals recomputed from food_logs and, unless
+        `verify_only`, overwrite every day that drifted.
+
+        Both sides are read in full (the repositories page past PostgREST's
+        row limit). A rollup day missing from the recomputed totals is only
+        treated as stale, and deleted, once food_logs confirms the day has
+        no entries; otherwise it is reported and left alone.
+        """
+        timezone = await self.timezones.get(user_id)
+        groups = await self._aggregate(user_id, start_date, end_date)
+        expected = groups_to_rollup_rows(user_id, groups)
+        actual = {
+            str(row['log_date'])[:10]: row
+            for row in await self.repository.list_between(user_id, start_date, end_date)
+        }
+
+        drifted = sorted(
+            log_date for log_date, row in expected.items()
+            if log_date not in actual or not _rows_match(row, actual[log_date])
+        )
+        stale = []
+        for log_date in sorted(actual):
+            if log_date in expected or actual[log_date].get('entry_count', 0) == 0:
+                continue
+            if await self._day_has_logs(user_id, log_date, timezone):
+                logger.warning(
+                    f"Rollup day {log_date} for {user_id} has food logs but no recomputed totals; not deleting it"
+                )
+                continue
+            stale.append(log_date)
+
+        if not verify_only:
+            await self.repository.replace_days([expected[log_date] for log_date in drifted])
+            await self.repository.delete_days(user_id, stale)
+
+        return {
+            'user_id': user_id,
+            'days_checked': len(set(expected) | set(actual)),
+            'drifted_days': drifted,
+            'stale_days': stale,
+            'repaired': not verify_only and bool(drifted or stale),
+        }
+
+
+rollup_service = DailyRollupService()
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Optional
+from postgrest.exceptions import APIError
+from backend.config import settings
+from backend.repositories import profile_repository
+from backend.services.day_buckets import DEFAULT_TIMEZONE, is_valid_timezone
+from backend.services.goals_cache import InMemoryCacheBackend
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TimezoneCache:
+    """
+    Caches each user's profile time zone for day bucketing.
+
+    Every food log write and summary read needs it, so it is looked up
+    once per TIMEZONE_CACHE_TTL rather than per request. Profile updates
+    write the new zone through; other workers pick it up when the entry
+    expires. Users without a profile (or a valid zone) are bucketed in UTC.
+    """
+
+    def __init__(self, backend=None, repository=profile_repository):
+        self._backend = backend
+        self.repository = repository
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = InMemoryCacheBackend(settings.TIMEZONE_CACHE_SIZE, settings.TIMEZONE_CACHE_TTL)
+        return self._backend
+
+    async def get(self, user_id: str) -> str:
+        cached = await self.backend.get(user_id)
+        if cached is not None:
+            self.hits += 1
+            return cached['timezone']
+
+        self.misses += 1
+        try:
+            timezone = await self.repository.get_timezone(user_id)
+        except APIError as e:
+            # user_profiles.timezone is added by backend/sql/007_user_timezones.sql
+            logger.warning(f"Profile time zone unavailable, using {DEFAULT_TIMEZONE}: {e}")
+            timezone = None
+
+        return await self.store(user_id, timezone)
+
+    async def store(self, user_id: str, timezone: Optional[str]) -> str:
+        """Write through a user's profile time zone and return the zone that will be used"""
+        if not timezone or not is_valid_timezone(timezone):
+            timezone = DEFAULT_TIMEZONE
+        await self.backend.set(user_id, {'timezone': timezone})
+        return timezone
+
+    async def invalidate(self, user_id: str):
+        await self.backend.delete(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "size": self.backend.size(),
+        }
+
+
+timezone_cache = TimezoneCache()
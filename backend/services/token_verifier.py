@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from anyio import to_thread
+from jwt import PyJWKClient
+from backend.config import settings
+import hashlib
+import logging
+import threading
+import time
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# Algorithms whose keys come from the Supabase JWKS endpoint
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# JWT_SECRET_KEY values that mean "not configured": anyone could sign HS256 tokens with them
+PLACEHOLDER_SECRETS = ("", "your-secret-key-change-in-production")
+
+
+class TokenVerificationError(Exception):
+    """Raised when an access token is missing, malformed, expired or forged"""
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally, without a round trip to Supabase Auth.
+
+    HS256 tokens are checked against JWT_SECRET_KEY (the project's JWT
+    secret) and rejected while it is unset or the placeholder. RS256/ES256
+    tokens are checked against the project's JWKS: PyJWKClient caches the
+    key set, and a token naming an unknown `kid` triggers a refetch (to pick
+    up key rotation) at most once per JWKS_REFRESH_INTERVAL, so forged key
+    ids cannot make every request wait on the JWKS endpoint. Verified
+    claims are kept in a bounded LRU keyed by the token's hash until the
+    token expires, so repeat requests with the same token skip signature
+    verification.
+
+    `verify` may block on the JWKS fetch; async callers use `verify_async`,
+    which runs JWKS-backed verification in a worker thread.
+    """
+
+    def __init__(
+        self,
+        secret: str = None,
+        jwks_url: Optional[str] = None,
+        audience: Optional[str] = None,
+        cache_size: int = None,
+        leeway: int = None,
+    ):
+        self.secret = secret if secret is not None else settings.JWT_SECRET_KEY
+        self.accepts_hs256 = self.secret not in PLACEHOLDER_SECRETS
+        self.audience = audience if audience is not None else settings.JWT_AUDIENCE
+        self.cache_size = cache_size if cache_size is not None else settings.AUTH_TOKEN_CACHE_SIZE
+        self.leeway = leeway if leeway is not None else settings.JWT_LEEWAY_SECONDS
+        self.refresh_interval = settings.JWKS_REFRESH_INTERVAL
+
+        jwks_url = jwks_url if jwks_url is not None else settings.SUPABASE_JWKS_URL
+        self._jwks_client = (
+            PyJWKClient(jwks_url, cache_jwk_set=True, lifespan=settings.JWKS_CACHE_TTL)
+            if jwks_url else None
+        )
+
+        self._cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_refresh = float("-inf")
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.jwks_refreshes = 0
+
+    def check_configuration(self):
+        """Warn at startup when HS256 tokens will be rejected for lack of a real secret"""
+        if not self.accepts_hs256:
+            logger.warning(
+                "JWT_SECRET_KEY is not set; HS256 access tokens will be rejected. "
+                "Set it to the Supabase project's JWT secret."
+            )
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims, raising TokenVerificationError if it is not valid"""
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self._cached(cache_key)
+        if claims is None:
+            claims = self._store(cache_key, self._decode(token, self._header(token)))
+        return claims
+
+    async def verify_async(self, token: str) -> Dict[str, Any]:
+        """`verify` for the event loop: tokens needing the JWKS are verified in a worker thread"""
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self._cached(cache_key)
+        if claims is None:
+            header = self._header(token)
+            if header.get("alg") in ASYMMETRIC_ALGORITHMS:
+                claims = await to_thread.run_sync(self._decode, token, header)
+            else:
+                claims = self._decode(token, header)
+            claims = self._store(cache_key, claims)
+        return claims
+
+    def _cached(self, cache_key: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                claims, expires_at = cached
+                if expires_at > time.time():
+                    self._cache.move_to_end(cache_key)
+                    self.cache_hits += 1
+                    return claims
+                del self._cache[cache_key]
+            self.cache_misses += 1
+        return None
+
+    def _store(self, cache_key: bytes, claims: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._cache[cache_key] = (claims, float(claims["exp"]))
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return claims
+
+    @staticmethod
+    def _header(token: str) -> Dict[str, Any]:
+        try:
+            return jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Invalid token: {e}")
+
+    def _signing_key(self, kid: Optional[str]) -> Any:
+        """The JWKS key named `kid`, refetching the key set for unknown ids at most once per refresh interval"""
+        key = self._match_kid(self._jwks_client.get_signing_keys(), kid)
+        if key is not None:
+            return key
+
+        with self._lock:
+            now = time.monotonic()
+            refresh = now - self._last_refresh >= self.refresh_interval
+            if refresh:
+                self._last_refresh = now
+                self.jwks_refreshes += 1
+        if refresh:
+            key = self._match_kid(self._jwks_client.get_signing_keys(refresh=True), kid)
+        if key is None:
+            raise TokenVerificationError(f"Unknown signing key: {kid}")
+        return key
+
+    @staticmethod
+    def _match_kid(signing_keys, kid: Optional[str]) -> Any:
+        return next((signing_key.key for signing_key in signing_keys if signing_key.key_id == kid), None)
+
+    def _decode(self, token: str, header: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            algorithm = header.get("alg")
+
+            if algorithm == settings.JWT_ALGORITHM:
+                if not self.accepts_hs256:
+                    raise TokenVerificationError("HS256 tokens are not accepted: JWT_SECRET_KEY is not configured")
+                key = self.secret
+            elif algorithm in ASYMMETRIC_ALGORITHMS and self._jwks_client is not None:
+                key = self._signing_key(header.get("kid"))
+            else:
+                raise TokenVerificationError(f"Unsupported token algorithm: {algorithm}")
+
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience or None,
+                leeway=self.leeway,
+                options={"require": ["exp", "sub"], "verify_aud": bool(self.audience)},
+            )
+        except jwt.ExpiredSignatureError:
+            raise TokenVerificationError("Token has expired")
+        except jwt.PyJWKClientError as e:
+            raise TokenVerificationError(f"Unable to load signing key: {e}")
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Invalid token: {e}")
+
+    def clear(self):
+        """Drop every cached verification result"""
+        with self._lock:
+            self._cache.clear()
+
+
+token_verifier = TokenVerifier()
@@ -0,0 +1,235 @@
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+from backend.services.aggregation_service import MACRO_FIELDS
+import calendar
+import numpy as np
+
+# Rolling average windows, in days
+ROLLING_WINDOWS = (7, 30)
+
+# Decimal places each macro is reported with
+DECIMALS = {'calories': 0, 'protein': 1, 'carbs': 1, 'fat': 1}
+
+
+def lookback_start(start_date: str) -> str:
+    """First day to load so the rolling averages on `start_date` cover full windows"""
+    return (date.fromisoformat(start_date) - timedelta(days=max(ROLLING_WINDOWS) - 1)).isoformat()
+
+
+def day_columns(rows: List[Dict[str, Any]], start_date: str, end_date: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lay per-day totals out as columns over every day from start to end.
+
+    Returns a (4, days) float array of calories/protein/carbs/fat (zero on
+    days without logs) and a boolean array marking the days with logs.
+    """
+    start = np.datetime64(start_date, 'D')
+    days = int((np.datetime64(end_date, 'D') - start).astype(np.int64)) + 1
+    values = np.zeros((len(MACRO_FIELDS), days))
+    logged = np.zeros(days, dtype=bool)
+    if not rows:
+        return values, logged
+
+    count = len(rows)
+    log_dates = np.fromiter(map(itemgetter('log_date'), rows), dtype='datetime64[D]', count=count)
+    offsets = (log_dates - start).astype(np.int64)
+    in_range = (offsets >= 0) & (offsets < days)
+    offsets = offsets[in_range]
+
+    for i, field in enumerate(MACRO_FIELDS):
+        column = np.fromiter(map(itemgetter(field), rows), dtype=float, count=count)
+        np.add.at(values[i], offsets, column[in_range])
+    logged[offsets] = True
+    return values, logged
+
+
+def rolling_averages(values: np.ndarray, logged: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average of the logged days in the `window` days ending on each day.
+
+    Days without logs are left out of the average rather than counted as
+    zero, as in the weekly summary. Returns the averages and a mask of the
+    days whose window has at least one logged day.
+    """
+    days = values.shape[1]
+    value_sums = np.concatenate((np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)), axis=1)
+    day_counts = np.concatenate(([0], np.cumsum(logged)))
+
+    ends = np.arange(1, days + 1)
+    starts = np.maximum(ends - window, 0)
+    counts = day_counts[ends] - day_counts[starts]
+    sums = value_sums[:, ends] - value_sums[:, starts]
+
+    valid = counts > 0
+    averages = np.divide(sums, counts, out=np.zeros_like(sums), where=valid)
+    return averages, valid
+
+
+def within_goals(values: np.ndarray, logged: np.ndarray, goals: Dict[str, Any], tolerance: float) -> np.ndarray:
+    """(4, days) mask of logged days whose intake is within `tolerance` (a fraction) of each goal"""
+    targets = np.array([goals[field] for field in MACRO_FIELDS], dtype=float)[:, None]
+    return (np.abs(values - targets) <= tolerance * targets) & logged
+
+
+def streaks(mask: np.ndarray, grace_last_day: bool = False) -> Tuple[int, int]:
+    """
+    (current, longest) run of consecutive True days.
+
+    The current run must reach the last day, or the day before when
+    `grace_last_day` is set (today, which may not be logged yet).
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    if not len(starts):
+        return 0, 0
+
+    lengths = ends - starts
+    days = len(mask)
+    current = 0
+    if ends[-1] == days or (grace_last_day and ends[-1] == days - 1):
+        current = int(lengths[-1])
+    return current, int(lengths.max())
+
+
+def _round(value: float, field: str):
+    return int(round(value)) if DECIMALS[field] == 0 else round(float(value), DECIMALS[field])
+
+
+def _column(values: np.ndarray, valid: np.ndarray, decimals: int) -> List[Any]:
+    """JSON-ready list of rounded values, with None where `valid` is False"""
+    if decimals == 0:
+        column = np.rint(values).astype(np.int64).tolist()
+    else:
+        column = np.round(values, decimals).tolist()
+    for index in np.flatnonzero(~valid).tolist():
+        column[index] = None
+    return column
+
+
+def _macro_columns(values: np.ndarray, valid: np.ndarray) -> Dict[str, List[Any]]:
+    return {field: _column(values[i], valid, DECIMALS[field]) for i, field in enumerate(MACRO_FIELDS)}
+
+
+def range_trends(
+    rows: List[Dict[str, Any]],
+    start_date: str,
+    end_date: str,
+    goals: Dict[str, Any],
+    tolerance: float,
+    today: str = None,
+) -> Dict[str, Any]:
+    """
+    Build the range summary (RangeSummaryResponse fields) from per-day totals.
+
+    `rows` may start up to the longest rolling window before `start_date`
+    (see `lookback_start`) so the first days' rolling averages are complete;
+    every other figure covers `start_date` to `end_date` only. All series
+    are computed column-wise over the whole range at once.
+    """
+    history_start = lookback_start(start_date)
+    all_values, all_logged = day_columns(rows, history_start, end_date)
+    skip = int((np.datetime64(start_date, 'D') - np.datetime64(history_start, 'D')).astype(np.int64))
+    values, logged = all_values[:, skip:], all_logged[skip:]
+
+    days_with_data = int(logged.sum())
+    if days_with_data:
+        averages = values[:, logged].mean(axis=1)
+    else:
+        averages = np.zeros(len(MACRO_FIELDS))
+
+    on_goal = within_goals(values, logged, goals, tolerance)
+    on_all_goals = on_goal.all(axis=0)
+    adherence = {
+        field: round(float(on_goal[i].sum()) * 100 / days_with_data, 1) if days_with_data else 0.0
+        for i, field in enumerate(MACRO_FIELDS)
+    }
+    adherence['all'] = round(float(on_all_goals.sum()) * 100 / days_with_data, 1) if days_with_data else 0.0
+
+    grace = today is not None and end_date == today
+    current_logging, longest_logging = streaks(logged, grace)
+    current_on_goal, longest_on_goal = streaks(on_goal[0], grace)
+
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        window_averages, valid = rolling_averages(all_values, all_logged, window)
+        rolling[f"rolling_{window}"] = _macro_columns(window_averages[:, skip:], valid[skip:])
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_days': len(logged),
+        'days_with_data': days_with_data,
+        'dates': np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1).astype(str).tolist(),
+        'daily': _macro_columns(values, logged),
+        **rolling,
+        'averages': {field: _round(averages[i], field) for i, field in enumerate(MACRO_FIELDS)},
+        'goals': {field: _round(goals[field], field) for field in MACRO_FIELDS},
+        'adherence': adherence,
+        'streaks': {
+            'current_logging': current_logging,
+            'longest_logging': longest_logging,
+            'current_on_calorie_goal': current_on_goal,
+            'longest_on_calorie_goal': longest_on_goal,
+        },
+    }
+
+
+def monthly_summary(
+    rows: List[Dict[str, Any]],
+    year: int,
+    month: int,
+    goals: Dict[str, Any],
+    tolerance: float,
+) -> Dict[str, Any]:
+    """
+    Build the monthly summary (MonthlySummaryResponse fields) from the
+    month's per-day totals: one entry per calendar day with its goal-hit
+    flags, plus the month's totals and averages over logged days.
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    month_start = date(year, month, 1).isoformat()
+    month_end = date(year, month, days_in_month).isoformat()
+
+    values, logged = day_columns(rows, month_start, month_end)
+    on_goal = within_goals(values, logged, goals, tolerance)
+    on_all_goals = on_goal.all(axis=0)
+    calorie_pct = values[0] * 100 / goals['calories'] if goals['calories'] else np.zeros(days_in_month)
+    entry_counts = {row['log_date']: row.get('entry_count', 0) for row in rows}
+
+    days = []
+    for index, (day_values, day_logged, day_pct, day_on_goal, day_on_all) in enumerate(zip(
+        values.T.tolist(), logged.tolist(), calorie_pct.tolist(), on_goal[0].tolist(), on_all_goals.tolist()
+    )):
+        log_date = date(year, month, index + 1).isoformat()
+        days.append({
+            'date': log_date,
+            **{field: _round(value, field) for field, value in zip(MACRO_FIELDS, day_values)},
+            'entry_count': entry_counts.get(log_date, 0),
+            'logged': day_logged,
+            'calorie_pct': round(day_pct, 1),
+            'on_calorie_goal': day_on_goal,
+            'on_all_goals': day_on_all,
+        })
+
+    days_with_data = int(logged.sum())
+    totals = values.sum(axis=1)
+    return {
+        'year': year,
+        'month': month,
+        'month_start': month_start,
+        'month_end': month_end,
+        'total_days': days_in_month,
+        'days_with_data': days_with_data,
+        'days_on_calorie_goal': int(on_goal[0].sum()),
+        'days_on_all_goals': int(on_all_goals.sum()),
+        'totals': {field: _round(totals[i], field) for i, field in enumerate(MACRO_FIELDS)},
+        'daily_averages': {
+            field: _round(totals[i] / days_with_data if days_with_data else 0, field)
+            for i, field in enumerate(MACRO_FIELDS)
+        },
+        'goals': {field: _round(goals[field], field) for field in MACRO_FIELDS},
+        # Monday-first weeks of day numbers, 0 for days outside the month
+        'weeks': calendar.monthcalendar(year, month),
+        'days': days,
+    }
@@ -0,0 +1,43 @@
+-- Server-side aggregation for the food log summary endpoints.
+--
+-- Returns one row per (day, meal_type) instead of every raw food_logs row,
+-- so /food-logs/summary/daily and /summary/weekly only transfer totals.
+-- Run in the Supabase SQL editor. SECURITY INVOKER keeps the food_logs
+-- RLS policies in force for the calling user.
+
+create index if not exists food_logs_user_logged_at_idx
+    on food_logs (user_id, logged_at);
+
+create or replace function food_log_totals(
+    p_user_id uuid,
+    p_start timestamp,
+    p_end timestamp
+)
+returns table (
+    log_date date,
+    meal_type text,
+    calories bigint,
+    protein double precision,
+    carbs double precision,
+    fat double precision,
+    entry_count bigint
+)
+language sql
+stable
+security invoker
+as $$
+    select
+        logged_at::date as log_date,
+        meal_type,
+        sum(calories)::bigint as calories,
+        sum(protein)::double precision as protein,
+        sum(carbs)::double precision as carbs,
+        sum(fat)::double precision as fat,
+        count(*) as entry_count
+    from food_logs
+    where user_id = p_user_id
+      and logged_at >= p_start
+      and logged_at <= p_end
+    group by 1, 2
+    order by 1, 2;
+$$;
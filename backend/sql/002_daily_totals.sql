@@ -0,0 +1,78 @@
+-- Incrementally maintained per-user, per-day macro totals.
+--
+-- create/update/delete of a food log apply a delta to the matching row via
+-- apply_daily_totals_delta, so summary reads are a single-row lookup per day
+-- no matter how many entries the day has. `meals` holds the same totals
+-- broken down by meal_type:
+--   {"lunch": {"calories": 650, "protein": 40.0, "carbs": 70.0, "fat": 20.0, "entry_count": 2}}
+-- Repair drift with: python -m backend.scripts.rebuild_daily_totals
+
+create table if not exists daily_totals (
+    user_id uuid not null references auth.users (id) on delete cascade,
+    log_date date not null,
+    calories bigint not null default 0,
+    protein double precision not null default 0,
+    carbs double precision not null default 0,
+    fat double precision not null default 0,
+    entry_count integer not null default 0,
+    meals jsonb not null default '{}'::jsonb,
+    updated_at timestamp with time zone not null default now(),
+    primary key (user_id, log_date)
+);
+
+alter table daily_totals enable row level security;
+
+create policy "Users can view own daily totals" on daily_totals
+for select using (auth.uid() = user_id);
+
+create policy "Users can create own daily totals" on daily_totals
+for insert with check (auth.uid() = user_id);
+
+create policy "Users can update own daily totals" on daily_totals
+for update using (auth.uid() = user_id);
+
+create policy "Users can delete own daily totals" on daily_totals
+for delete using (auth.uid() = user_id);
+
+create or replace function apply_daily_totals_delta(
+    p_user_id uuid,
+    p_log_date date,
+    p_meal_type text,
+    p_calories bigint,
+    p_protein double precision,
+    p_carbs double precision,
+    p_fat double precision,
+    p_entry_count integer
+)
+returns void
+language sql
+security invoker
+as $$
+    insert into daily_totals as d (
+        user_id, log_date, calories, protein, carbs, fat, entry_count, meals
+    )
+    values (
+        p_user_id, p_log_date, p_calories, p_protein, p_carbs, p_fat, p_entry_count,
+        jsonb_build_object(p_meal_type, jsonb_build_object(
+            'calories', p_calories,
+            'protein', p_protein,
+            'carbs', p_carbs,
+            'fat', p_fat,
+            'entry_count', p_entry_count
+        ))
+    )
+    on conflict (user_id, log_date) do update set
+        calories = d.calories + excluded.calories,
+        protein = d.protein + excluded.protein,
+        carbs = d.carbs + excluded.carbs,
+        fat = d.fat + excluded.fat,
+        entry_count = d.entry_count + excluded.entry_count,
+        meals = d.meals || jsonb_build_object(p_meal_type, jsonb_build_object(
+            'calories', coalesce((d.meals -> p_meal_type ->> 'calories')::bigint, 0) + p_calories,
+            'protein', coalesce((d.meals -> p_meal_type ->> 'protein')::double precision, 0) + p_protein,
+            'carbs', coalesce((d.meals -> p_meal_type ->> 'carbs')::double precision, 0) + p_carbs,
+            'fat', coalesce((d.meals -> p_meal_type ->> 'fat')::double precision, 0) + p_fat,
+            'entry_count', coalesce((d.meals -> p_meal_type ->> 'entry_count')::integer, 0) + p_entry_count
+        )),
+        updated_at = now();
+$$;
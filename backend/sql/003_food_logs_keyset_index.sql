@@ -0,0 +1,12 @@
+-- Keyset pagination for GET /food-logs/.
+--
+-- Pages are ordered by (logged_at, id) and continue from the last row seen,
+-- so this index lets every page be an index range scan instead of an
+-- OFFSET scan over the user's whole history. It also serves every
+-- (user_id, logged_at) range scan, so the narrower index from
+-- 001_food_log_totals.sql is dropped rather than maintained on every insert.
+
+create index if not exists food_logs_user_logged_at_id_idx
+    on food_logs (user_id, logged_at desc, id desc);
+
+drop index if exists food_logs_user_logged_at_idx;
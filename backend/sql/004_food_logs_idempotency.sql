@@ -0,0 +1,20 @@
+-- Client-supplied idempotency keys for POST /food-logs/batch.
+--
+-- Retrying a batch (e.g. an offline mobile queue re-syncing) must not
+-- duplicate entries. Rows carrying a key already stored for the user are
+-- skipped by the insert. NULL keys never conflict, so single-entry logs
+-- without a key are unaffected.
+
+alter table food_logs
+    add column if not exists idempotency_key text;
+
+do $$
+begin
+    if not exists (
+        select 1 from pg_constraint
+        where conname = 'food_logs_user_idempotency_key_key' and conrelid = 'food_logs'::regclass
+    ) then
+        alter table food_logs
+            add constraint food_logs_user_idempotency_key_key unique (user_id, idempotency_key);
+    end if;
+end $$;
@@ -0,0 +1,9 @@
+-- One macro_goals row per user.
+--
+-- POST /macro-goals/ writes with INSERT ... ON CONFLICT (user_id) DO UPDATE,
+-- which needs a unique index on user_id to infer the conflict target. This
+-- also closes the race where two concurrent saves could insert two rows.
+-- Remove any duplicate rows before running it.
+
+create unique index if not exists macro_goals_user_id_key
+    on macro_goals (user_id);
@@ -0,0 +1,57 @@
+-- Recipients and totals for the daily summary email job, in one set-based pass.
+--
+-- Joins every user's daily_totals row for the day with their email address
+-- and macro goals, instead of one summary query per user. Pages are keyed on
+-- user_id (pass the last user_id of the previous page as p_after_user_id),
+-- and users are split into p_shard_count disjoint shards by a hash of their
+-- id so several job processes can run side by side:
+--   python -m backend.scripts.send_daily_summaries --shards 4 --shard 0
+--
+-- Reads auth.users, so it is only executable by the service role.
+
+create or replace function daily_summary_digests(
+    p_log_date date,
+    p_shard_count integer default 1,
+    p_shard_index integer default 0,
+    p_after_user_id uuid default null,
+    p_limit integer default 1000
+)
+returns table (
+    user_id uuid,
+    email text,
+    log_date date,
+    meals jsonb,
+    total_calories integer,
+    protein_pct double precision,
+    carb_pct double precision,
+    fat_pct double precision
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    select
+        d.user_id,
+        u.email::text,
+        d.log_date,
+        d.meals,
+        g.total_calories,
+        g.protein_pct,
+        g.carb_pct,
+        g.fat_pct
+    from daily_totals d
+    join auth.users u on u.id = d.user_id
+    left join macro_goals g on g.user_id = d.user_id
+    where d.log_date = p_log_date
+      and d.entry_count > 0
+      and u.email is not null
+      -- abs() of the integer hashtext overflows for -2^31; widen first
+      and mod(abs(hashtext(d.user_id::text)::bigint), p_shard_count) = p_shard_index
+      and (p_after_user_id is null or d.user_id > p_after_user_id)
+    order by d.user_id
+    limit p_limit;
+$$;
+
+revoke execute on function daily_summary_digests(date, integer, integer, uuid, integer) from public, anon, authenticated;
+grant execute on function daily_summary_digests(date, integer, integer, uuid, integer) to service_role;
@@ -0,0 +1,84 @@
+-- Per-user time zones for day bucketing.
+--
+-- Summaries group food logs by the user's local day instead of the UTC
+-- date of logged_at. The app converts a local day range into half-open
+-- UTC bounds (logged_at >= start and logged_at < end), which is a single
+-- range scan on food_logs_user_logged_at_id_idx (user_id, logged_at, id)
+-- from 003_food_logs_keyset_index.sql, and includes the final second of
+-- the last day.
+--
+-- daily_totals rows are keyed by local day too. Existing rows were
+-- bucketed in UTC; users who set a time zone have their rollup rebuilt
+-- when they change it, or run: python -m backend.scripts.rebuild_daily_totals
+
+alter table user_profiles
+    add column if not exists timezone text not null default 'UTC';
+
+-- Reject names Postgres cannot resolve (e.g. 'Mars/Olympus'); the API
+-- validates against the same IANA database before writing
+create or replace function is_valid_timezone(p_timezone text)
+returns boolean
+language sql
+stable
+as $$
+    select exists (select 1 from pg_timezone_names where name = p_timezone);
+$$;
+
+create or replace function check_user_profile_timezone()
+returns trigger
+language plpgsql
+as $$
+begin
+    if not is_valid_timezone(new.timezone) then
+        raise exception 'Unknown time zone %', new.timezone using errcode = '22023';
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists user_profiles_timezone_check on user_profiles;
+create trigger user_profiles_timezone_check
+    before insert or update of timezone on user_profiles
+    for each row execute function check_user_profile_timezone();
+
+-- Replaces the UTC-only version: half-open timestamptz bounds, grouped by
+-- the local date in p_timezone
+drop function if exists food_log_totals(uuid, timestamp, timestamp);
+
+create or replace function food_log_totals(
+    p_user_id uuid,
+    p_start timestamptz,
+    p_end timestamptz,
+    p_timezone text default 'UTC'
+)
+returns table (
+    log_date date,
+    meal_type text,
+    calories bigint,
+    protein double precision,
+    carbs double precision,
+    fat double precision,
+    entry_count bigint
+)
+language sql
+stable
+security invoker
+as $$
+    select
+        -- logged_at holds UTC wall-clock time: mark it as UTC, then convert
+        -- to the user's zone. A single `at time zone p_timezone` would read
+        -- it as local time and shift the day the wrong way.
+        (logged_at at time zone 'UTC' at time zone p_timezone)::date as log_date,
+        meal_type,
+        sum(calories)::bigint as calories,
+        sum(protein)::double precision as protein,
+        sum(carbs)::double precision as carbs,
+        sum(fat)::double precision as fat,
+        count(*) as entry_count
+    from food_logs
+    where user_id = p_user_id
+      and logged_at >= p_start
+      and logged_at < p_end
+    group by 1, 2
+    order by 1, 2;
+$$;